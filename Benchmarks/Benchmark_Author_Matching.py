@@ -0,0 +1,73 @@
+"""Author-position matching on the stored author lists: the previous per-author
+fuzz.partial_ratio scan (last author above 60 wins) against Google_Scholar_Names.
+
+Reads publications with their authors and the staff member they belong to from the
+database; nothing is written.
+
+    python Benchmarks/Benchmark_Author_Matching.py --limit 50000 --show 20
+"""
+import argparse
+import os
+import sys
+from time import perf_counter
+
+from fuzzywuzzy import fuzz
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+import Google_Scholar_Names as names
+import Google_Scholar_Scrape as gs
+
+
+def legacy_position(staff_name, authors):
+    author_order = 0
+    for order, name in enumerate(authors):
+        if fuzz.partial_ratio(staff_name, name) > 60:
+            author_order = order + 1
+    return author_order
+
+
+def load_author_lists(connection, limit):
+    cursor = connection.cursor()
+    cursor.execute("SELECT CONCAT(s.first_name, ' ', s.last_name), p.authors, ps.author_order "
+                   "FROM publications_staff ps "
+                   "JOIN staff s ON s.staff_id = ps.staff_id "
+                   "JOIN publications p ON p.publication_id = ps.publication_id "
+                   "WHERE p.authors IS NOT NULL AND p.authors <> '' LIMIT %s", (limit,))
+    rows = [(staff_name, authors.split(', '), author_order) for staff_name, authors, author_order in cursor.fetchall()]
+    cursor.close()
+    return rows
+
+
+def run(limit, show):
+    connection = gs.create_connection()
+    rows = load_author_lists(connection, limit)
+    connection.close()
+
+    results = {}
+    for label, position in (("fuzzy scan (before)", legacy_position), ("name variants (after)", names.author_position)):
+        start = perf_counter()
+        positions = [position(staff_name, authors) for staff_name, authors, _ in rows]
+        results[label] = (positions, perf_counter() - start)
+
+    print(f"{len(rows)} author lists, {sum(len(authors) for _, authors, _ in rows)} authors")
+    print(f"{'matcher':<24}{'us/publication':>16}{'not found':>11}{'= stored order':>16}")
+    for label, (positions, elapsed) in results.items():
+        per_publication = elapsed / len(rows) * 1e6 if rows else 0
+        not_found = sum(1 for position in positions if position == 0)
+        agree = sum(1 for position, (_, _, stored) in zip(positions, rows) if position == stored)
+        print(f"{label:<24}{per_publication:>16.1f}{not_found:>11}{agree:>16}")
+
+    before, after = (positions for positions, _ in results.values())
+    differences = [(row, old, new) for row, old, new in zip(rows, before, after) if old != new]
+    print(f"{len(differences)} lists where the two matchers disagree")
+    for (staff_name, authors, _), old, new in differences[:show]:
+        print(f"  {staff_name}: before={old} after={new} {authors}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--limit", type=int, default=50000)
+    parser.add_argument("--show", type=int, default=20, help="disagreements to print")
+    args = parser.parse_args()
+    run(args.limit, args.show)
@@ -0,0 +1,147 @@
+"""Commits per staff member, history rows and wall time of the per-publication sync
+writes: with a commit per statement, with one UnitOfWork per staff member, and with one
+UnitOfWork and deferred history (HISTORY_MODE=deferred, one history record per changed row).
+
+It runs in a scratch database made by MySQL_Fixture (--database, recreated on every run)
+and never writes to the configured database (DB_DB). For each mode it creates a synthetic
+staff member, writes its publications and graphs twice, and deletes them again.
+
+    python Benchmarks/Benchmark_DB_Writes.py --publications 300 --years 15
+"""
+import argparse
+import os
+import sys
+from datetime import date
+from time import perf_counter
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+import Google_Scholar_Scrape as gs
+import MySQL_Fixture as fixture
+
+HISTORY_TABLES = ["publications_records", "publications_staff_records", "publication_citations_per_year_records",
+                  "staff_citations_per_year_records"]
+
+
+class CountingConnection:
+    """Wraps a mysql.connector connection and counts commit() calls."""
+
+    def __init__(self, connection):
+        self.connection = connection
+        self.commits = 0
+
+    def commit(self):
+        self.commits += 1
+        self.connection.commit()
+
+    def __getattr__(self, name):
+        return getattr(self.connection, name)
+
+
+def create_bench_staff(connection, tag):
+    cursor = connection.cursor()
+    cursor.execute("INSERT INTO staff (scholar_id, first_name, last_name) VALUES (%s, %s, %s)",
+                   (f"BENCH{tag}", "Bench", f"Staff {tag}"))
+    connection.commit()
+    staff_id = cursor.lastrowid
+    cursor.close()
+    return staff_id
+
+
+def count_history_rows(connection):
+    cursor = connection.cursor()
+    cursor.execute(" UNION ALL ".join(f"SELECT COUNT(*) FROM {table}" for table in HISTORY_TABLES))
+    total = sum(row[0] for row in cursor.fetchall())
+    cursor.close()
+    return total
+
+
+def cleanup(connection, staff_id):
+    cursor = connection.cursor()
+    cursor.execute("DELETE pc FROM publication_citations_per_year pc "
+                   "JOIN publications_staff ps ON ps.publication_id = pc.publication_id WHERE ps.staff_id = %s",
+                   (staff_id,))
+    cursor.execute("CREATE TEMPORARY TABLE bench_publications AS "
+                   "SELECT publication_id FROM publications_staff WHERE staff_id = %s", (staff_id,))
+    cursor.execute("DELETE FROM publications_staff WHERE staff_id = %s", (staff_id,))
+    cursor.execute("DELETE p FROM publications p JOIN bench_publications b ON b.publication_id = p.publication_id")
+    cursor.execute("DROP TEMPORARY TABLE bench_publications")
+    cursor.execute("DELETE FROM staff_citations_per_year WHERE staff_id = %s", (staff_id,))
+    cursor.execute("DELETE FROM staff WHERE staff_id = %s", (staff_id,))
+    connection.commit()
+    cursor.close()
+
+
+def sync_staff(connection, staff_id, publications, years, use_uow):
+    """The write pattern of process_staff: first insert every publication with its
+    graph, then update citations and every graph year, as on the next crawl."""
+    uow = gs.UnitOfWork(connection) if use_uow else None
+    first_year = date.today().year - years + 1
+
+    for year in range(first_year, first_year + years):
+        gs.insert_staff_citations_per_year(connection, staff_id, year, 10, uow=uow)
+
+    publication_ids = []
+    for n in range(publications):
+        publication_id = gs.insert_publication(connection, f"Benchmark publication {n}", first_year,
+                                               f"https://example.invalid/{staff_id}/{n}", n, f"bench{n}", uow=uow)
+        gs.insert_publication_staff(connection, staff_id, publication_id, uow=uow)
+        for year in range(first_year, first_year + years):
+            gs.insert_publications_citations_per_year(connection, publication_id, year, 1, uow=uow)
+        gs.update_publication_stats(connection, publication_id, "A Author, B Author", "Journal", "Publisher",
+                                    date(first_year, 1, 1), uow=uow)
+        gs.insert_publication_staff_author_order(connection, staff_id, publication_id, 1, uow=uow)
+        publication_ids.append(publication_id)
+
+    for publication_id in publication_ids:
+        gs.update_publication(connection, staff_id, publication_id, False, 0, False, None, False, None,
+                              False, None, False, None, False, None, True, 2 * years, uow=uow)
+        for year in range(first_year, first_year + years):
+            gs.update_publication_graph(connection, publication_id, year, 2, uow=uow)
+
+    for year in range(first_year, first_year + years):
+        gs.update_staff_graph(connection, staff_id, year, 20, uow=uow)
+
+    if uow:
+        uow.flush()
+
+
+def run(database, publications, years):
+    setup = fixture.connect()
+    if database == os.getenv("DB_DB"):
+        raise SystemExit(f"--database must be a scratch database, not the configured DB_DB ({database})")
+    fixture.create_fixture(setup, database)
+    setup.close()
+    # Το pool του Google_Scholar_Scrape δημιουργείται στην πρώτη σύνδεση, με το DB_DB εκείνης της στιγμής
+    os.environ["DB_DB"] = database
+    connection = gs.create_connection()
+    results = []
+    modes = (("commit per statement", False, "triggers"), ("unit of work", True, "triggers"),
+             ("deferred history", True, "deferred"))
+    for label, use_uow, history_mode in modes:
+        staff_id = create_bench_staff(connection, label.replace(" ", "_"))
+        gs.history_mode = history_mode
+        counting = CountingConnection(connection)
+        history_before = count_history_rows(connection)
+        start = perf_counter()
+        sync_staff(counting, staff_id, publications, years, use_uow)
+        elapsed = perf_counter() - start
+        history_rows = count_history_rows(connection) - history_before
+        gs.set_history_deferred(connection, False)
+        cleanup(connection, staff_id)
+        results.append((label, counting.commits, history_rows, elapsed))
+    connection.close()
+
+    print(f"{publications} publications x {years} graph years")
+    print(f"{'mode':<22}{'commits/staff':>15}{'history rows':>14}{'wall time (s)':>16}")
+    for label, commits, history_rows, elapsed in results:
+        print(f"{label:<22}{commits:>15}{history_rows:>14}{elapsed:>16.2f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--database", default="citations_writes_bench", help="scratch database (recreated)")
+    parser.add_argument("--publications", type=int, default=300)
+    parser.add_argument("--years", type=int, default=15)
+    args = parser.parse_args()
+    run(args.database, args.publications, args.years)
@@ -0,0 +1,88 @@
+"""End-to-end throughput of Google_Scholar_Scrape.main() (scrape -> sync -> stats) without
+contacting Google Scholar: profiles/minute, DB statements and commits per profile, pages/minute
+and peak RSS.
+
+The profiles come from Synthetic_Scholar over local HTTP (SCRAPE_BACKEND=http, no request
+delays). The database is a scratch copy made by MySQL_Fixture, so it needs the configured
+database only for its table definitions. Run 1 is a first crawl that inserts everything.
+Every later run raises the synthetic epoch (new citations, one new publication per profile)
+and re-crawls, as the nightly runs do.
+
+    python Benchmarks/Benchmark_Pipeline.py --profiles 50 --papers 120 --runs 3 --workers 2
+"""
+import argparse
+import os
+import resource
+import sys
+from time import perf_counter, sleep
+
+from dotenv import load_dotenv
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+import MySQL_Fixture as fixture
+from Synthetic_Scholar import SyntheticScholar, start_server
+
+
+def peak_rss_mb():
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def run(args):
+    load_dotenv()
+    scholar = SyntheticScholar(args.profiles, args.papers, args.citation_alpha, args.graph_years, args.seed)
+    server, base_url = start_server(scholar)
+
+    connection = fixture.connect()
+    fixture.create_fixture(connection, args.database)
+    fixture.seed_staff(connection, scholar.staff())
+    connection.close()
+
+    # Πριν από το import: το Google_Scholar_Scrape διαβάζει το SCHOLAR_BASE_URL κατά τη φόρτωση,
+    # και το load_dotenv() της main() δεν αντικαθιστά μεταβλητές που έχουν ήδη οριστεί
+    os.environ.update({
+        "SCHOLAR_BASE_URL": base_url, "DB_DB": args.database, "SCRAPE_BACKEND": "http",
+        "SCRAPE_WORKERS": str(args.workers), "DETAIL_CONCURRENCY": str(args.detail_concurrency),
+        "SCRAPE_MIN_DELAY": "0", "SCRAPE_INITIAL_DELAY": "0", "SCRAPE_REQUESTS_PER_MINUTE": "",
+        "CRAWL_FRESHNESS_DAYS": "0", "PAGE_CACHE_DIR": "",
+    })
+    import Google_Scholar_Scrape as gs
+
+    results = []
+    for epoch in range(args.runs):
+        scholar.set_epoch(epoch)
+        server.requests = 0
+        gs.run_metrics.reset()
+        start = perf_counter()
+        gs.main()
+        minutes = (perf_counter() - start) / 60
+        report = gs.run_metrics.report()
+        profiles = report['counters'].get('staff_processed', 0)
+        results.append(("first crawl" if epoch == 0 else f"re-crawl {epoch}", profiles,
+                        profiles / minutes if minutes else 0.0, report['pages_per_minute'], server.requests,
+                        report['queries_per_staff'], report['commits_per_staff'], peak_rss_mb()))
+        # Το CRAWL_FRESHNESS_DAYS=0 ξαναπερνά όσους τελείωσαν πριν από την τρέχουσα στιγμή
+        sleep(1)
+    server.shutdown()
+
+    print(f"{args.profiles} profiles, median {args.papers} publications, {args.workers} worker(s), "
+          f"detail concurrency {args.detail_concurrency}")
+    print(f"{'run':<14}{'profiles':>9}{'profiles/min':>14}{'pages/min':>11}{'requests':>10}"
+          f"{'statements/profile':>20}{'commits/profile':>17}{'peak RSS (MB)':>15}")
+    for label, profiles, per_minute, pages, requests, statements, commits, rss in results:
+        print(f"{label:<14}{profiles:>9}{per_minute:>14.1f}{pages:>11.1f}{requests:>10}"
+              f"{statements or 0:>20.1f}{commits or 0:>17.1f}{rss:>15.1f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--database", default="citations_pipeline_bench", help="scratch database (recreated)")
+    parser.add_argument("--profiles", type=int, default=50)
+    parser.add_argument("--papers", type=int, default=120, help="median publications per profile")
+    parser.add_argument("--citation-alpha", type=float, default=1.6, help="Pareto shape of citations per publication")
+    parser.add_argument("--graph-years", type=int, default=15, help="years in the citations-per-year graphs")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--runs", type=int, default=2, help="first crawl plus re-crawls")
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--detail-concurrency", type=int, default=4)
+    run(parser.parse_args())
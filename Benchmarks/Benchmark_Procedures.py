@@ -0,0 +1,210 @@
+"""Wall time of the statistics procedures behind the API, before and after a change to
+Database/procedures.sql, on a synthetic dataset (50k staff / 5M publications by default).
+
+--seed copies the table definitions of the configured database (DB_DB) into a scratch
+database and fills it. It then fills the local indices and the aggregate tables the way
+`python Google_Scholar_Scrape.py --recompute` does (--recompute alone repeats this step).
+Every run then:
+  1. drops the indexes of Database/id_list_indexes.sql and loads the procedures of --before-ref
+     (default HEAD~1, resolved to a commit with `git rev-parse`);
+  2. adds the indexes and loads the procedures of the working tree;
+and times each procedure call in both states. Nothing outside the scratch database is touched.
+
+    python Benchmarks/Benchmark_Procedures.py --seed --staff 50000 --publications 5000000
+    python Benchmarks/Benchmark_Procedures.py --before-ref HEAD~1 --repeat 5
+"""
+import argparse
+import os
+import random
+import re
+import statistics
+import subprocess
+import sys
+from time import perf_counter
+
+import mysql.connector
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+import Google_Scholar_Scrape as gs
+from MySQL_Fixture import connect, read_script, sql_statements
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+TABLES = ["departments", "roles", "staff", "staff_dept_role", "publications", "publications_staff",
+          "staff_statistics", "publication_citations_per_year", "staff_aggregates", "department_role_aggregates",
+          "department_role_set_counts"]
+PROCEDURES = ["get_all_staff_summary", "get_department_stats_by_roles",
+              "get_department_stats_by_depts_and_roles", "get_overall_stats_by_staff_ids"]
+INDEXES = [("staff_dept_role", "idx_staff_dept_role_dept_role_staff"),
+           ("publications_staff", "idx_publications_staff_staff_publication")]
+BATCH = 1_000_000
+
+
+def seed(connection, database, staff, publications, departments, roles):
+    source = os.getenv("DB_DB")
+    cursor = connection.cursor()
+    cursor.execute(f"DROP DATABASE IF EXISTS {database}")
+    cursor.execute(f"CREATE DATABASE {database}")
+    for table in TABLES:
+        cursor.execute(f"CREATE TABLE {database}.{table} LIKE {source}.{table}")
+    cursor.execute(f"USE {database}")
+
+    cursor.execute("CREATE TABLE bench_numbers (n INT NOT NULL PRIMARY KEY)")
+    cursor.executemany("INSERT INTO bench_numbers (n) VALUES (%s)", [(n,) for n in range(10000)])
+    # k = 0 .. 10^8 - 1 από δύο αντίγραφα του bench_numbers
+    numbers = "SELECT a.n * 10000 + b.n AS k FROM bench_numbers a CROSS JOIN bench_numbers b WHERE a.n * 10000 + b.n"
+
+    cursor.execute("INSERT INTO departments (department_id, short_code, department_title, university) "
+                   "SELECT n + 1, CONCAT('D', n + 1), CONCAT('Department ', n + 1), 'Benchmark University' "
+                   "FROM bench_numbers WHERE n < %s", (departments,))
+    cursor.execute("INSERT INTO roles (role_id, role_title) SELECT n + 1, CONCAT('Role ', n + 1) "
+                   "FROM bench_numbers WHERE n < %s", (roles,))
+    cursor.execute("INSERT INTO staff (staff_id, scholar_id, first_name, last_name) "
+                   f"SELECT k + 1, CONCAT('BENCH', k), 'Bench', CONCAT('Staff ', k) FROM ({numbers} < %s) AS t",
+                   (staff,))
+    cursor.execute("INSERT INTO staff_dept_role (staff_id, department_id, role_id) "
+                   "SELECT staff_id, staff_id %% %s + 1, (staff_id DIV %s) %% %s + 1 FROM staff",
+                   (departments, departments, roles))
+    cursor.execute("INSERT INTO staff_statistics (staff_id, total_citations, last_5_years_citations, h_index, "
+                   "last_5_years_h_index, i10_index, last_5_years_i10_index, h_index_local, last_5_years_h_index_local, "
+                   "i10_index_local, last_5_years_i10_index_local, h_index_from_graph, last_5_years_h_index_from_graph, "
+                   "i10_index_from_graph, last_5_years_i10_index_from_graph) "
+                   "SELECT staff_id, MOD(staff_id, 5000), MOD(staff_id, 1000), MOD(staff_id, 60), MOD(staff_id, 30), "
+                   "MOD(staff_id, 90), MOD(staff_id, 40), 0, 0, 0, 0, 0, 0, 0, 0 FROM staff")
+    connection.commit()
+
+    for start in range(0, publications, BATCH):
+        end = min(publications, start + BATCH)
+        # Έτη 1980-έτος+1 (και κάποια κενά), αναφορές με λοξή κατανομή
+        cursor.execute("INSERT INTO publications (publication_id, publication_title, publication_year, citations, "
+                       "publication_url, publication_scholar_id) "
+                       "SELECT k + 1, CONCAT('Benchmark publication ', k), "
+                       "IF(k %% 50 = 0, NULL, 1980 + k %% (YEAR(CURDATE()) - 1978)), FLOOR(POW(RAND(k), 4) * 2000), "
+                       "CONCAT('https://example.invalid/', k), CONCAT('bench', k) "
+                       f"FROM ({numbers} >= %s AND a.n * 10000 + b.n < %s) AS t", (start, end))
+        # Κάθε δημοσίευση ανήκει σε ένα μέλος, μία στις δέκα και σε ένα δεύτερο συνεργάτη
+        cursor.execute("INSERT INTO publications_staff (staff_id, publication_id) "
+                       "SELECT k %% %s + 1, k + 1 "
+                       f"FROM ({numbers} >= %s AND a.n * 10000 + b.n < %s) AS t",
+                       (staff, start, end))
+        cursor.execute("INSERT INTO publications_staff (staff_id, publication_id) "
+                       "SELECT (k %% %s + %s DIV 2) %% %s + 1, k + 1 "
+                       f"FROM ({numbers} >= %s AND a.n * 10000 + b.n < %s AND (a.n * 10000 + b.n) %% 10 = 0) AS t",
+                       (staff, staff, staff, start, end))
+        connection.commit()
+        print(f"seeded {end}/{publications} publications")
+    cursor.execute("DROP TABLE bench_numbers")
+    cursor.close()
+
+
+def set_indexes(connection, present):
+    cursor = connection.cursor()
+    if present:
+        statements = list(sql_statements(read_script("id_list_indexes.sql")))
+    else:
+        statements = [f"ALTER TABLE {table} DROP INDEX {index}" for table, index in INDEXES]
+    for statement in statements:
+        try:
+            cursor.execute(statement)
+        except mysql.connector.Error as e:
+            # 1061: το ευρετήριο υπάρχει ήδη, 1091: δεν υπάρχει
+            if e.errno not in (1061, 1091):
+                raise
+    cursor.close()
+
+
+def load_procedures(connection, text):
+    cursor = connection.cursor()
+    for statement in sql_statements(text):
+        match = re.match(r"CREATE PROCEDURE\s+(\w+)", statement)
+        if match and match.group(1) in PROCEDURES:
+            cursor.execute(f"DROP PROCEDURE IF EXISTS {match.group(1)}")
+            cursor.execute(statement)
+    cursor.close()
+
+
+def resolve_revision(revision):
+    return subprocess.run(["git", "rev-parse", "--verify", f"{revision}^{{commit}}"], cwd=ROOT,
+                          capture_output=True, text=True, check=True).stdout.strip()
+
+
+def procedures_at(revision):
+    return subprocess.run(["git", "show", f"{revision}:Database/procedures.sql"], cwd=ROOT,
+                          capture_output=True, text=True, check=True).stdout
+
+
+def calls(connection):
+    cursor = connection.cursor()
+    cursor.execute("SELECT department_id FROM departments ORDER BY department_id")
+    departments = ",".join(str(row[0]) for row in cursor.fetchall())
+    cursor.execute("SELECT role_id FROM roles ORDER BY role_id")
+    roles = ",".join(str(row[0]) for row in cursor.fetchall())
+    cursor.execute("SELECT MAX(staff_id) FROM staff")
+    max_staff_id = cursor.fetchone()[0]
+    cursor.close()
+    sample = random.Random(0).sample(range(1, max_staff_id + 1), min(500, max_staff_id))
+    some_departments = ",".join(departments.split(",")[:3])
+    some_roles = ",".join(roles.split(",")[:2])
+    return [
+        ("get_all_staff_summary", (some_departments, some_roles), "3 depts x 2 roles"),
+        ("get_all_staff_summary", (departments, roles), "all depts x roles"),
+        ("get_department_stats_by_roles", (roles,), "all roles"),
+        ("get_department_stats_by_depts_and_roles", (departments, roles), "all depts x roles"),
+        ("get_overall_stats_by_staff_ids", (",".join(map(str, sample)),), f"{len(sample)} staff"),
+    ]
+
+
+def time_calls(connection, repeat):
+    timings = []
+    for procedure, args, label in calls(connection):
+        samples = []
+        for _ in range(repeat):
+            cursor = connection.cursor()
+            start = perf_counter()
+            cursor.callproc(procedure, args)
+            for result in cursor.stored_results():
+                result.fetchall()
+            samples.append(perf_counter() - start)
+            cursor.close()
+        timings.append((f"{procedure} ({label})", statistics.median(samples)))
+    return timings
+
+
+def run(database, before_ref, repeat, seed_args=None, recompute=False):
+    connection = connect()
+    if seed_args:
+        seed(connection, database, *seed_args)
+    connection.database = database
+    if seed_args or recompute:
+        gs.recompute_statistics(connection)
+
+    set_indexes(connection, present=False)
+    load_procedures(connection, procedures_at(before_ref))
+    before = time_calls(connection, repeat)
+
+    set_indexes(connection, present=True)
+    load_procedures(connection, read_script("procedures.sql"))
+    after = time_calls(connection, repeat)
+    connection.close()
+
+    print(f"median of {repeat} calls, before = {before_ref}, after = working tree")
+    print(f"{'procedure':<68}{'before (ms)':>13}{'after (ms)':>13}")
+    for (label, before_time), (_, after_time) in zip(before, after):
+        print(f"{label:<68}{before_time * 1000:>13.1f}{after_time * 1000:>13.1f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--database", default="citations_bench", help="scratch database (dropped by --seed)")
+    parser.add_argument("--before-ref", default="HEAD~1",
+                        help="git revision whose procedures are timed as 'before' (default: HEAD~1)")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--seed", action="store_true", help="(re)create and fill the scratch database")
+    parser.add_argument("--recompute", action="store_true", help="refill the aggregate tables of the scratch database")
+    parser.add_argument("--staff", type=int, default=50000)
+    parser.add_argument("--publications", type=int, default=5000000)
+    parser.add_argument("--departments", type=int, default=40)
+    parser.add_argument("--roles", type=int, default=6)
+    args = parser.parse_args()
+    seed_args = (args.staff, args.publications, args.departments, args.roles) if args.seed else None
+    run(args.database, resolve_revision(args.before_ref), args.repeat, seed_args, args.recompute)
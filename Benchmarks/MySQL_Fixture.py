@@ -0,0 +1,91 @@
+"""Scratch MySQL database for the benchmarks.
+
+create_fixture() copies the table definitions of the configured database (DB_DB) into an
+empty database. The repository does not ship the base schema, so this copy stands in for it.
+It then applies the scripts of Database/: the added tables and keys, the history triggers
+and the procedures. seed_staff() adds departments, roles and the staff to crawl.
+"""
+import os
+
+import mysql.connector
+from dotenv import load_dotenv
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+SCRIPTS = ["crawl_state.sql", "publication_fingerprints.sql", "aggregates.sql", "citations_per_year_unique_keys.sql",
+           "id_list_indexes.sql", "change_feed_offsets.sql", "triggers.txt", "procedures.sql"]
+# Ήδη υπάρχει: πίνακας, στήλη, κλειδί, procedure, trigger, foreign key (αντιγράφηκαν από την πηγή)
+ALREADY_EXISTS = {1050, 1060, 1061, 1304, 1359, 1826}
+
+
+def sql_statements(text):
+    """Statements of a mysql client script, honouring DELIMITER and skipping `use`."""
+    delimiter = ";"
+    lines = []
+    for line in text.splitlines():
+        stripped = line.strip()
+        if stripped.upper().startswith("DELIMITER "):
+            delimiter = stripped.split()[1]
+            continue
+        if stripped.lower().startswith("use ") or (not lines and (not stripped or stripped.startswith("--"))):
+            continue
+        lines.append(line)
+        if stripped.endswith(delimiter):
+            yield "\n".join(lines).strip()[:-len(delimiter)]
+            lines = []
+
+
+def read_script(name):
+    with open(os.path.join(ROOT, "Database", name), encoding="utf-8") as file:
+        return file.read()
+
+
+def connect(database=None):
+    load_dotenv()
+    return mysql.connector.connect(host=os.getenv("DB_HOST"), user=os.getenv("DB_USER"),
+                                   password=os.getenv("DB_PASSWORD"), database=database, charset="utf8mb4",
+                                   collation="utf8mb4_unicode_ci")
+
+
+def run_script(connection, text):
+    cursor = connection.cursor()
+    for statement in sql_statements(text):
+        try:
+            cursor.execute(statement)
+        except mysql.connector.Error as e:
+            if e.errno not in ALREADY_EXISTS:
+                raise
+    connection.commit()
+    cursor.close()
+
+
+def create_fixture(connection, database, source=None):
+    """(Re)creates `database` with the tables of `source` (default DB_DB) and the Database/ scripts."""
+    source = source or os.getenv("DB_DB")
+    cursor = connection.cursor()
+    cursor.execute(f"SHOW FULL TABLES FROM {source} WHERE Table_type = 'BASE TABLE'")
+    tables = [row[0] for row in cursor.fetchall()]
+    cursor.execute(f"DROP DATABASE IF EXISTS {database}")
+    cursor.execute(f"CREATE DATABASE {database}")
+    for table in tables:
+        cursor.execute(f"CREATE TABLE {database}.{table} LIKE {source}.{table}")
+    cursor.close()
+    connection.database = database
+    for script in SCRIPTS:
+        run_script(connection, read_script(script))
+
+
+def seed_staff(connection, staff, departments=4, roles=3):
+    """Adds `staff` ((scholar_id, first_name, last_name) tuples) spread over synthetic departments and roles."""
+    cursor = connection.cursor()
+    cursor.executemany("INSERT INTO departments (department_id, short_code, department_title, university) "
+                       "VALUES (%s, %s, %s, %s)",
+                       [(n, f"D{n}", f"Department {n}", "Benchmark University") for n in range(1, departments + 1)])
+    cursor.executemany("INSERT INTO roles (role_id, role_title) VALUES (%s, %s)",
+                       [(n, f"Role {n}") for n in range(1, roles + 1)])
+    cursor.executemany("INSERT INTO staff (staff_id, scholar_id, first_name, last_name) VALUES (%s, %s, %s, %s)",
+                       [(n, scholar_id, first_name, last_name)
+                        for n, (scholar_id, first_name, last_name) in enumerate(staff, start=1)])
+    cursor.executemany("INSERT INTO staff_dept_role (staff_id, department_id, role_id) VALUES (%s, %s, %s)",
+                       [(n, n % departments + 1, n // departments % roles + 1) for n in range(1, len(staff) + 1)])
+    connection.commit()
+    cursor.close()
@@ -0,0 +1,232 @@
+"""Synthetic Google Scholar profiles and publication pages, served over local HTTP.
+
+Every page is generated from (seed, scholar_id, epoch), so two runs with the same settings
+see the same profiles. The markup keeps the ids and nesting that Google_Scholar_Scrape's
+parsers read: the statistics table, the citations-per-year graphs, the publication rows with
+cstart/pagesize paging, and the fields of the publication pages. Raising `epoch` simulates a
+later crawl: some publications gain citations and every profile gains a new publication.
+
+    python Benchmarks/Synthetic_Scholar.py --profiles 20 --port 8765
+"""
+import argparse
+import html
+import math
+import random
+import threading
+from datetime import date
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+FIRST_NAMES = ["Georgios", "Ioannis", "Konstantinos", "Dimitrios", "Nikolaos", "Maria", "Eleni", "Aikaterini",
+               "Vasiliki", "Sofia", "Christos", "Panagiotis", "Athanasios", "Evangelia", "Anastasia", "Michail"]
+LAST_NAMES = ["Papadopoulos", "Georgiou", "Nikolaidis", "Karagiannis", "Vlachos", "Oikonomou", "Dimitriou",
+              "Antoniou", "Papageorgiou", "Makris", "Theodorou", "Alexiou", "Sidiropoulos", "Ioannidis"]
+CO_AUTHORS = ["J Smith", "A Kumar", "L Chen", "M Rossi", "K Müller", "S Tanaka", "P Dubois", "R Silva",
+              "E Johansson", "T Nowak", "H Kim", "D García"]
+VENUES = ["Journal of Synthetic Data", "IEEE Transactions on Benchmarks", "Information Sciences",
+          "Expert Systems with Applications", "Proceedings of the Workshop on Load Testing"]
+PUBLISHERS = ["Elsevier", "IEEE", "Springer", "ACM"]
+
+
+def graph_html(graph, year_class, bar_class):
+    """Year labels and bars in Scholar's layout: bars carry z-index 1 for the latest year."""
+    years = sorted(graph)
+    spans = "".join(f'<span class="{year_class}">{year}</span>' for year in years)
+    bars = "".join(f'<a href="javascript:void(0)" class="{bar_class}" style="z-index:{len(years) - i}">'
+                   f'<span class="{bar_class}l">{graph[year]}</span></a>'
+                   for i, year in enumerate(years) if graph[year])
+    return spans + bars
+
+
+class SyntheticScholar:
+
+    def __init__(self, profiles=50, papers=120, citation_alpha=1.6, graph_years=15, seed=0):
+        self.profiles = profiles
+        self.papers = papers
+        self.citation_alpha = citation_alpha
+        self.graph_years = graph_years
+        self.seed = seed
+        self.epoch = 0
+        self.current_year = date.today().year
+        self.cache = {}
+        self.lock = threading.Lock()
+        self.names = {scholar_id: f"{first} {last}" for scholar_id, first, last in self.staff()}
+
+    def staff(self):
+        """(scholar_id, first_name, last_name) of every synthetic profile."""
+        result = []
+        for n in range(self.profiles):
+            rng = random.Random(f"{self.seed}:name:{n}")
+            result.append((f"SYNTH{n:06d}AAAJ", rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)))
+        return result
+
+    def set_epoch(self, epoch):
+        with self.lock:
+            self.epoch = epoch
+            self.cache.clear()
+
+    def profile(self, scholar_id):
+        with self.lock:
+            if scholar_id not in self.cache:
+                self.cache[scholar_id] = self._generate(scholar_id)
+            return self.cache[scholar_id]
+
+    def _generate(self, scholar_id):
+        names = self.names
+        if scholar_id not in names:
+            return None
+        rng = random.Random(f"{self.seed}:{scholar_id}")
+        count = max(1, int(rng.lognormvariate(math.log(self.papers), 0.6)))
+        first_year = self.current_year - rng.randint(self.graph_years, self.graph_years + 20)
+        publications = []
+        for n in range(count + self.epoch):
+            publication_rng = random.Random(f"{self.seed}:{scholar_id}:{n}")
+            year = self.current_year if n >= count else publication_rng.randint(first_year, self.current_year)
+            citations = int((publication_rng.paretovariate(self.citation_alpha) - 1) * 15)
+            # Σε κάθε εποχή ένα μέρος των δημοσιεύσεων παίρνει νέες αναφορές
+            for epoch in range(1, self.epoch + 1):
+                if random.Random(f"{self.seed}:{scholar_id}:{n}:{epoch}").random() < 0.2:
+                    citations += 1 + citations // 10
+            graph = self._spread(publication_rng, citations, max(year, self.current_year - self.graph_years))
+            authors = publication_rng.sample(CO_AUTHORS, publication_rng.randint(1, 5))
+            first, last = names[scholar_id].split(" ", 1)
+            authors.insert(publication_rng.randint(0, len(authors)), f"{first[0]} {last}")
+            publications.append({
+                'id': f"{n:04d}{publication_rng.randrange(16 ** 8):08x}",
+                'title': f"Synthetic study {n} of {scholar_id.lower()}",
+                'year': year,
+                'citations': citations,
+                'graph': graph,
+                'authors': ", ".join(authors),
+                'venue': publication_rng.choice(VENUES),
+                'publisher': publication_rng.choice(PUBLISHERS),
+                'date': f"{year}/{publication_rng.randint(1, 12)}/{publication_rng.randint(1, 28)}",
+            })
+        publications.sort(key=lambda publication: (-publication['citations'], publication['id']))
+
+        staff_graph = {}
+        for publication in publications:
+            for year, citations in publication['graph'].items():
+                staff_graph[year] = staff_graph.get(year, 0) + citations
+        since = self.current_year - 5
+        all_citations = sorted((publication['citations'] for publication in publications), reverse=True)
+        recent = sorted((sum(c for y, c in publication['graph'].items() if y >= since)
+                         for publication in publications), reverse=True)
+        return {
+            'name': names[scholar_id],
+            'publications': publications,
+            'by_id': {publication['id']: publication for publication in publications},
+            'graph': staff_graph,
+            'stats': [
+                ("Citations", sum(all_citations), sum(recent)),
+                ("h-index", sum(1 for i, c in enumerate(all_citations) if c >= i + 1),
+                 sum(1 for i, c in enumerate(recent) if c >= i + 1)),
+                ("i10-index", sum(1 for c in all_citations if c >= 10), sum(1 for c in recent if c >= 10)),
+            ],
+        }
+
+    def _spread(self, rng, citations, first_year):
+        """Citations per year from first_year to the current year, growing towards the present."""
+        years = list(range(first_year, self.current_year + 1))
+        weights = [rng.random() * (i + 1) for i in range(len(years))]
+        graph = dict.fromkeys(years, 0)
+        for year in rng.choices(years, weights=weights, k=citations) if citations else []:
+            graph[year] += 1
+        return graph
+
+    def profile_page(self, scholar_id, cstart=0, pagesize=20):
+        profile = self.profile(scholar_id)
+        if profile is None:
+            return None
+        rows = "".join(
+            '<tr class="gsc_a_tr"><td class="gsc_a_t">'
+            f'<a href="/citations?view_op=view_citation&amp;hl=en&amp;user={scholar_id}'
+            f'&amp;citation_for_view={scholar_id}:{publication["id"]}" class="gsc_a_at">{html.escape(publication["title"])}</a>'
+            f'<div class="gs_gray">{html.escape(publication["authors"])}</div></td>'
+            f'<td class="gsc_a_c"><a class="gsc_a_ac gs_ibl">{publication["citations"] or ""}</a></td>'
+            f'<td class="gsc_a_y"><span class="gsc_a_h gsc_a_hc gs_ibl">{publication["year"]}</span></td></tr>'
+            for publication in profile['publications'][cstart:cstart + pagesize])
+        stats = "".join(f'<tr><td class="gsc_rsb_sc1">{label}</td><td class="gsc_rsb_std">{all_value}</td>'
+                        f'<td class="gsc_rsb_std">{recent_value}</td></tr>'
+                        for label, all_value, recent_value in profile['stats'])
+        return ('<!doctype html><html><head><title>Synthetic Scholar</title></head><body>'
+                f'<div id="gsc_prf_in">{html.escape(profile["name"])}</div>'
+                f'<table id="gsc_rsb_st"><thead><tr><th></th><th>All</th><th>Since {self.current_year - 5}</th></tr>'
+                f'</thead><tbody>{stats}</tbody></table>'
+                '<div id="gsc_rsb_cit"><div><div></div><div></div><div class="gsc_md_hist_w">'
+                f'<div class="gsc_md_hist_b">{graph_html(profile["graph"], "gsc_g_t", "gsc_g_a")}</div>'
+                '</div></div></div>'
+                f'<table id="gsc_a_t"><tbody id="gsc_a_b">{rows}</tbody></table>'
+                '</body></html>')
+
+    def publication_page(self, scholar_id, publication_id):
+        profile = self.profile(scholar_id)
+        publication = profile and profile['by_id'].get(publication_id)
+        if publication is None:
+            return None
+        fields = [("Authors", html.escape(publication['authors'])), ("Publication date", publication['date']),
+                  ("Journal", html.escape(publication['venue'])), ("Publisher", publication['publisher']),
+                  ("Total citations", f'<div><a>Cited by {publication["citations"]}</a></div>'
+                                      f'<div id="gsc_oci_graph_bars">'
+                                      f'{graph_html(publication["graph"], "gsc_oci_g_t", "gsc_oci_g_a")}</div>')]
+        table = "".join(f'<div class="gs_scl"><div class="gsc_oci_field">{field}</div>'
+                        f'<div class="gsc_oci_value">{value}</div></div>' for field, value in fields)
+        return ('<!doctype html><html><head><title>Synthetic Scholar</title></head><body>'
+                f'<div id="gsc_oci_title"><a class="gsc_oci_title_link">{html.escape(publication["title"])}</a></div>'
+                f'<div id="gsc_oci_table">{table}</div></body></html>')
+
+
+class ScholarHandler(BaseHTTPRequestHandler):
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        query = {key: values[-1] for key, values in parse_qs(url.query).items()}
+        page = None
+        if url.path == "/citations" and query.get("view_op") == "list_works":
+            page = self.server.scholar.profile_page(query.get("user", ""), int(query.get("cstart", 0)),
+                                                    int(query.get("pagesize", 20)))
+        elif url.path == "/citations" and query.get("view_op") == "view_citation":
+            user, _, publication_id = query.get("citation_for_view", "").partition(":")
+            page = self.server.scholar.publication_page(user, publication_id)
+        body = (page or "<html><body>Not found</body></html>").encode("utf-8")
+        self.send_response(200 if page else 404)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+        self.server.requests += 1
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_server(scholar, host="127.0.0.1", port=0):
+    """Serves `scholar` from a background thread. Returns (server, base_url)."""
+    server = ThreadingHTTPServer((host, port), ScholarHandler)
+    server.daemon_threads = True
+    server.scholar = scholar
+    server.requests = 0
+    threading.Thread(target=server.serve_forever, name="synthetic-scholar", daemon=True).start()
+    return server, f"http://{host}:{server.server_address[1]}"
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--profiles", type=int, default=50)
+    parser.add_argument("--papers", type=int, default=120, help="median publications per profile")
+    parser.add_argument("--citation-alpha", type=float, default=1.6, help="Pareto shape of citations per publication")
+    parser.add_argument("--graph-years", type=int, default=15, help="years in the citations-per-year graphs")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--epoch", type=int, default=0)
+    parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args()
+    scholar = SyntheticScholar(args.profiles, args.papers, args.citation_alpha, args.graph_years, args.seed)
+    scholar.set_epoch(args.epoch)
+    server, base_url = start_server(scholar, port=args.port)
+    print(f"Serving {args.profiles} synthetic profiles at {base_url} (SCHOLAR_BASE_URL), Ctrl+C to stop")
+    for scholar_id, first_name, last_name in scholar.staff()[:3]:
+        print(f"  {base_url}/citations?view_op=list_works&hl=en&user={scholar_id}  {first_name} {last_name}")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
@@ -0,0 +1,100 @@
+-- =======================
+-- Aggregates
+-- =======================
+use citations_v2;
+
+-- Ανά μέλος προσωπικού, από τις αποθηκευμένες δημοσιεύσεις. Οι στήλες dated_* μετρούν μόνο
+-- δημοσιεύσεις με έτος έως το τρέχον και μένουν NULL όταν δεν υπάρχει καμία.
+CREATE TABLE IF NOT EXISTS staff_aggregates (
+    staff_id INT NOT NULL,
+    publication_count INT NOT NULL DEFAULT 0,
+    publication_count_5y INT NOT NULL DEFAULT 0,
+    total_citations BIGINT NOT NULL DEFAULT 0,
+    total_citations_5y BIGINT NOT NULL DEFAULT 0,
+    age INT NULL,
+    dated_publication_count INT NULL,
+    dated_publication_count_5y INT NULL,
+    dated_citations BIGINT NULL,
+    dated_citations_5y BIGINT NULL,
+    dated_age INT NULL,
+    updated_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+    PRIMARY KEY (staff_id),
+    CONSTRAINT fk_staff_aggregates_staff FOREIGN KEY (staff_id) REFERENCES staff (staff_id) ON DELETE CASCADE
+);
+
+-- Ανά τμήμα και ρόλο: αθροίσματα (sum_), πλήθος μη κενών τιμών (n_), αθροίσματα τετραγώνων (sq_),
+-- ελάχιστα (min_) και μέγιστα (max_), ώστε οι procedures να συνδυάζουν οποιαδήποτε γραμμές
+-- σε μέσους όρους και τυπικές αποκλίσεις.
+CREATE TABLE IF NOT EXISTS department_role_aggregates (
+    department_id INT NOT NULL,
+    role_id INT NOT NULL,
+    staff_count INT NOT NULL DEFAULT 0,
+    total_pubs INT NOT NULL DEFAULT 0,
+    total_citations BIGINT NOT NULL DEFAULT 0,
+    sum_h_index BIGINT NOT NULL DEFAULT 0,
+    n_h_index INT NOT NULL DEFAULT 0,
+    sum_last_5_years_h_index BIGINT NOT NULL DEFAULT 0,
+    n_last_5_years_h_index INT NOT NULL DEFAULT 0,
+    sum_h_index_local BIGINT NOT NULL DEFAULT 0,
+    n_h_index_local INT NOT NULL DEFAULT 0,
+    sum_last_5_years_h_index_local BIGINT NOT NULL DEFAULT 0,
+    n_last_5_years_h_index_local INT NOT NULL DEFAULT 0,
+    sum_h_index_from_graph BIGINT NOT NULL DEFAULT 0,
+    n_h_index_from_graph INT NOT NULL DEFAULT 0,
+    sum_last_5_years_h_index_from_graph BIGINT NOT NULL DEFAULT 0,
+    n_last_5_years_h_index_from_graph INT NOT NULL DEFAULT 0,
+    sum_i10_index BIGINT NOT NULL DEFAULT 0,
+    n_i10_index INT NOT NULL DEFAULT 0,
+    sum_last_5_years_i10_index BIGINT NOT NULL DEFAULT 0,
+    n_last_5_years_i10_index INT NOT NULL DEFAULT 0,
+    sum_i10_index_local BIGINT NOT NULL DEFAULT 0,
+    n_i10_index_local INT NOT NULL DEFAULT 0,
+    sum_last_5_years_i10_index_local BIGINT NOT NULL DEFAULT 0,
+    n_last_5_years_i10_index_local INT NOT NULL DEFAULT 0,
+    sum_i10_index_from_graph BIGINT NOT NULL DEFAULT 0,
+    n_i10_index_from_graph INT NOT NULL DEFAULT 0,
+    sum_last_5_years_i10_index_from_graph BIGINT NOT NULL DEFAULT 0,
+    n_last_5_years_i10_index_from_graph INT NOT NULL DEFAULT 0,
+    sum_dated_publication_count BIGINT NOT NULL DEFAULT 0,
+    n_dated_publication_count INT NOT NULL DEFAULT 0,
+    sum_dated_publication_count_5y BIGINT NOT NULL DEFAULT 0,
+    n_dated_publication_count_5y INT NOT NULL DEFAULT 0,
+    sum_dated_citations BIGINT NOT NULL DEFAULT 0,
+    n_dated_citations INT NOT NULL DEFAULT 0,
+    sum_dated_citations_5y BIGINT NOT NULL DEFAULT 0,
+    n_dated_citations_5y INT NOT NULL DEFAULT 0,
+    sum_dated_age BIGINT NOT NULL DEFAULT 0,
+    n_dated_age INT NOT NULL DEFAULT 0,
+    sq_dated_publication_count BIGINT NOT NULL DEFAULT 0,
+    sq_dated_citations BIGINT NOT NULL DEFAULT 0,
+    min_dated_publication_count INT NULL,
+    max_dated_publication_count INT NULL,
+    min_dated_citations BIGINT NULL,
+    max_dated_citations BIGINT NULL,
+    min_h_index INT NULL,
+    max_h_index INT NULL,
+    min_i10_index INT NULL,
+    max_i10_index INT NULL,
+    updated_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+    PRIMARY KEY (department_id, role_id),
+    CONSTRAINT fk_department_role_aggregates_department FOREIGN KEY (department_id)
+        REFERENCES departments (department_id) ON DELETE CASCADE,
+    CONSTRAINT fk_department_role_aggregates_role FOREIGN KEY (role_id)
+        REFERENCES roles (role_id) ON DELETE CASCADE
+);
+
+-- Ανά τμήμα και σύνολο ρόλων του (role_set: ταξινομημένα ids χωρισμένα με κόμμα): μέλη και
+-- δημοσιεύσεις χωρίς διπλομετρήσεις, γιατί ένα μέλος με δύο ρόλους ή μια δημοσίευση με
+-- συγγραφείς σε δύο ρόλους δεν αθροίζονται από τις γραμμές department_role_aggregates.
+CREATE TABLE IF NOT EXISTS department_role_set_counts (
+    department_id INT NOT NULL,
+    role_set VARCHAR(255) NOT NULL,
+    staff_count INT NOT NULL DEFAULT 0,
+    total_pubs INT NOT NULL DEFAULT 0,
+    updated_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+    PRIMARY KEY (department_id, role_set),
+    CONSTRAINT fk_department_role_set_counts_department FOREIGN KEY (department_id)
+        REFERENCES departments (department_id) ON DELETE CASCADE
+);
+
+-- Οι πίνακες γεμίζουν με: python Google_Scholar_Scrape.py --recompute
@@ -0,0 +1,14 @@
+-- =======================
+-- Change Feed Offsets
+-- =======================
+use citations_v2;
+
+-- Για κάθε καταναλωτή του Google_Scholar_Changes.ChangeFeed, το τελευταίο id που διάβασε
+-- από κάθε πίνακα *_records (Database/triggers.txt)
+CREATE TABLE IF NOT EXISTS change_feed_offsets (
+    consumer VARCHAR(64) NOT NULL,
+    records_table VARCHAR(64) NOT NULL,
+    last_record_id BIGINT NOT NULL DEFAULT 0,
+    updated_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+    PRIMARY KEY (consumer, records_table)
+);
@@ -0,0 +1,24 @@
+-- =======================
+-- Citations Per Year Unique Keys
+-- =======================
+use citations_v2;
+
+-- Κρατά μόνο την πιο πρόσφατη εγγραφή για κάθε (staff_id, year) / (publication_id, year)
+DELETE older FROM staff_citations_per_year older
+JOIN staff_citations_per_year newer
+  ON newer.staff_id = older.staff_id
+ AND newer.`year` = older.`year`
+ AND newer.staff_citations_per_year_id > older.staff_citations_per_year_id;
+
+DELETE older FROM publication_citations_per_year older
+JOIN publication_citations_per_year newer
+  ON newer.publication_id = older.publication_id
+ AND newer.`year` = older.`year`
+ AND newer.publication_citations_per_year_id > older.publication_citations_per_year_id;
+
+-- Απαιτούνται από το INSERT ... ON DUPLICATE KEY UPDATE του GraphSync
+ALTER TABLE staff_citations_per_year
+  ADD UNIQUE KEY uq_staff_citations_per_year (staff_id, `year`);
+
+ALTER TABLE publication_citations_per_year
+  ADD UNIQUE KEY uq_publication_citations_per_year (publication_id, `year`);
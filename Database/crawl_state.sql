@@ -0,0 +1,19 @@
+-- =======================
+-- Crawl State
+-- =======================
+use citations_v2;
+
+CREATE TABLE IF NOT EXISTS crawl_state (
+    staff_id INT NOT NULL,
+    status ENUM('in_progress', 'done', 'failed') NOT NULL DEFAULT 'in_progress',
+    last_success DATETIME NULL,
+    last_publication_url VARCHAR(512) NULL,
+    last_full_scrape DATETIME NULL,
+    updated_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+    PRIMARY KEY (staff_id),
+    KEY idx_crawl_state_last_success (last_success),
+    CONSTRAINT fk_crawl_state_staff FOREIGN KEY (staff_id) REFERENCES staff (staff_id) ON DELETE CASCADE
+);
+
+-- Για βάσεις που δημιουργήθηκαν πριν από τη στήλη last_full_scrape:
+-- ALTER TABLE crawl_state ADD COLUMN last_full_scrape DATETIME NULL AFTER last_publication_url;
@@ -0,0 +1,10 @@
+-- =======================
+-- Id List Indexes
+-- =======================
+use citations_v2;
+
+-- get_all_staff_summary συνδέει τη λίστα (department_id, role_id) με το staff_dept_role
+ALTER TABLE staff_dept_role ADD INDEX idx_staff_dept_role_dept_role_staff (department_id, role_id, staff_id);
+
+-- Δημοσιεύσεις ανά μέλος (aggregates, select_all, select_publications_by_staff) χωρίς πρόσβαση στον πίνακα
+ALTER TABLE publications_staff ADD INDEX idx_publications_staff_staff_publication (staff_id, publication_id);
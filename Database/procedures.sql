@@ -254,56 +254,20 @@ DELIMITER $$
 DROP PROCEDURE IF EXISTS get_all_basic_stats_for_a_staff $$
 CREATE PROCEDURE get_all_basic_stats_for_a_staff(IN p_staff_id INT)
 BEGIN
+    -- Αναζητήσεις πρωτεύοντος κλειδιού στα staff_aggregates (Database/aggregates.sql) και staff_statistics
     SELECT
-        -- Total publications
-        (SELECT COUNT(*) 
-         FROM publications_staff 
-         WHERE staff_id = p_staff_id) AS publication_count,
-
-        -- Publications in last 5 years
-        (SELECT COUNT(*) 
-         FROM publications p
-         JOIN publications_staff ps ON p.publication_id = ps.publication_id
-         WHERE ps.staff_id = p_staff_id AND publication_year >= YEAR(CURDATE()) - 5
-        ) AS publication_count_5y,
-
-        -- Total citations
-        (SELECT SUM(citations) 
-         FROM publications p
-         JOIN publications_staff ps ON p.publication_id = ps.publication_id
-         WHERE ps.staff_id = p_staff_id
-        ) AS total_citations,
-
-        -- Citations last 5y
-        (SELECT SUM(citations) 
-         FROM publications p
-         JOIN publications_staff ps ON p.publication_id = ps.publication_id
-         WHERE ps.staff_id = p_staff_id AND publication_year >= YEAR(CURDATE()) - 5
-        ) AS total_citations_5y,
-
-        -- h-index
-        (SELECT h_index 
-         FROM staff_statistics 
-         WHERE staff_id = p_staff_id
-        ) AS h_index,
-
-        -- h-index 5y
-        (SELECT last_5_years_h_index 
-         FROM staff_statistics 
-         WHERE staff_id = p_staff_id
-        ) AS h_index_5y,
-
-        -- i10-index
-        (SELECT i10_index 
-         FROM staff_statistics 
-         WHERE staff_id = p_staff_id
-        ) AS i10_index,
-
-        -- i10-index 5y
-        (SELECT last_5_years_i10_index 
-         FROM staff_statistics 
-         WHERE staff_id = p_staff_id
-        ) AS i10_index_5y;
+        sa.publication_count,
+        sa.publication_count_5y,
+        sa.total_citations,
+        sa.total_citations_5y,
+
+        ss.h_index,
+        ss.last_5_years_h_index AS h_index_5y,
+        ss.i10_index,
+        ss.last_5_years_i10_index AS i10_index_5y
+    FROM (SELECT p_staff_id AS staff_id) AS k
+    LEFT JOIN staff_aggregates sa ON sa.staff_id = k.staff_id
+    LEFT JOIN staff_statistics ss ON ss.staff_id = k.staff_id;
 END $$
 
 DELIMITER ;
@@ -342,33 +306,21 @@ BEGIN
         ss.i10_index_from_graph,
         ss.last_5_years_i10_index_from_graph,
 
-        IFNULL(pub_stats.age, 0) AS age,
-        IFNULL(pub_stats.total_publications, 0) AS total_publications,
-        IFNULL(pub_stats.total_publications_5y, 0) AS total_publications_5y
+        IFNULL(sa.age, 0) AS age,
+        IFNULL(sa.publication_count, 0) AS total_publications,
+        IFNULL(sa.publication_count_5y, 0) AS total_publications_5y
 
-    FROM staff s
+    -- Τα ids γίνονται πίνακες (JSON_TABLE), ώστε η σύνδεση να χρησιμοποιεί το ευρετήριο
+    -- staff_dept_role (department_id, role_id, staff_id) αντί για πλήρη σάρωση
+    FROM (SELECT DISTINCT department_id FROM JSON_TABLE(CONCAT('[', dept_ids, ']'), '$[*]' COLUMNS (department_id INT PATH '$')) AS jt) AS dept_list
+    CROSS JOIN (SELECT DISTINCT role_id FROM JSON_TABLE(CONCAT('[', role_ids, ']'), '$[*]' COLUMNS (role_id INT PATH '$')) AS jt) AS role_list
 
-    INNER JOIN staff_dept_role sdr ON s.staff_id = sdr.staff_id
+    INNER JOIN staff_dept_role sdr
+        ON sdr.department_id = dept_list.department_id AND sdr.role_id = role_list.role_id
+    INNER JOIN staff s ON s.staff_id = sdr.staff_id
     LEFT JOIN staff_statistics ss ON s.staff_id = ss.staff_id
 
-    LEFT JOIN (
-        SELECT 
-            ps.staff_id,
-            MAX(p.publication_year) - MIN(p.publication_year) AS age,
-            COUNT(DISTINCT ps.publication_id) AS total_publications,
-            SUM(CASE 
-                    WHEN p.publication_year >= YEAR(CURDATE()) - 5 
-                    THEN 1 ELSE 0 
-                END
-            ) AS total_publications_5y
-        FROM publications p
-        JOIN publications_staff ps ON p.publication_id = ps.publication_id
-        GROUP BY ps.staff_id
-    ) AS pub_stats ON pub_stats.staff_id = s.staff_id
-
-    WHERE 
-        FIND_IN_SET(sdr.department_id, dept_ids)
-        AND FIND_IN_SET(sdr.role_id, role_ids);
+    LEFT JOIN staff_aggregates sa ON sa.staff_id = s.staff_id;
 END $$
 
 DELIMITER ;
@@ -442,63 +394,63 @@ DELIMITER $$
 DROP PROCEDURE IF EXISTS get_department_stats_by_roles $$
 CREATE PROCEDURE get_department_stats_by_roles(IN role_ids TEXT)
 BEGIN
+    -- Συνδυασμός των γραμμών department_role_aggregates (Database/aggregates.sql) των ρόλων
     SELECT
         d.department_id,
         d.department_title,
 
-        COUNT(DISTINCT sdr.staff_id) AS staff_count,
+        -- Μέλη και δημοσιεύσεις σε περισσότερους από έναν ρόλους μετρώνται μία φορά
+        MAX(c.staff_count) AS staff_count,
 
-        COUNT(DISTINCT ps.publication_id) AS total_pubs,
-        SUM(p.citations) AS total_citations,
+        MAX(c.total_pubs) AS total_pubs,
+        SUM(a.total_citations) AS total_citations,
 
         -- Μέσοι όροι
-        ROUND(AVG(ss.h_index), 2) AS avg_h_index,
-        ROUND(AVG(ss.h_index_local), 2) AS avg_h_index_local,
-        ROUND(AVG(ss.h_index_from_graph), 2) AS avg_h_index_from_graph,
+        ROUND(SUM(a.sum_h_index) / NULLIF(SUM(a.n_h_index), 0), 2) AS avg_h_index,
+        ROUND(SUM(a.sum_h_index_local) / NULLIF(SUM(a.n_h_index_local), 0), 2) AS avg_h_index_local,
+        ROUND(SUM(a.sum_h_index_from_graph) / NULLIF(SUM(a.n_h_index_from_graph), 0), 2) AS avg_h_index_from_graph,
 
-        ROUND(AVG(ss.i10_index), 2) AS avg_i10_index,
-        ROUND(AVG(ss.i10_index_local), 2) AS avg_i10_index_local,
-        ROUND(AVG(ss.i10_index_from_graph), 2) AS avg_i10_index_from_graph,
+        ROUND(SUM(a.sum_i10_index) / NULLIF(SUM(a.n_i10_index), 0), 2) AS avg_i10_index,
+        ROUND(SUM(a.sum_i10_index_local) / NULLIF(SUM(a.n_i10_index_local), 0), 2) AS avg_i10_index_local,
+        ROUND(SUM(a.sum_i10_index_from_graph) / NULLIF(SUM(a.n_i10_index_from_graph), 0), 2) AS avg_i10_index_from_graph,
 
         -- Stats per staff
-        ROUND(AVG(staff_stats.total_pubs), 2) AS avg_pubs,
-        ROUND(AVG(staff_stats.total_citations), 2) AS avg_citations,
-        ROUND(AVG(staff_stats.age), 2) AS avg_age,
-
-        ROUND(STDDEV(staff_stats.total_pubs) / NULLIF(AVG(staff_stats.total_pubs), 0), 2) AS cv_pubs,
-        ROUND(STDDEV(staff_stats.total_citations) / NULLIF(AVG(staff_stats.total_citations), 0), 2) AS cv_cits,
-
-        MAX(staff_stats.total_pubs) AS max_pubs,
-        MIN(staff_stats.total_pubs) AS min_pubs,
-
-        MAX(staff_stats.total_citations) AS max_cits,
-        MIN(staff_stats.total_citations) AS min_cits,
-
-        MAX(ss.h_index) AS max_h_index,
-        MIN(ss.h_index) AS min_h_index,
-
-        MAX(ss.i10_index) AS max_i10_index,
-        MIN(ss.i10_index) AS min_i10_index
-
-    FROM staff_dept_role sdr
-    INNER JOIN departments d ON sdr.department_id = d.department_id
-    INNER JOIN staff s ON sdr.staff_id = s.staff_id
-    LEFT JOIN staff_statistics ss ON ss.staff_id = s.staff_id
-
-    -- υπολογισμός per-staff stats για aggregation
-    LEFT JOIN (
-        SELECT
-            ps.staff_id,
-            COUNT(DISTINCT ps.publication_id) AS total_pubs,
-            SUM(p.citations) AS total_citations,
-            MAX(p.publication_year) - MIN(p.publication_year) AS age
-        FROM publications_staff ps
-        JOIN publications p ON p.publication_id = ps.publication_id
-        WHERE p.publication_year IS NOT NULL AND p.publication_year <= YEAR(CURDATE())
-        GROUP BY ps.staff_id
-    ) AS staff_stats ON staff_stats.staff_id = s.staff_id
-
-    WHERE FIND_IN_SET(sdr.role_id, role_ids)
+        ROUND(SUM(a.sum_dated_publication_count) / NULLIF(SUM(a.n_dated_publication_count), 0), 2) AS avg_pubs,
+        ROUND(SUM(a.sum_dated_citations) / NULLIF(SUM(a.n_dated_citations), 0), 2) AS avg_citations,
+        ROUND(SUM(a.sum_dated_age) / NULLIF(SUM(a.n_dated_age), 0), 2) AS avg_age,
+
+        -- Τυπική απόκλιση πληθυσμού από αθροίσματα τετραγώνων: sqrt(E[x^2] - E[x]^2)
+        ROUND(SQRT(GREATEST(SUM(a.sq_dated_publication_count) / NULLIF(SUM(a.n_dated_publication_count), 0)
+                            - POW(SUM(a.sum_dated_publication_count) / NULLIF(SUM(a.n_dated_publication_count), 0), 2), 0))
+              / NULLIF(SUM(a.sum_dated_publication_count) / NULLIF(SUM(a.n_dated_publication_count), 0), 0), 2) AS cv_pubs,
+        ROUND(SQRT(GREATEST(SUM(a.sq_dated_citations) / NULLIF(SUM(a.n_dated_citations), 0)
+                            - POW(SUM(a.sum_dated_citations) / NULLIF(SUM(a.n_dated_citations), 0), 2), 0))
+              / NULLIF(SUM(a.sum_dated_citations) / NULLIF(SUM(a.n_dated_citations), 0), 0), 2) AS cv_cits,
+
+        MAX(a.max_dated_publication_count) AS max_pubs,
+        MIN(a.min_dated_publication_count) AS min_pubs,
+
+        MAX(a.max_dated_citations) AS max_cits,
+        MIN(a.min_dated_citations) AS min_cits,
+
+        MAX(a.max_h_index) AS max_h_index,
+        MIN(a.min_h_index) AS min_h_index,
+
+        MAX(a.max_i10_index) AS max_i10_index,
+        MIN(a.min_i10_index) AS min_i10_index
+
+    FROM (SELECT DISTINCT role_id FROM JSON_TABLE(CONCAT('[', role_ids, ']'), '$[*]' COLUMNS (role_id INT PATH '$')) AS jt) AS role_list
+    INNER JOIN department_role_aggregates a ON a.role_id = role_list.role_id
+    INNER JOIN departments d ON a.department_id = d.department_id
+    -- Οι ρόλοι της επιλογής που έχει το τμήμα, ως κλειδί του department_role_set_counts
+    INNER JOIN (
+        SELECT sel.department_id, GROUP_CONCAT(sel.role_id ORDER BY sel.role_id SEPARATOR ',') AS role_key
+        FROM (SELECT DISTINCT role_id FROM JSON_TABLE(CONCAT('[', role_ids, ']'), '$[*]' COLUMNS (role_id INT PATH '$')) AS jt) AS role_filter
+        INNER JOIN department_role_aggregates sel ON sel.role_id = role_filter.role_id
+        GROUP BY sel.department_id
+    ) AS selected_roles ON selected_roles.department_id = d.department_id
+    LEFT JOIN department_role_set_counts c
+        ON c.department_id = selected_roles.department_id AND c.role_set = selected_roles.role_key
 
     GROUP BY d.department_id, d.department_title
     ORDER BY d.department_title;
@@ -515,92 +467,80 @@ CREATE PROCEDURE get_department_stats_by_depts_and_roles(
   IN role_ids TEXT
 )
 BEGIN
+    -- Συνδυασμός των γραμμών department_role_aggregates (Database/aggregates.sql) των τμημάτων και ρόλων
     SELECT
         d.department_id,
         d.short_code,
 
-        COUNT(DISTINCT sdr.staff_id) AS staff_count,
+        -- Μέλη και δημοσιεύσεις σε περισσότερους από έναν ρόλους μετρώνται μία φορά
+        MAX(c.staff_count) AS staff_count,
 
-        COUNT(DISTINCT pub_data.publication_id) AS total_pubs,
-        SUM(pub_data.citations) AS total_citations,
+        MAX(c.total_pubs) AS total_pubs,
+        SUM(a.total_citations) AS total_citations,
 
-        ROUND(AVG(ss.h_index), 1) AS avg_h_index,
-        ROUND(AVG(ss.last_5_years_h_index), 1) AS avg_h_index_5y,
+        ROUND(SUM(a.sum_h_index) / NULLIF(SUM(a.n_h_index), 0), 1) AS avg_h_index,
+        ROUND(SUM(a.sum_last_5_years_h_index) / NULLIF(SUM(a.n_last_5_years_h_index), 0), 1) AS avg_h_index_5y,
 
-        ROUND(AVG(ss.h_index_local), 1) AS avg_h_index_local,
-        ROUND(AVG(ss.last_5_years_h_index_local), 1) AS avg_h_index_local_5y,
+        ROUND(SUM(a.sum_h_index_local) / NULLIF(SUM(a.n_h_index_local), 0), 1) AS avg_h_index_local,
+        ROUND(SUM(a.sum_last_5_years_h_index_local) / NULLIF(SUM(a.n_last_5_years_h_index_local), 0), 1) AS avg_h_index_local_5y,
 
-        ROUND(AVG(ss.h_index_from_graph), 1) AS avg_h_index_from_graph,
-        ROUND(AVG(ss.last_5_years_h_index_from_graph), 1) AS avg_h_index_from_graph_5y,
+        ROUND(SUM(a.sum_h_index_from_graph) / NULLIF(SUM(a.n_h_index_from_graph), 0), 1) AS avg_h_index_from_graph,
+        ROUND(SUM(a.sum_last_5_years_h_index_from_graph) / NULLIF(SUM(a.n_last_5_years_h_index_from_graph), 0), 1) AS avg_h_index_from_graph_5y,
 
-        ROUND(AVG(ss.i10_index), 1) AS avg_i10_index,
-        ROUND(AVG(ss.last_5_years_i10_index), 1) AS avg_i10_index_5y,
+        ROUND(SUM(a.sum_i10_index) / NULLIF(SUM(a.n_i10_index), 0), 1) AS avg_i10_index,
+        ROUND(SUM(a.sum_last_5_years_i10_index) / NULLIF(SUM(a.n_last_5_years_i10_index), 0), 1) AS avg_i10_index_5y,
 
-        ROUND(AVG(ss.i10_index_local), 1) AS avg_i10_index_local,
-        ROUND(AVG(ss.last_5_years_i10_index_local), 1) AS avg_i10_index_local_5y,
+        ROUND(SUM(a.sum_i10_index_local) / NULLIF(SUM(a.n_i10_index_local), 0), 1) AS avg_i10_index_local,
+        ROUND(SUM(a.sum_last_5_years_i10_index_local) / NULLIF(SUM(a.n_last_5_years_i10_index_local), 0), 1) AS avg_i10_index_local_5y,
 
-        ROUND(AVG(ss.i10_index_from_graph), 1) AS avg_i10_index_from_graph,
-        ROUND(AVG(ss.last_5_years_i10_index_from_graph), 1) AS avg_i10_index_from_graph_5y,
+        ROUND(SUM(a.sum_i10_index_from_graph) / NULLIF(SUM(a.n_i10_index_from_graph), 0), 1) AS avg_i10_index_from_graph,
+        ROUND(SUM(a.sum_last_5_years_i10_index_from_graph) / NULLIF(SUM(a.n_last_5_years_i10_index_from_graph), 0), 1) AS avg_i10_index_from_graph_5y,
 
         -- Per-staff aggregation
-        ROUND(AVG(staff_stats.total_pubs), 1) AS avg_pubs,
-        ROUND(AVG(staff_stats.total_pubs_5y), 1) AS avg_pubs_5y,
-
-        ROUND(AVG(staff_stats.total_citations), 1) AS avg_citations,
-        ROUND(AVG(staff_stats.total_citations_5y), 1) AS avg_citations_5y,
-
-        ROUND(AVG(staff_stats.age), 2) AS avg_age,
-
-        ROUND(STDDEV(staff_stats.total_pubs) / NULLIF(AVG(staff_stats.total_pubs), 0) * 100, 1) AS cv_pubs,
-        ROUND(STDDEV(staff_stats.total_citations) / NULLIF(AVG(staff_stats.total_citations), 0) * 100, 1) AS cv_cits,
-
-        MAX(staff_stats.total_pubs) AS max_pubs,
-        MIN(staff_stats.total_pubs) AS min_pubs,
-
-        MAX(staff_stats.total_citations) AS max_cits,
-        MIN(staff_stats.total_citations) AS min_cits,
-
-        MAX(ss.h_index) AS max_h_index,
-        MIN(ss.h_index) AS min_h_index,
-
-        MAX(ss.i10_index) AS max_i10_index,
-        MIN(ss.i10_index) AS min_i10_index
-
-    FROM staff_dept_role sdr
-    INNER JOIN departments d ON sdr.department_id = d.department_id
-    INNER JOIN staff s ON sdr.staff_id = s.staff_id
-    LEFT JOIN staff_statistics ss ON ss.staff_id = s.staff_id
-
-    -- Publications joined for total pubs/citations
-    LEFT JOIN (
-        SELECT
-            ps.staff_id,
-            ps.publication_id,
-            p.citations
-        FROM publications_staff ps
-        JOIN publications p ON p.publication_id = ps.publication_id
-        WHERE p.publication_year IS NOT NULL AND p.publication_year <= YEAR(CURDATE())
-    ) AS pub_data ON pub_data.staff_id = s.staff_id
-
-    -- Aggregation per staff
-    LEFT JOIN (
-        SELECT
-            ps.staff_id,
-            COUNT(DISTINCT ps.publication_id) AS total_pubs,
-            SUM(CASE WHEN p.publication_year >= YEAR(CURDATE()) - 5 THEN 1 ELSE 0 END) AS total_pubs_5y,
-
-            SUM(p.citations) AS total_citations,
-            SUM(CASE WHEN p.publication_year >= YEAR(CURDATE()) - 5 THEN p.citations ELSE 0 END) AS total_citations_5y,
-
-            MAX(p.publication_year) - MIN(p.publication_year) AS age
-        FROM publications_staff ps
-        JOIN publications p ON p.publication_id = ps.publication_id
-        WHERE p.publication_year IS NOT NULL AND p.publication_year <= YEAR(CURDATE())
-        GROUP BY ps.staff_id
-    ) AS staff_stats ON staff_stats.staff_id = s.staff_id
-
-    WHERE FIND_IN_SET(sdr.role_id, role_ids)
-      AND FIND_IN_SET(sdr.department_id, dept_ids)
+        ROUND(SUM(a.sum_dated_publication_count) / NULLIF(SUM(a.n_dated_publication_count), 0), 1) AS avg_pubs,
+        ROUND(SUM(a.sum_dated_publication_count_5y) / NULLIF(SUM(a.n_dated_publication_count_5y), 0), 1) AS avg_pubs_5y,
+
+        ROUND(SUM(a.sum_dated_citations) / NULLIF(SUM(a.n_dated_citations), 0), 1) AS avg_citations,
+        ROUND(SUM(a.sum_dated_citations_5y) / NULLIF(SUM(a.n_dated_citations_5y), 0), 1) AS avg_citations_5y,
+
+        ROUND(SUM(a.sum_dated_age) / NULLIF(SUM(a.n_dated_age), 0), 2) AS avg_age,
+
+        -- Τυπική απόκλιση πληθυσμού από αθροίσματα τετραγώνων: sqrt(E[x^2] - E[x]^2)
+        ROUND(SQRT(GREATEST(SUM(a.sq_dated_publication_count) / NULLIF(SUM(a.n_dated_publication_count), 0)
+                            - POW(SUM(a.sum_dated_publication_count) / NULLIF(SUM(a.n_dated_publication_count), 0), 2), 0))
+              / NULLIF(SUM(a.sum_dated_publication_count) / NULLIF(SUM(a.n_dated_publication_count), 0), 0) * 100, 1) AS cv_pubs,
+        ROUND(SQRT(GREATEST(SUM(a.sq_dated_citations) / NULLIF(SUM(a.n_dated_citations), 0)
+                            - POW(SUM(a.sum_dated_citations) / NULLIF(SUM(a.n_dated_citations), 0), 2), 0))
+              / NULLIF(SUM(a.sum_dated_citations) / NULLIF(SUM(a.n_dated_citations), 0), 0) * 100, 1) AS cv_cits,
+
+        MAX(a.max_dated_publication_count) AS max_pubs,
+        MIN(a.min_dated_publication_count) AS min_pubs,
+
+        MAX(a.max_dated_citations) AS max_cits,
+        MIN(a.min_dated_citations) AS min_cits,
+
+        MAX(a.max_h_index) AS max_h_index,
+        MIN(a.min_h_index) AS min_h_index,
+
+        MAX(a.max_i10_index) AS max_i10_index,
+        MIN(a.min_i10_index) AS min_i10_index
+
+    FROM (SELECT DISTINCT department_id FROM JSON_TABLE(CONCAT('[', dept_ids, ']'), '$[*]' COLUMNS (department_id INT PATH '$')) AS jt) AS dept_list
+    CROSS JOIN (SELECT DISTINCT role_id FROM JSON_TABLE(CONCAT('[', role_ids, ']'), '$[*]' COLUMNS (role_id INT PATH '$')) AS jt) AS role_list
+    INNER JOIN department_role_aggregates a
+        ON a.department_id = dept_list.department_id AND a.role_id = role_list.role_id
+    INNER JOIN departments d ON a.department_id = d.department_id
+    -- Οι ρόλοι της επιλογής που έχει το τμήμα, ως κλειδί του department_role_set_counts
+    INNER JOIN (
+        SELECT sel.department_id, GROUP_CONCAT(sel.role_id ORDER BY sel.role_id SEPARATOR ',') AS role_key
+        FROM (SELECT DISTINCT department_id FROM JSON_TABLE(CONCAT('[', dept_ids, ']'), '$[*]' COLUMNS (department_id INT PATH '$')) AS jt) AS dept_filter
+        CROSS JOIN (SELECT DISTINCT role_id FROM JSON_TABLE(CONCAT('[', role_ids, ']'), '$[*]' COLUMNS (role_id INT PATH '$')) AS jt) AS role_filter
+        INNER JOIN department_role_aggregates sel
+            ON sel.department_id = dept_filter.department_id AND sel.role_id = role_filter.role_id
+        GROUP BY sel.department_id
+    ) AS selected_roles ON selected_roles.department_id = d.department_id
+    LEFT JOIN department_role_set_counts c
+        ON c.department_id = selected_roles.department_id AND c.role_set = selected_roles.role_key
 
     GROUP BY d.department_id, d.department_title
     ORDER BY d.department_title;
@@ -619,20 +559,20 @@ BEGIN
         COUNT(DISTINCT s.staff_id) AS count_staff,
 
         -- Σύνολο δημοσιεύσεων
-        SUM(pub_stats.total_pubs) AS total_pubs,
-        SUM(pub_stats.total_citations) AS total_citations,
+        SUM(sa.dated_publication_count) AS total_pubs,
+        SUM(sa.dated_citations) AS total_citations,
 
-        SUM(pub_stats.total_pubs_5y) AS total_pubs_5y,
-        SUM(pub_stats.total_citations_5y) AS total_citations_5y,
+        SUM(sa.dated_publication_count_5y) AS total_pubs_5y,
+        SUM(sa.dated_citations_5y) AS total_citations_5y,
 
         -- Μέσοι όροι per member
-        ROUND(AVG(pub_stats.total_pubs), 1) AS avg_pubs_per_m,
-        ROUND(AVG(pub_stats.total_citations), 1) AS avg_cits_per_m,
+        ROUND(AVG(sa.dated_publication_count), 1) AS avg_pubs_per_m,
+        ROUND(AVG(sa.dated_citations), 1) AS avg_cits_per_m,
 
-        ROUND(AVG(pub_stats.age), 2) AS avg_age,
+        ROUND(AVG(sa.dated_age), 2) AS avg_age,
 
-        ROUND(AVG(pub_stats.total_pubs / NULLIF(pub_stats.age, 0)), 1) AS avg_pubs_per_m_per_y,
-        ROUND(AVG(pub_stats.total_citations / NULLIF(pub_stats.age, 0)), 1) AS avg_cits_per_m_per_y,
+        ROUND(AVG(sa.dated_publication_count / NULLIF(sa.dated_age, 0)), 1) AS avg_pubs_per_m_per_y,
+        ROUND(AVG(sa.dated_citations / NULLIF(sa.dated_age, 0)), 1) AS avg_cits_per_m_per_y,
 
         -- h-indexes
         ROUND(AVG(ss.h_index), 1) AS avg_h_index,
@@ -652,27 +592,12 @@ BEGIN
         ROUND(AVG(ss.last_5_years_i10_index_local), 1) AS avg_i10_index_local_5y,
         ROUND(AVG(ss.last_5_years_i10_index_from_graph), 1) AS avg_i10_index_from_graph_5y
 
-    FROM staff s
+    FROM (SELECT DISTINCT staff_id FROM JSON_TABLE(CONCAT('[', staff_ids, ']'), '$[*]' COLUMNS (staff_id INT PATH '$')) AS jt) AS staff_list
+    INNER JOIN staff s ON s.staff_id = staff_list.staff_id
     LEFT JOIN staff_statistics ss ON s.staff_id = ss.staff_id
 
-    LEFT JOIN (
-        SELECT
-            ps.staff_id,
-            COUNT(DISTINCT ps.publication_id) AS total_pubs,
-            SUM(p.citations) AS total_citations,
-
-            SUM(CASE WHEN p.publication_year >= YEAR(CURDATE()) - 5 THEN 1 ELSE 0 END) AS total_pubs_5y,
-            SUM(CASE WHEN p.publication_year >= YEAR(CURDATE()) - 5 THEN p.citations ELSE 0 END) AS total_citations_5y,
-
-            MAX(p.publication_year) - MIN(p.publication_year) AS age
-
-        FROM publications_staff ps
-        JOIN publications p ON p.publication_id = ps.publication_id
-        WHERE p.publication_year IS NOT NULL AND p.publication_year <= YEAR(CURDATE())
-        GROUP BY ps.staff_id
-    ) AS pub_stats ON pub_stats.staff_id = s.staff_id
-
-    WHERE FIND_IN_SET(s.staff_id, staff_ids);
+    -- Αναζήτηση πρωτεύοντος κλειδιού ανά μέλος (Database/aggregates.sql)
+    LEFT JOIN staff_aggregates sa ON sa.staff_id = s.staff_id;
 END $$
 
 DELIMITER ;
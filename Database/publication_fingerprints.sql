@@ -0,0 +1,15 @@
+-- =======================
+-- Publication Fingerprints
+-- =======================
+use citations_v2;
+
+CREATE TABLE IF NOT EXISTS publication_fingerprints (
+    publication_id INT NOT NULL,
+    citations INT NULL,
+    publication_year INT NULL,
+    title_hash CHAR(40) NOT NULL,
+    last_detail_scrape DATETIME NULL,
+    PRIMARY KEY (publication_id),
+    CONSTRAINT fk_publication_fingerprints_publication FOREIGN KEY (publication_id)
+        REFERENCES publications (publication_id) ON DELETE CASCADE
+);
@@ -0,0 +1,127 @@
+"""Precomputed aggregates served by the API procedures (Database/aggregates.sql).
+
+staff_aggregates() reduces the stored publications to one row per staff member.
+department_role_aggregates() reduces those rows, together with the staff_statistics
+indices, to one row per department and role. Each row holds sums, non-null counts,
+sums of squares, minimums and maximums instead of averages. The procedures can then
+combine any set of department x role rows into exact averages and standard deviations.
+Distinct staff and publication counts do not add up across roles, so
+department_role_set_counts() stores them for every set of roles of each department.
+"""
+from datetime import date
+
+import numpy as np
+import pandas as pd
+
+from Google_Scholar_Metrics import RECENT_YEARS
+
+STATISTICS_COLUMNS = [
+    'h_index', 'last_5_years_h_index', 'h_index_local', 'last_5_years_h_index_local',
+    'h_index_from_graph', 'last_5_years_h_index_from_graph',
+    'i10_index', 'last_5_years_i10_index', 'i10_index_local', 'last_5_years_i10_index_local',
+    'i10_index_from_graph', 'last_5_years_i10_index_from_graph',
+]
+# Όλες οι δημοσιεύσεις (get_all_basic_stats_for_a_staff, get_all_staff_summary)
+PUBLICATION_COLUMNS = ['publication_count', 'publication_count_5y', 'total_citations', 'total_citations_5y', 'age']
+# Μόνο δημοσιεύσεις με έτος έως το τρέχον (στατιστικά τμημάτων και ομάδων προσωπικού)
+DATED_COLUMNS = ['dated_publication_count', 'dated_publication_count_5y', 'dated_citations',
+                 'dated_citations_5y', 'dated_age']
+STAFF_AGGREGATE_COLUMNS = PUBLICATION_COLUMNS + DATED_COLUMNS
+
+AVERAGED_COLUMNS = STATISTICS_COLUMNS + DATED_COLUMNS
+SPREAD_COLUMNS = ['dated_publication_count', 'dated_citations']
+RANGE_COLUMNS = ['dated_publication_count', 'dated_citations', 'h_index', 'i10_index']
+CELL_KEYS = ['department_id', 'role_id']
+ROLE_SET_KEYS = ['department_id', 'role_set']
+DEPARTMENT_AGGREGATE_COLUMNS = (
+    ['staff_count', 'total_pubs', 'total_citations']
+    + [f'{prefix}_{column}' for column in AVERAGED_COLUMNS for prefix in ('sum', 'n')]
+    + [f'sq_{column}' for column in SPREAD_COLUMNS]
+    + [f'{prefix}_{column}' for column in RANGE_COLUMNS for prefix in ('min', 'max')]
+)
+
+
+def _publication_counts(publications_df, recent):
+    grouped = publications_df.groupby('staff_id')
+    years = publications_df['publication_year']
+    return pd.DataFrame({
+        'count': grouped.size(),
+        'count_5y': recent.groupby(publications_df['staff_id']).sum(),
+        'citations': grouped['citations'].sum(),
+        'citations_5y': publications_df['citations'].where(recent, 0).groupby(publications_df['staff_id']).sum(),
+        'age': years.groupby(publications_df['staff_id']).max() - years.groupby(publications_df['staff_id']).min(),
+    })
+
+
+def staff_aggregates(publications_df, staff_ids, current_year=None, window=RECENT_YEARS):
+    """One row per staff id from (staff_id, publication_year, citations) rows. Staff without
+    publications get zero counts; the dated columns stay empty for staff without publications
+    dated up to the current year, so they are left out of department averages."""
+    current_year = current_year or date.today().year
+    years = publications_df['publication_year']
+    recent = (years >= current_year - window).fillna(False).astype(bool)
+    dated = (years.notna() & (years <= current_year)).astype(bool)
+
+    index = pd.Index([int(staff_id) for staff_id in staff_ids], name='staff_id')
+    every = _publication_counts(publications_df, recent).reindex(index)
+    dated_only = _publication_counts(publications_df[dated], recent[dated]).reindex(index)
+
+    aggregates = pd.DataFrame(index=index)
+    for name, column in zip(PUBLICATION_COLUMNS, every.columns):
+        aggregates[name] = every[column] if name == 'age' else every[column].fillna(0)
+    for name, column in zip(DATED_COLUMNS, dated_only.columns):
+        aggregates[name] = dated_only[column]
+    return aggregates
+
+
+def department_role_aggregates(cell_staff_df, cell_publications):
+    """One row per (department_id, role_id) from one row per staff member of each cell
+    (CELL_KEYS, staff_id, STATISTICS_COLUMNS, DATED_COLUMNS). `cell_publications` holds the
+    distinct dated publications of each cell, indexed by CELL_KEYS."""
+    keys = [cell_staff_df[key] for key in CELL_KEYS]
+    grouped = cell_staff_df.groupby(keys)
+    aggregates = pd.DataFrame({'staff_count': grouped['staff_id'].nunique()})
+    aggregates['total_pubs'] = cell_publications.reindex(aggregates.index, fill_value=0)
+    aggregates['total_citations'] = grouped['dated_citations'].sum()
+    for column in AVERAGED_COLUMNS:
+        aggregates[f'sum_{column}'] = grouped[column].sum()
+        aggregates[f'n_{column}'] = grouped[column].count()
+    for column in SPREAD_COLUMNS:
+        aggregates[f'sq_{column}'] = np.square(cell_staff_df[column].astype(float)).groupby(keys).sum()
+    for column in RANGE_COLUMNS:
+        aggregates[f'min_{column}'] = grouped[column].min()
+        aggregates[f'max_{column}'] = grouped[column].max()
+    aggregates.index.names = CELL_KEYS
+    return aggregates[DEPARTMENT_AGGREGATE_COLUMNS]
+
+
+def _role_set_counts(masks, counts, subsets):
+    return ((subsets[:, None] & masks[None, :]) != 0).astype('int64') @ counts
+
+
+def department_role_set_counts(staff_masks, publication_masks, role_ids):
+    """One row per department and non-empty set of its roles, indexed by ROLE_SET_KEYS
+    (role_set as sorted comma-separated role ids), with the distinct staff holding any of the
+    roles and their distinct dated publications. `staff_masks` and `publication_masks`
+    count staff and publications by (department_id, mask), where bit n of the mask stands
+    for role_ids[n] and is set when the staff member, or one of the department's authors
+    of the publication, holds that role."""
+    rows = []
+    for department_id, staff_counts in staff_masks.groupby(level=0):
+        masks = staff_counts.index.get_level_values(1).to_numpy(dtype='int64')
+        present = int(np.bitwise_or.reduce(masks))
+        bits = [bit for bit in range(len(role_ids)) if present >> bit & 1]
+        # Κάθε υποσύνολο των ρόλων του τμήματος ως μάσκα πάνω στα bits των role_ids
+        subsets = np.array([sum(1 << bits[n] for n in range(len(bits)) if subset >> n & 1)
+                            for subset in range(1, 1 << len(bits))], dtype='int64')
+        staff_count = _role_set_counts(masks, staff_counts.to_numpy(dtype='int64'), subsets)
+        if department_id in publication_masks.index.get_level_values(0):
+            publication_counts = publication_masks.xs(department_id, level=0)
+            total_pubs = _role_set_counts(publication_counts.index.to_numpy(dtype='int64'),
+                                          publication_counts.to_numpy(dtype='int64'), subsets)
+        else:
+            total_pubs = np.zeros(len(subsets), dtype='int64')
+        for subset, subset_staff, subset_pubs in zip(subsets, staff_count, total_pubs):
+            role_set = ','.join(str(role_ids[bit]) for bit in bits if subset >> bit & 1)
+            rows.append((int(department_id), role_set, int(subset_staff), int(subset_pubs)))
+    return pd.DataFrame(rows, columns=ROLE_SET_KEYS + ['staff_count', 'total_pubs']).set_index(ROLE_SET_KEYS)
@@ -0,0 +1,252 @@
+"""Change feed over the history tables written by Database/triggers.txt.
+
+Every INSERT, UPDATE and DELETE on the tracked tables leaves a full copy of the row in
+the matching *_records table. ChangeFeed reads the records added after a per-consumer
+high-water mark (Database/change_feed_offsets.sql). It turns each record into compact
+events: one for an insert or delete, and one per changed column for an update. The
+previous copy of the same row gives the old values, and updates that changed nothing
+produce no events.
+
+    feed = ChangeFeed(connection, 'aggregates')
+    for events in feed.batches():
+        ...                  # act on the events
+        feed.commit()        # the next run starts after them
+"""
+from collections import namedtuple
+
+STATISTICS_FIELDS = [
+    'total_citations', 'last_5_years_citations', 'h_index', 'last_5_years_h_index', 'i10_index',
+    'last_5_years_i10_index', 'h_index_local', 'last_5_years_h_index_local', 'i10_index_local',
+    'last_5_years_i10_index_local', 'h_index_from_graph', 'last_5_years_h_index_from_graph',
+    'i10_index_from_graph', 'last_5_years_i10_index_from_graph',
+]
+
+# entity: όνομα του πίνακα στα events, key: το id της γραμμής, context: στήλες που συνοδεύουν
+# κάθε event της γραμμής, fields: στήλες που συγκρίνονται στα UPDATE
+Tracked = namedtuple('Tracked', ['entity', 'key', 'context', 'fields'])
+TRACKED = {
+    'publications_records': Tracked(
+        'publications', 'publication_id', [],
+        ['publication_scholar_id', 'publication_title', 'authors', 'publication_date', 'journal', 'publisher',
+         'citations', 'publication_url', 'publication_year']),
+    'publications_staff_records': Tracked(
+        'publications_staff', 'publication_staff_id', ['staff_id', 'publication_id'],
+        ['staff_id', 'publication_id', 'author_order']),
+    'publication_citations_per_year_records': Tracked(
+        'publication_citations_per_year', 'publication_citations_per_year_id', ['publication_id', 'year'],
+        ['citations']),
+    'staff_citations_per_year_records': Tracked(
+        'staff_citations_per_year', 'staff_citations_per_year_id', ['staff_id', 'year'], ['citations']),
+    'staff_statistics_records': Tracked('staff_statistics', 'staff_statistic_id', ['staff_id'], STATISTICS_FIELDS),
+    'staff_records': Tracked('staff', 'staff_id', [], ['scholar_id', 'first_name', 'last_name']),
+    'staff_dept_role_records': Tracked(
+        'staff_dept_role', 'staff_role_id', ['staff_id', 'department_id', 'role_id'],
+        ['staff_id', 'department_id', 'role_id']),
+    'departments_records': Tracked(
+        'departments', 'department_id', [],
+        ['short_code', 'department_title', 'university', 'city', 'department_url', 'department_staff_url',
+         'department_supporting_staff_url']),
+    'roles_records': Tracked('roles', 'role_id', [], ['role_title']),
+}
+
+# Τα change_id του changes_publications: (entity, 'insert' | 'delete' | στήλη που άλλαξε)
+CHANGE_IDS = {
+    ('publications', 'insert'): 1,
+    ('publications', 'delete'): 2,
+    ('publications', 'publication_title'): 3,
+    ('publications', 'publication_date'): 4,
+    ('publications', 'publisher'): 5,
+    ('publications', 'citations'): 6,
+    ('publications', 'publication_url'): 7,
+    ('publications_staff', 'insert'): 8,
+    ('publications_staff', 'delete'): 9,
+    ('publications_staff', 'staff_id'): 10,
+    ('publications_staff', 'publication_id'): 11,
+    ('publications_staff', 'author_order'): 12,
+}
+
+
+def _quoted(column):
+    return f'`{column}`'
+
+
+def record_columns(tracked):
+    """The columns the triggers copy into the records table, without `operation`."""
+    return list(dict.fromkeys([tracked.key] + tracked.context + tracked.fields))
+
+
+def _event(record_id, tracked, key, context, change, field=None, old=None, new=None):
+    event = {'record_id': record_id, 'entity': tracked.entity, 'id': key, 'change': change, **context}
+    change_id = CHANGE_IDS.get((tracked.entity, field or change))
+    if change_id:
+        event['change_id'] = change_id
+    if field:
+        event.update(field=field, old=old, new=new)
+    return event
+
+
+def diff_records(tracked, records, previous=None):
+    """Events of `records` ((record_id, operation, row dict) tuples in record order).
+    `previous` maps keys to the last row recorded before them and is updated in place."""
+    previous = {} if previous is None else previous
+    events = []
+    for record_id, operation, row in records:
+        key = row[tracked.key]
+        context = {column: row[column] for column in tracked.context}
+        if operation == 'INSERT':
+            events.append(_event(record_id, tracked, key, context, 'insert'))
+        elif operation == 'DELETE':
+            events.append(_event(record_id, tracked, key, context, 'delete'))
+        else:
+            before = previous.get(key)
+            if before is None:
+                # Η γραμμή υπήρχε πριν από τα triggers: δεν υπάρχουν παλιές τιμές για σύγκριση
+                events.extend(_event(record_id, tracked, key, context, 'update', field, None, row[field])
+                              for field in tracked.fields)
+            else:
+                events.extend(_event(record_id, tracked, key, context, 'update', field, before[field], row[field])
+                              for field in tracked.fields if before[field] != row[field])
+        if operation == 'DELETE':
+            previous.pop(key, None)
+        else:
+            previous[key] = row
+    return events
+
+
+class ChangeFeed:
+    """Reads the *_records tables after the stored offsets of `consumer`.
+
+    poll() returns the events of at most `batch_size` new records per table and moves the
+    offsets in memory only; commit() stores them. A consumer that stops between the two
+    sees the same events again on its next run. A consumer without stored offsets starts
+    at the current end of each table, or at the beginning with `from_start`.
+
+    The offsets assume that record ids become visible in order. Writers that hold ids in
+    open transactions while others commit break this: a record committed after a higher id
+    was read is never returned. Run a consumer only when no crawl or replay is writing;
+    Google_Scholar_Scrape refuses to start one while crawl_state shows an active crawl.
+    """
+
+    def __init__(self, connection, consumer, tables=None, batch_size=5000, from_start=False):
+        self.connection = connection
+        self.consumer = consumer
+        self.tables = list(tables or TRACKED)
+        self.batch_size = batch_size
+        self.record_ids = self._record_id_columns()
+        self.offsets = self._stored_offsets()
+        for table in self.tables:
+            if table not in self.offsets:
+                self.offsets[table] = 0 if from_start else self._last_record_id(table)
+
+    def _query(self, query, values=()):
+        cursor = self.connection.cursor()
+        try:
+            cursor.execute(query, values)
+            return cursor.fetchall()
+        finally:
+            cursor.close()
+
+    def _record_id_columns(self):
+        # Το σχήμα των *_records δεν βρίσκεται στο αποθετήριο: το id τους είναι η στήλη auto_increment
+        placeholders = ', '.join(['%s'] * len(self.tables))
+        rows = self._query('SELECT TABLE_NAME, COLUMN_NAME FROM information_schema.COLUMNS '
+                           f'WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME IN ({placeholders}) '
+                           "AND EXTRA LIKE '%%auto_increment%%'", tuple(self.tables))
+        columns = {table: column for table, column in rows}
+        missing = [table for table in self.tables if table not in columns]
+        if missing:
+            raise ValueError(f"No auto-increment record id in {', '.join(missing)}")
+        return columns
+
+    def _stored_offsets(self):
+        rows = self._query('SELECT records_table, last_record_id FROM change_feed_offsets WHERE consumer = %s',
+                           (self.consumer,))
+        return {table: int(last_record_id) for table, last_record_id in rows if table in self.tables}
+
+    def _last_record_id(self, table):
+        rows = self._query(f'SELECT MAX({_quoted(self.record_ids[table])}) FROM {table}')
+        return int(rows[0][0] or 0)
+
+    def _select(self, table, where, values, order=''):
+        tracked = TRACKED[table]
+        columns = record_columns(tracked)
+        rows = self._query(f'SELECT {_quoted(self.record_ids[table])}, operation, '
+                           f'{", ".join(_quoted(column) for column in columns)} FROM {table} WHERE {where}{order}',
+                           values)
+        return [(int(row[0]), row[1], dict(zip(columns, row[2:]))) for row in rows]
+
+    def _previous_rows(self, table, keys, before):
+        """The last row recorded for each of `keys` up to record id `before`."""
+        tracked = TRACKED[table]
+        record_id = _quoted(self.record_ids[table])
+        placeholders = ', '.join(['%s'] * len(keys))
+        records = self._select(
+            table,
+            f'{record_id} IN (SELECT MAX({record_id}) FROM {table} '
+            f'WHERE {_quoted(tracked.key)} IN ({placeholders}) AND {record_id} <= %s GROUP BY {_quoted(tracked.key)}) '
+            "AND operation <> 'DELETE'",
+            tuple(keys) + (before,))
+        return {row[tracked.key]: row for _, _, row in records}
+
+    def poll(self):
+        events = []
+        for table in self.tables:
+            tracked = TRACKED[table]
+            offset = self.offsets[table]
+            records = self._select(table, f'{_quoted(self.record_ids[table])} > %s', (offset,),
+                                   f' ORDER BY {_quoted(self.record_ids[table])} LIMIT {int(self.batch_size)}')
+            if not records:
+                continue
+            # Παλιές τιμές μόνο για γραμμές που εμφανίζονται πρώτα με UPDATE σε αυτή τη δέσμη
+            seen, keys = set(), []
+            for _, operation, row in records:
+                key = row[tracked.key]
+                if key not in seen and operation == 'UPDATE':
+                    keys.append(key)
+                seen.add(key)
+            previous = self._previous_rows(table, keys, offset) if keys else {}
+            events.extend(diff_records(tracked, records, previous))
+            self.offsets[table] = records[-1][0]
+        return events
+
+    def batches(self):
+        """Repeats poll() until every table is read to the end. A batch can be empty when its
+        records changed nothing; commit() after each batch keeps the progress."""
+        while True:
+            offsets = dict(self.offsets)
+            events = self.poll()
+            if self.offsets == offsets:
+                return
+            yield events
+
+    def commit(self):
+        cursor = self.connection.cursor()
+        try:
+            cursor.executemany('INSERT INTO change_feed_offsets (consumer, records_table, last_record_id) '
+                               'VALUES (%s, %s, %s) ON DUPLICATE KEY UPDATE last_record_id = VALUES(last_record_id)',
+                               [(self.consumer, table, offset) for table, offset in self.offsets.items()])
+            self.connection.commit()
+        finally:
+            cursor.close()
+
+
+def affected_staff(events):
+    """(staff_ids, publication_ids, cells) whose aggregates the events can change: staff named
+    by the events, publications whose citations or year changed (their staff are looked up
+    by the caller) and (department_id, role_id) cells staff joined or left."""
+    staff_ids, publication_ids, cells = set(), set(), set()
+    for event in events:
+        if 'staff_id' in event:
+            staff_ids.add(event['staff_id'])
+            if event.get('field') == 'staff_id' and event['old'] is not None:
+                staff_ids.add(event['old'])
+        if event['entity'] == 'publications' and (event['change'] == 'insert'
+                                                  or event.get('field') in ('citations', 'publication_year')):
+            publication_ids.add(event['id'])
+        if event['entity'] == 'staff_dept_role':
+            cell = {'department_id': event['department_id'], 'role_id': event['role_id']}
+            cells.add((cell['department_id'], cell['role_id']))
+            if event.get('field') in cell and event['old'] is not None:
+                cell[event['field']] = event['old']
+                cells.add((cell['department_id'], cell['role_id']))
+    return staff_ids, publication_ids, cells
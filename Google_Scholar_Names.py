@@ -0,0 +1,148 @@
+"""Matching of a staff member's name against the author list of a publication.
+
+A NameMatcher precomputes, once per staff member, normalized variants of the name
+(full name and initials in both orders, Greek names transliterated to Latin, accents
+stripped). author_position() then looks the authors up in three passes: exact variant,
+spelling-insensitive variant ("skeleton"), unique author with the same surname and first
+initial; only when all fail does it fall back to fuzzy matching (fuzzywuzzy).
+"""
+import re
+import unicodedata
+from functools import lru_cache
+
+from fuzzywuzzy import fuzz
+
+FUZZY_THRESHOLD = 60
+
+# ΕΛΟΤ 743, με τα δίψηφα πριν από τα μονά γράμματα
+GREEK_TO_LATIN = [
+    ('ου', 'ou'), ('αυ', 'av'), ('ευ', 'ev'), ('μπ', 'b'), ('ντ', 'nt'), ('γκ', 'gk'), ('γγ', 'ng'),
+    ('α', 'a'), ('β', 'v'), ('γ', 'g'), ('δ', 'd'), ('ε', 'e'), ('ζ', 'z'), ('η', 'i'), ('θ', 'th'),
+    ('ι', 'i'), ('κ', 'k'), ('λ', 'l'), ('μ', 'm'), ('ν', 'n'), ('ξ', 'x'), ('ο', 'o'), ('π', 'p'),
+    ('ρ', 'r'), ('σ', 's'), ('ς', 's'), ('τ', 't'), ('υ', 'y'), ('φ', 'f'), ('χ', 'ch'), ('ψ', 'ps'),
+    ('ω', 'o'),
+]
+
+# Ισοδύναμες λατινικές γραφές ελληνικών ονομάτων (Christos/Hristos, Yannis/Giannis, Filippos/Philippos, ...)
+SKELETON_RULES = [
+    ('ph', 'f'), ('th', 't'), ('ch', 'h'), ('kh', 'h'), ('x', 'ks'), ('ou', 'u'), ('ei', 'i'), ('oi', 'i'),
+    ('ai', 'e'), ('y', 'i'), ('mp', 'b'), ('nt', 'd'), ('gk', 'g'), ('gg', 'g'), ('b', 'v'), ('c', 'k'),
+    ('w', 'o'), ('j', 'i'),
+]
+
+
+def strip_accents(text):
+    return ''.join(c for c in unicodedata.normalize('NFD', text) if unicodedata.category(c) != 'Mn')
+
+
+def transliterate(text):
+    for greek, latin in GREEK_TO_LATIN:
+        text = text.replace(greek, latin)
+    return text
+
+
+def normalize(name):
+    """Lowercase Latin words of a name: accents stripped, Greek transliterated, punctuation dropped."""
+    name = transliterate(strip_accents(name).lower())
+    return ' '.join(re.sub(r"[^a-z\s]", ' ', name).split())
+
+
+def skeleton(normalized_name):
+    for spelling, replacement in SKELETON_RULES:
+        normalized_name = normalized_name.replace(spelling, replacement)
+    return re.sub(r'(.)\1+', r'\1', normalized_name)
+
+
+def name_keys(tokens):
+    """Full name and initials, in both given-surname orders."""
+    if not tokens:
+        return set()
+    *given, surname = tokens
+    if not given:
+        return {surname}
+    initials = ''.join(token[0] for token in given)
+    return {
+        ' '.join(given + [surname]), ' '.join([surname] + given),
+        f"{initials} {surname}", f"{surname} {initials}",
+        f"{given[0]} {surname}", f"{surname} {given[0]}",
+        f"{given[0][0]} {surname}", f"{surname} {given[0][0]}",
+    }
+
+
+def author_keys(author):
+    """The keys an author of a publication is looked up with; initials written together
+    ("G. K. Papadopoulos") are joined the same way name_keys joins them ("gk papadopoulos")."""
+    tokens = normalize(author).split()
+    if len(tokens) > 1:
+        given = tokens[:-1]
+        if all(len(token) == 1 for token in given):
+            tokens = [''.join(given), tokens[-1]]
+        elif all(len(token) == 1 for token in tokens[1:]):
+            tokens = [tokens[0], ''.join(tokens[1:])]
+    return ' '.join(tokens)
+
+
+class NameMatcher:
+
+    def __init__(self, full_name):
+        self.full_name = full_name
+        tokens = normalize(full_name).split()
+        self.latin_name = ' '.join(tokens)
+        self.exact = name_keys(tokens)
+        self.skeletons = {skeleton(key) for key in self.exact}
+        self.surname = skeleton(tokens[-1]) if tokens else None
+        # Το αρχικό του πρώτου ονόματος, και στις δύο γραφές (Christos: c, h)
+        self.initials = {tokens[0][0], skeleton(tokens[0])[0]} if len(tokens) > 1 else set()
+
+    def same_first_initial(self, key, skeleton_key):
+        """Whether an author with the staff member's surname also has the same first initial."""
+        given = [(token, skeleton_token) for token, skeleton_token in zip(key.split(), skeleton_key.split())
+                 if skeleton_token != self.surname]
+        return bool(given) and bool({given[0][0][0], given[0][1][0]} & self.initials)
+
+    def author_position(self, authors):
+        """1-based position of the staff member in `authors`, or 0 when not found."""
+        keys = [author_keys(author) for author in authors]
+        for position, key in enumerate(keys):
+            if key in self.exact:
+                return position + 1
+        skeleton_keys = [skeleton(key) for key in keys]
+        for position, key in enumerate(skeleton_keys):
+            if key in self.skeletons:
+                return position + 1
+        # Όχι μόνο το επώνυμο: δύο Papadopoulos στην ίδια λίστα δεν είναι απαραίτητα το ίδιο μέλος
+        same_surname = [position for position, key in enumerate(skeleton_keys)
+                        if self.surname and self.surname in key.split() and len(key.split()) > 1]
+        surname_positions = [position for position in same_surname
+                             if self.same_first_initial(keys[position], skeleton_keys[position])]
+        if len(surname_positions) == 1:
+            return surname_positions[0] + 1
+        other_initial = set(same_surname) - set(surname_positions) if self.initials else set()
+        return self.fuzzy_position(keys, skip=other_initial)
+
+    def fuzzy_position(self, keys, skip=()):
+        """Best fuzzy match, leaving out the positions in `skip` (same surname, another first initial)."""
+        best_position, best_score = 0, FUZZY_THRESHOLD
+        for position, key in enumerate(keys):
+            if position in skip:
+                continue
+            score = fuzz.partial_ratio(self.latin_name, key)
+            if score > best_score:
+                best_position, best_score = position + 1, score
+        return best_position
+
+
+@lru_cache(maxsize=4096)
+def matcher(full_name):
+    return NameMatcher(full_name)
+
+
+def author_position(full_name, authors):
+    return matcher(full_name).author_position(authors)
+
+
+def similarity(text, other):
+    """0-100 similarity of two author strings; 0 when either is empty or None."""
+    if not text or not other:
+        return 0
+    return fuzz.ratio(text, other)
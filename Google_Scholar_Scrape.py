@@ -1,121 +1,1112 @@
+import argparse
+import asyncio
+import gzip
+import hashlib
+import json
 import logging
 import os
 import random
+import queue
 import re
+import threading
 from datetime import datetime
 from datetime import date
-from time import sleep
+from datetime import timedelta
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from functools import partial, wraps
+from time import monotonic, perf_counter, sleep
+from urllib.parse import urljoin
 from dotenv import load_dotenv
 import mysql.connector
+from mysql.connector import pooling
+import numpy as np
 import pandas as pd
-from fuzzywuzzy import fuzz
+import requests
+from lxml import html as lxml_html
 from selenium import webdriver
 from selenium.common.exceptions import NoSuchElementException, ElementClickInterceptedException, TimeoutException
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.firefox.options import Options
-
-
-SCHOLAR_URL = r"https://scholar.google.com/citations?view_op=list_works&hl=en&hl=en&user="
+import Google_Scholar_Aggregates as aggregates
+import Google_Scholar_Changes as changes
+import Google_Scholar_Metrics as metrics
+import Google_Scholar_Names as names
+
+
+# Αλλάζει μόνο για δοκιμές/benchmarks απέναντι σε τοπικό υποκατάστατο (Benchmarks/Synthetic_Scholar.py)
+SCHOLAR_BASE_URL = os.getenv("SCHOLAR_BASE_URL", "https://scholar.google.com")
+SCHOLAR_URL = SCHOLAR_BASE_URL + "/citations?view_op=list_works&hl=en&hl=en&user="
+SCHOLAR_PAGE_SIZE = 100
+HTTP_USER_AGENT = ("Mozilla/5.0 (X11; Linux x86_64; rv:128.0) Gecko/20100101 Firefox/128.0")
+# Στοιχεία που υπάρχουν μόνο σε κανονικές σελίδες (προφίλ, δημοσίευση) ή μόνο σε σελίδες captcha
+CONTENT_SENTINEL_IDS = ("gsc_prf_in", "gsc_oci_title")
+CAPTCHA_SENTINEL_IDS = ("gs_captcha_ccl", "gs_captcha_f", "captcha-form", "recaptcha")
+CAPTCHA_SENTINEL_SELECTOR = ", ".join(f"#{sentinel_id}" for sentinel_id in CONTENT_SENTINEL_IDS + CAPTCHA_SENTINEL_IDS)
+PUBLICATION_ROWS_SCRIPT = ("return Array.from(document.querySelectorAll('#gsc_a_b > tr'))"
+                           ".slice(arguments[0]).map(row => row.outerHTML).join('');")
+PUBLICATION_ROW_COUNT_SCRIPT = "return document.querySelectorAll('#gsc_a_b > tr').length;"
+CAPTCHA_TEXT = re.compile(r"unusual traffic|please show you're not a robot", re.IGNORECASE)
 log_file_name = f"../logs/GS_Scrape_Log_{datetime.now().strftime('%Y-%m-%d_%H-%M-%S')}.log"
+metrics_file_name = log_file_name.replace("GS_Scrape_Log_", "GS_Scrape_Metrics_").replace(".log", ".jsonl")
 logging.basicConfig(
             filename=log_file_name,
             level=logging.INFO,
-            format='%(asctime)s - %(levelname)s - %(message)s',
+            format='%(asctime)s - %(levelname)s - %(threadName)s - %(message)s',
             datefmt='%Y-%m-%d %H:%M:%S')
 LOGGER = logging.getLogger(__name__)
 firefox_options = Options()
 firefox_options.add_argument("--headless")
 
-DRIVER = None
-failures_in_a_row = 0
 failed_times_to_restart = 5
+detail_refresh_days = 30
+detail_concurrency = 4
+full_profile_days = 28
+crawl_active_minutes = 60
+checkpoint_publications = 50
+history_mode = 'triggers'
+
+
+class CaptchaError(Exception):
+    pass
+
+
+class RunMetrics:
+    """Counters and per-stage timings of one run, shared by all workers.
+
+    Every timing is kept for the end-of-run report (p50/p95 per stage). Between
+    begin_staff() and end_staff() the timings and counters of the calling thread are also
+    summed per staff member and written as one JSON line to `path`.
+    """
+
+    def __init__(self, path=None):
+        self.path = path
+        self.counters = {}
+        self.timings = {}
+        self.started = monotonic()
+        self.lock = threading.Lock()
+        self.local = threading.local()
+
+    def reset(self):
+        """Starts a new report (e.g. between benchmark runs in one process)."""
+        with self.lock:
+            self.counters = {}
+            self.timings = {}
+            self.started = monotonic()
+
+    def count(self, name, n=1):
+        staff = getattr(self.local, 'staff', None)
+        with self.lock:
+            self.counters[name] = self.counters.get(name, 0) + n
+            if staff is not None:
+                staff['counters'][name] = staff['counters'].get(name, 0) + n
+
+    def record(self, stage, seconds):
+        staff = getattr(self.local, 'staff', None)
+        with self.lock:
+            self.timings.setdefault(stage, []).append(seconds)
+            if staff is not None:
+                count, total = staff['stages'].get(stage, (0, 0.0))
+                staff['stages'][stage] = (count + 1, total + seconds)
+
+    @contextmanager
+    def timer(self, stage):
+        start = perf_counter()
+        try:
+            yield
+        finally:
+            self.record(stage, perf_counter() - start)
+
+    def timed(self, stage):
+        """Decorator: times every call as `<stage>.<function name>`."""
+        def decorator(function):
+            name = f"{stage}.{function.__name__}"
+
+            @wraps(function)
+            def wrapper(*args, **kwargs):
+                with self.timer(name):
+                    return function(*args, **kwargs)
+            return wrapper
+        return decorator
+
+    def begin_staff(self):
+        self.local.staff = {'stages': {}, 'counters': {}, 'start': perf_counter()}
+
+    def current_staff(self):
+        return getattr(self.local, 'staff', None)
+
+    def attach_staff(self, staff):
+        """Counts the timings of a helper thread (e.g. the detail-page pipeline) to the given staff record."""
+        self.local.staff = staff
+
+    def end_staff(self, **fields):
+        staff = self.local.staff
+        self.local.staff = None
+        self.emit({'event': 'staff', **fields, 'seconds': round(perf_counter() - staff['start'], 3),
+                   'counters': staff['counters'],
+                   'stages': {stage: {'count': count, 'seconds': round(total, 3)}
+                              for stage, (count, total) in sorted(staff['stages'].items())}})
+
+    def emit(self, record):
+        if not self.path:
+            return
+        line = json.dumps({'time': datetime.now().isoformat(timespec='seconds'),
+                           'thread': threading.current_thread().name, **record}, default=str)
+        try:
+            with self.lock, open(self.path, 'a', encoding='utf-8') as metrics_file:
+                metrics_file.write(line + "\n")
+        except OSError as e:
+            LOGGER.error(f"Error writing metrics: {e}")
+
+    def report(self):
+        with self.lock:
+            counters = dict(self.counters)
+            timings = {stage: np.array(seconds) for stage, seconds in self.timings.items()}
+        minutes = (monotonic() - self.started) / 60
+        staff = counters.get('staff_processed', 0)
+        return {
+            'pages_per_minute': round(counters.get('pages_loaded', 0) / minutes, 2) if minutes else 0.0,
+            'queries_per_staff': round(counters.get('db_queries', 0) / staff, 1) if staff else None,
+            'commits_per_staff': round(counters.get('db_commits', 0) / staff, 1) if staff else None,
+            'counters': dict(sorted(counters.items())),
+            'stages': {stage: {'count': len(seconds),
+                               'p50': round(float(np.percentile(seconds, 50)), 4),
+                               'p95': round(float(np.percentile(seconds, 95)), 4),
+                               'total': round(float(seconds.sum()), 2)}
+                       for stage, seconds in sorted(timings.items())},
+        }
+
+
+run_metrics = RunMetrics(metrics_file_name)
+
+
+class ManagedConnection:
+    """A pooled mysql.connector connection that survives MySQL dropping it.
+
+    - Health check: a connection idle for more than health_check_seconds (e.g. during a
+      captcha cool-down) is pinged and reconnected before its next statement.
+    - Statements that lose the connection are retried after a reconnect when they are
+      idempotent (SELECT, UPDATE, DELETE, INSERT ... ON DUPLICATE KEY UPDATE) and no
+      uncommitted write was sent before them; otherwise the error is raised, so the staff
+      member fails instead of silently losing its writes.
+    - cursor(prepared=True) runs each statement on a prepared-statement cursor cached per
+      query for the life of the connection, so hot statements are prepared once.
+    - Statements and commits are counted in run_metrics.
+    """
+
+    def __init__(self, connection, health_check_seconds=60):
+        self.connection = connection
+        self.health_check_seconds = health_check_seconds
+        self.last_used = monotonic()
+        self.uncommitted_writes = False
+        self.prepared_cursors = {}
+        self.session_variables = {}
+
+    def reconnect(self):
+        self.connection.ping(reconnect=True, attempts=3, delay=5)
+        self.prepared_cursors = {}
+        for name, value in self.session_variables.items():
+            self._set_variable(name, value)
+        if self.uncommitted_writes:
+            self.uncommitted_writes = False
+            raise mysql.connector.errors.OperationalError("MySQL connection lost with uncommitted writes")
+
+    def check_health(self):
+        if monotonic() - self.last_used > self.health_check_seconds:
+            if not self.connection.is_connected():
+                LOGGER.warning("MySQL connection dropped while idle, reconnecting")
+                self.reconnect()
+        self.last_used = monotonic()
+
+    def cursor(self, prepared=False):
+        self.check_health()
+        return ManagedCursor(self, prepared)
+
+    def _set_variable(self, name, value):
+        run_metrics.count('db_queries')
+        cursor = self.connection.cursor()
+        try:
+            cursor.execute(f'SET @{name} = %s', (value,))
+        finally:
+            cursor.close()
+
+    def set_session_variable(self, name, value):
+        """SET @name = value, repeated after every reconnect (a new session starts without it)."""
+        if self.session_variables.get(name) == value:
+            return
+        self.check_health()
+        self._set_variable(name, value)
+        self.session_variables[name] = value
+
+    def raw_cursor(self, query=None):
+        if query is None:
+            return self.connection.cursor()
+        if query not in self.prepared_cursors:
+            self.prepared_cursors[query] = self.connection.cursor(prepared=True)
+        return self.prepared_cursors[query]
+
+    def commit(self):
+        run_metrics.count('db_commits')
+        self.connection.commit()
+        self.uncommitted_writes = False
+
+    def rollback(self):
+        self.uncommitted_writes = False
+        try:
+            self.connection.rollback()
+        except (mysql.connector.errors.OperationalError, mysql.connector.errors.InterfaceError) as e:
+            # Χωρίς σύνδεση ο server έχει ήδη απορρίψει τη συναλλαγή
+            LOGGER.error(f"Error on rollback, connection lost: {e}")
+
+    def close(self):
+        for cursor in self.prepared_cursors.values():
+            cursor.close()
+        self.prepared_cursors = {}
+        self.session_variables = {}
+        self.connection.close()  # Επιστρέφει τη σύνδεση στο pool
+
+    def __getattr__(self, name):
+        return getattr(self.connection, name)
+
+
+class ManagedCursor:
+    IDEMPOTENT_STATEMENT = re.compile(r"^\s*(SELECT|UPDATE|DELETE)\b|ON DUPLICATE KEY UPDATE", re.IGNORECASE)
+    CONNECTION_LOST_ERRNOS = (2006, 2013, 2055)
+
+    def __init__(self, managed, prepared=False):
+        self.managed = managed
+        self.prepared = prepared
+        self.cursor = None if prepared else managed.raw_cursor()
+
+    def _run(self, method, query, args):
+        run_metrics.count('db_queries')
+        for attempt in range(3):
+            was_clean = not self.managed.uncommitted_writes
+            if self.prepared:
+                self.cursor = self.managed.raw_cursor(query)
+            try:
+                result = getattr(self.cursor, method)(query, *args)
+                break
+            except (mysql.connector.errors.OperationalError, mysql.connector.errors.InterfaceError) as e:
+                if (e.errno not in self.CONNECTION_LOST_ERRNOS or attempt == 2
+                        or not was_clean or not self.IDEMPOTENT_STATEMENT.search(query)):
+                    raise
+                LOGGER.warning(f"MySQL connection lost ({e}), reconnecting and retrying")
+                run_metrics.count('db_retries')
+                self.managed.reconnect()
+                if not self.prepared:
+                    self.cursor = self.managed.raw_cursor()
+        if not query.lstrip().upper().startswith("SELECT"):
+            self.managed.uncommitted_writes = True
+        return result
+
+    def execute(self, query, *args):
+        return self._run('execute', query, args)
+
+    def executemany(self, query, *args):
+        return self._run('executemany', query, args)
+
+    def close(self):
+        # Οι prepared cursors μένουν ανοιχτοί για να ξαναχρησιμοποιηθούν
+        if not self.prepared:
+            self.cursor.close()
+
+    def __iter__(self):
+        return iter(self.cursor)
+
+    def __getattr__(self, name):
+        return getattr(self.cursor, name)
+
+
+class RateLimiter:
+    """Token bucket shared by all workers, so the total request rate to Scholar stays within budget."""
+
+    def __init__(self, requests_per_minute, burst=1):
+        self.rate = requests_per_minute / 60.0
+        self.capacity = max(1, burst)
+        self.tokens = float(self.capacity)
+        self.last_refill = monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        while True:
+            with self.lock:
+                now = monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.last_refill) * self.rate)
+                self.last_refill = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            sleep(wait)
+
+
+class RequestScheduler:
+    """Paces the requests of every scraping identity (one browser or HTTP session each).
+
+    Each identity waits `delay` seconds (with jitter) between its requests. After
+    `speedup_after` successes in a row the delay shrinks by 10% down to min_delay; a
+    timeout or captcha doubles it up to max_delay and puts the identity on a cool-down
+    that grows exponentially with the failures in a row (captchas start from
+    captcha_backoff seconds, other errors from error_backoff). The optional shared
+    RateLimiter still caps the total rate of all identities.
+    """
+
+    def __init__(self, limiter=None, min_delay=1.0, initial_delay=3.0, max_delay=30.0, speedup_after=20,
+                 captcha_backoff=120.0, error_backoff=10.0, max_backoff=3600.0):
+        self.limiter = limiter
+        self.min_delay = min_delay
+        self.initial_delay = max(initial_delay, min_delay)
+        self.max_delay = max_delay
+        self.speedup_after = speedup_after
+        self.captcha_backoff = captcha_backoff
+        self.error_backoff = error_backoff
+        self.max_backoff = max_backoff
+        self.identities = {}
+        self.lock = threading.Lock()
+
+    def register(self):
+        with self.lock:
+            identity = f"identity-{len(self.identities) + 1}"
+            self.identities[identity] = {'delay': self.initial_delay, 'next_request': 0.0,
+                                         'successes': 0, 'failures': 0}
+        return identity
+
+    def wait(self, identity):
+        # Η θέση κρατιέται πριν τον ύπνο, ώστε παράλληλα αιτήματα της ίδιας ταυτότητας να απέχουν `delay`
+        with self.lock:
+            state = self.identities[identity]
+            now = monotonic()
+            slot = max(now, state['next_request'])
+            state['next_request'] = slot + state['delay'] * random.uniform(0.75, 1.25)
+        if slot > now:
+            sleep(slot - now)
+        if self.limiter:
+            self.limiter.acquire()
+
+    def success(self, identity):
+        with self.lock:
+            state = self.identities[identity]
+            state['failures'] = 0
+            state['successes'] += 1
+            if state['successes'] >= self.speedup_after:
+                state['successes'] = 0
+                state['delay'] = max(self.min_delay, state['delay'] * 0.9)
+
+    def failure(self, identity, captcha=False):
+        """Backs the identity off and returns the cool-down in seconds."""
+        with self.lock:
+            state = self.identities[identity]
+            state['successes'] = 0
+            state['failures'] += 1
+            state['delay'] = min(self.max_delay, state['delay'] * 2)
+            base = self.captcha_backoff if captcha else self.error_backoff
+            backoff = min(self.max_backoff, base * 2 ** (state['failures'] - 1))
+            cooldown = backoff * random.uniform(0.5, 1.0)
+            state['next_request'] = max(state['next_request'], monotonic() + cooldown)
+        return cooldown
+
+    def effective_rate(self):
+        """Current requests per minute of all identities together, within the RateLimiter cap."""
+        with self.lock:
+            now = monotonic()
+            rate = sum(60.0 / state['delay'] for state in self.identities.values()
+                       if state['next_request'] - now <= state['delay'] * 1.25)
+        if self.limiter:
+            rate = min(rate, self.limiter.rate * 60)
+        return rate
+
+
+def create_request_scheduler(limiter=None):
+    load_dotenv()
+    min_delay = float(os.getenv("SCRAPE_MIN_DELAY", "1"))
+    initial_delay = float(os.getenv("SCRAPE_INITIAL_DELAY", "3"))
+    captcha_backoff = float(os.getenv("SCRAPE_CAPTCHA_BACKOFF", "120"))
+    return RequestScheduler(limiter, min_delay=min_delay, initial_delay=initial_delay, captcha_backoff=captcha_backoff)
+
 
-def create_driver():
-    global DRIVER
+def create_driver(lean=True):
     firefox_options = Options()
     firefox_options.add_argument("--headless")
-    DRIVER = webdriver.Firefox(options=firefox_options)
+    if lean:
+        # Χωρίς εικόνες, CSS και web fonts· το driver.get επιστρέφει μόλις φορτωθεί το DOM
+        firefox_options.set_preference("permissions.default.image", 2)
+        firefox_options.set_preference("permissions.default.stylesheet", 2)
+        firefox_options.set_preference("browser.display.use_document_fonts", 0)
+        firefox_options.set_preference("gfx.downloadable_fonts.enabled", False)
+        firefox_options.page_load_strategy = "eager"
+    return webdriver.Firefox(options=firefox_options)
+
+
+def process_tree_rss_mb(pid):
+    """Resident memory of a process and all its descendants, from /proc (0 where /proc is missing)."""
+    total_kb = 0
+    pending = [pid]
+    while pending:
+        current = pending.pop()
+        try:
+            with open(f"/proc/{current}/status") as status:
+                for line in status:
+                    if line.startswith("VmRSS:"):
+                        total_kb += int(line.split()[1])
+                        break
+            for task in os.listdir(f"/proc/{current}/task"):
+                with open(f"/proc/{current}/task/{task}/children") as children:
+                    pending.extend(int(child) for child in children.read().split())
+        except (OSError, ValueError):
+            continue
+    return total_kb / 1024
+
+
+class DriverPool:
+    """One active Firefox plus a spare launched in the background.
+
+    The spare is swapped in at once when the active driver has to be replaced, either on
+    request (after repeated failures) or when it has loaded recycle_pages pages or its
+    process tree uses more than recycle_rss_mb MB; the old browser is quit in the background.
+    """
+
+    RSS_CHECK_EVERY = 25
+
+    def __init__(self, recycle_pages=500, recycle_rss_mb=1500, lean=True):
+        self.recycle_pages = recycle_pages
+        self.recycle_rss_mb = recycle_rss_mb
+        self.lean = lean
+        self.spare = None
+        self.spare_thread = None
+        self._launch_spare()
+        self.driver = self._take_spare()
+        self.pages = 0
+
+    def _launch_spare(self):
+        def launch():
+            try:
+                self.spare = create_driver(self.lean)
+            except Exception as e:
+                LOGGER.error(f"Error launching spare WebDriver: {e}")
+                self.spare = None
+
+        self.spare_thread = threading.Thread(target=launch, name=f"{threading.current_thread().name}-spare",
+                                             daemon=True)
+        self.spare_thread.start()
+
+    def _take_spare(self):
+        self.spare_thread.join()
+        driver = self.spare or create_driver(self.lean)
+        self.spare = None
+        self._launch_spare()
+        return driver
+
+    def replace(self, reason):
+        LOGGER.info(f"Replacing WebDriver ({reason}) after {self.pages} pages")
+        old_driver = self.driver
+        self.driver = self._take_spare()
+        self.pages = 0
+        threading.Thread(target=quit_driver, args=(old_driver,), daemon=True).start()
+        return self.driver
+
+    def page_loaded(self):
+        self.pages += 1
+        if self.recycle_pages and self.pages >= self.recycle_pages:
+            return self.replace("page limit")
+        if self.recycle_rss_mb and self.pages % self.RSS_CHECK_EVERY == 0:
+            browser_pid = self.driver.capabilities.get("moz:processID")
+            rss_mb = process_tree_rss_mb(browser_pid) if browser_pid else 0
+            if rss_mb > self.recycle_rss_mb:
+                return self.replace(f"{rss_mb:.0f} MB RSS")
+        return self.driver
+
+    def close(self):
+        quit_driver(self.driver)
+        self.spare_thread.join()
+        if self.spare:
+            quit_driver(self.spare)
+            self.spare = None
+
+
+def quit_driver(driver):
+    try:
+        driver.quit()
+    except Exception as e:
+        LOGGER.error(f"Error quitting driver: {e}")
 
 
-def create_connection():
+def create_driver_pool():
+    load_dotenv()
+    recycle_pages = int(os.getenv("DRIVER_RECYCLE_PAGES", "500"))
+    recycle_rss_mb = int(os.getenv("DRIVER_RECYCLE_RSS_MB", "1500"))
+    return DriverPool(recycle_pages, recycle_rss_mb)
+
+
+class SeleniumFetcher:
+    """Loads pages in headless Firefox and hands back the page source once per page."""
+
+    max_concurrency = 1  # Ένας browser φορτώνει μία σελίδα τη φορά
+
+    def __init__(self, scheduler=None):
+        self.scheduler = scheduler or RequestScheduler()
+        self.identity = self.scheduler.register()
+        self.failures_in_a_row = 0
+        self.pool = create_driver_pool()
+        self.driver = self.pool.driver
+
+    def _get(self, url):
+        self.scheduler.wait(self.identity)
+        try:
+            with run_metrics.timer('page_load'):
+                self.driver.get(url)
+        except Exception:
+            self.scheduler.failure(self.identity)
+            raise
+        if is_captcha_page(self.driver):
+            self.scheduler.failure(self.identity, captcha=True)
+            raise CaptchaError(self.driver.current_url)
+        self.scheduler.success(self.identity)
+        run_metrics.count('pages_loaded')
+
+    def _page_done(self, page_source):
+        self.driver = self.pool.page_loaded()
+        return page_source
+
+    def iter_profile(self, scholarid):
+        """Yields the profile page, then only the publication rows appended by each "Show more" click."""
+        self._get(SCHOLAR_URL + scholarid)
+        try:
+            yield self.driver.page_source
+            rows_loaded = self.driver.execute_script(PUBLICATION_ROW_COUNT_SCRIPT)
+            while True:
+                with run_metrics.timer('show_more'):
+                    rows_now = self._show_more(rows_loaded)
+                if rows_now <= rows_loaded:
+                    break
+                yield publication_rows_fragment(self.driver.execute_script(PUBLICATION_ROWS_SCRIPT, rows_loaded))
+                rows_loaded = rows_now
+        finally:
+            self._page_done(None)
+
+    def _show_more(self, rows_loaded):
+        """Clicks "Show more" and waits for the new rows; returns the number of rows in the table."""
+        try:
+            buttons = self.driver.find_elements(By.XPATH, '//*[@id="gsc_bpf_more"]')
+            if not buttons:
+                return rows_loaded
+            show_more_button = buttons[0]
+            self.driver.execute_script("arguments[0].scrollIntoView();", show_more_button)
+            WebDriverWait(self.driver, 2).until(EC.element_to_be_clickable((By.XPATH, '//*[@id="gsc_bpf_more"]')))
+            show_more_button.click()
+            WebDriverWait(self.driver, 5).until(
+                lambda driver: driver.execute_script(PUBLICATION_ROW_COUNT_SCRIPT) > rows_loaded)
+        except TimeoutException:
+            return rows_loaded
+        except (NoSuchElementException, ElementClickInterceptedException) as e:
+            LOGGER.error(f"Error interacting with ShowMore Button: {e}")
+            return rows_loaded
+        return self.driver.execute_script(PUBLICATION_ROW_COUNT_SCRIPT)
+
+    def fetch_publication(self, publication_url):
+        self._get(publication_url)
+        self.driver.execute_script("window.scrollBy(0, 300);")
+        return self._page_done(self.driver.page_source)
+
+    def restart(self):
+        self.driver = self.pool.replace(f"{self.failures_in_a_row} failures in a row")
+
+    def close(self):
+        self.pool.close()
+
+
+class HttpFetcher:
+    """Browserless backend: plain HTTP requests, with cstart/pagesize instead of "Show more"."""
+
+    def __init__(self, scheduler=None, timeout=30, max_concurrency=4):
+        self.scheduler = scheduler or RequestScheduler()
+        self.identity = self.scheduler.register()
+        self.timeout = timeout
+        self.max_concurrency = max_concurrency
+        self.failures_in_a_row = 0
+        # Ένα Session ανά αίτημα σε εξέλιξη, αφού το requests.Session δεν είναι thread-safe
+        self.sessions = queue.LifoQueue()
+
+    @staticmethod
+    def _new_session():
+        session = requests.Session()
+        session.headers.update({"User-Agent": HTTP_USER_AGENT, "Accept-Language": "en"})
+        return session
+
+    def _get(self, url):
+        self.scheduler.wait(self.identity)
+        try:
+            session = self.sessions.get_nowait()
+        except queue.Empty:
+            session = self._new_session()
+        try:
+            with run_metrics.timer('page_load'):
+                response = session.get(url, timeout=self.timeout)
+        except requests.RequestException:
+            self.scheduler.failure(self.identity)
+            raise
+        finally:
+            self.sessions.put(session)
+        if is_captcha_response(response):
+            self.scheduler.failure(self.identity, captcha=True)
+            raise CaptchaError(response.url)
+        if response.status_code >= 500:
+            self.scheduler.failure(self.identity)
+        response.raise_for_status()
+        self.scheduler.success(self.identity)
+        run_metrics.count('pages_loaded')
+        return response.text
+
+    def iter_profile(self, scholarid):
+        cstart = 0
+        while True:
+            page = self._get(f"{SCHOLAR_URL}{scholarid}&cstart={cstart}&pagesize={SCHOLAR_PAGE_SIZE}")
+            yield page
+            if count_publication_rows(page) < SCHOLAR_PAGE_SIZE:
+                break
+            cstart += SCHOLAR_PAGE_SIZE
+
+    def fetch_publication(self, publication_url):
+        return self._get(publication_url)
+
+    def restart(self):
+        self.close()
+        sleep(10)
+
+    def close(self):
+        while True:
+            try:
+                self.sessions.get_nowait().close()
+            except queue.Empty:
+                break
+
+
+class PageCache:
+    """Gzip-compressed copies of fetched pages, one file per URL and fetch date.
+
+    Files live under <directory>/<sha256(url)>/<fetch date>.json.gz. Reading a file marks it
+    as recently used; once the directory grows past max_bytes the least recently used files
+    are removed.
+    """
+
+    def __init__(self, directory, max_bytes):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+        self.size = sum(os.path.getsize(path) for path in self._files())
+
+    def _files(self):
+        for root, _, files in os.walk(self.directory):
+            for name in files:
+                yield os.path.join(root, name)
+
+    def _url_dir(self, url):
+        url_hash = hashlib.sha256(url.encode('utf-8')).hexdigest()
+        return os.path.join(self.directory, url_hash[:2], url_hash)
+
+    def put(self, url, content, fetch_date=None):
+        fetch_date = fetch_date or date.today()
+        url_dir = self._url_dir(url)
+        path = os.path.join(url_dir, f"{fetch_date.isoformat()}.json.gz")
+        data = gzip.compress(json.dumps({'url': url, 'content': content}).encode('utf-8'), compresslevel=6)
+        with self.lock:
+            os.makedirs(url_dir, exist_ok=True)
+            if os.path.exists(path):
+                self.size -= os.path.getsize(path)
+            with open(path + '.tmp', 'wb') as cache_file:
+                cache_file.write(data)
+            os.replace(path + '.tmp', path)
+            self.size += len(data)
+            if self.size > self.max_bytes:
+                self._evict()
+
+    def get(self, url, fetch_date=None):
+        """The page cached for url on fetch_date, or the most recent one; None when missing."""
+        url_dir = self._url_dir(url)
+        with self.lock:
+            if fetch_date:
+                name = f"{fetch_date.isoformat()}.json.gz"
+            else:
+                names = sorted(os.listdir(url_dir)) if os.path.isdir(url_dir) else []
+                name = names[-1] if names else None
+            path = os.path.join(url_dir, name) if name else None
+            if not path or not os.path.exists(path):
+                return None
+            os.utime(path)
+            with open(path, 'rb') as cache_file:
+                data = cache_file.read()
+        return json.loads(gzip.decompress(data))['content']
+
+    def _evict(self):
+        for path in sorted(self._files(), key=os.path.getmtime):
+            if self.size <= self.max_bytes * 0.9:
+                break
+            self.size -= os.path.getsize(path)
+            os.remove(path)
+
+
+class CachingFetcher:
+    """Wraps a network fetcher and stores every page it fetches in a PageCache."""
+
+    def __init__(self, fetcher, cache):
+        self.fetcher = fetcher
+        self.cache = cache
+        self.max_concurrency = fetcher.max_concurrency
+        self.failures_in_a_row = 0
+
+    def iter_profile(self, scholarid):
+        # Αποθηκεύονται οι σελίδες που καταναλώθηκαν, και όταν ο καταναλωτής σταματήσει νωρίς
+        pages = []
+        try:
+            for page in self.fetcher.iter_profile(scholarid):
+                pages.append(page)
+                yield page
+        except GeneratorExit:
+            self.cache.put(SCHOLAR_URL + scholarid, pages)
+            raise
+        self.cache.put(SCHOLAR_URL + scholarid, pages)
+
+    def fetch_publication(self, publication_url):
+        page = self.fetcher.fetch_publication(publication_url)
+        self.cache.put(publication_url, page)
+        return page
+
+    def restart(self):
+        self.fetcher.restart()
+
+    def close(self):
+        self.fetcher.close()
+
+
+class ReplayFetcher:
+    """Serves pages from a PageCache only, without any network access or delays."""
+
+    def __init__(self, cache, fetch_date=None, max_concurrency=4):
+        self.cache = cache
+        self.fetch_date = fetch_date
+        self.max_concurrency = max_concurrency
+        self.failures_in_a_row = 0
+
+    def _get(self, url):
+        content = self.cache.get(url, self.fetch_date)
+        if content is None:
+            raise LookupError(f"Not in page cache: {url}")
+        return content
+
+    def iter_profile(self, scholarid):
+        yield from self._get(SCHOLAR_URL + scholarid)
+
+    def fetch_publication(self, publication_url):
+        return self._get(publication_url)
+
+    def restart(self):
+        pass
+
+    def close(self):
+        pass
+
+
+def create_page_cache():
+    load_dotenv()
+    cache_dir = os.getenv("PAGE_CACHE_DIR")
+    if not cache_dir:
+        return None
+    return PageCache(cache_dir, int(os.getenv("PAGE_CACHE_MAX_MB", "2048")) * 1024 * 1024)
+
+
+def create_fetcher(backend=None, scheduler=None, cache=None, replay=False, replay_date=None):
+    if replay:
+        return ReplayFetcher(cache, replay_date, detail_concurrency)
     load_dotenv()
-    db_host = os.getenv("DB_HOST")
-    db = os.getenv("DB_DB")
-    db_user = os.getenv("DB_USER")
-    db_password = os.getenv("DB_PASSWORD")
+    backend = backend or os.getenv("SCRAPE_BACKEND", "selenium")
+    if backend == "http":
+        fetcher = HttpFetcher(scheduler, max_concurrency=detail_concurrency)
+    elif backend == "selenium":
+        fetcher = SeleniumFetcher(scheduler)
+    else:
+        raise ValueError(f"Unknown scrape backend: {backend}")
+    return CachingFetcher(fetcher, cache) if cache else fetcher
+
+
+fetcher_failures_lock = threading.Lock()
+
+
+def count_fetch_result(fetcher, success):
+    """Resets or increments fetcher.failures_in_a_row; detail pages of one fetcher are
+    fetched from several threads at once."""
+    with fetcher_failures_lock:
+        fetcher.failures_in_a_row = 0 if success else fetcher.failures_in_a_row + 1
+
+
+def fetcher_is_failing(fetcher):
+    with fetcher_failures_lock:
+        return fetcher.failures_in_a_row >= failed_times_to_restart
+
+
+def restart_fetcher_if_failing(fetcher):
+    """Restarts the fetcher after failed_times_to_restart failures in a row. Callers make
+    sure no request of the fetcher is in flight."""
+    if not fetcher_is_failing(fetcher):
+        return
+    LOGGER.warning(f"Restarting WebDriver after {fetcher.failures_in_a_row} consecutive failures...")
+    fetcher.restart()
+    count_fetch_result(fetcher, True)
+
+
+connection_pool = None
+connection_pool_lock = threading.Lock()
+
+
+def connection_pool_size():
+    workers = int(os.getenv("SCRAPE_WORKERS", "1"))
+    # Μία σύνδεση ανά worker, συν μία για το main thread (το mysql.connector δέχεται έως 32)
+    return min(32, int(os.getenv("DB_POOL_SIZE", str(workers + 1))))
+
+
+def get_connection_pool():
+    global connection_pool
+    with connection_pool_lock:
+        if connection_pool is None:
+            load_dotenv()
+            connection_pool = pooling.MySQLConnectionPool(pool_name="scholar",
+                                                          pool_size=connection_pool_size(),
+                                                          host=os.getenv("DB_HOST"),
+                                                          database=os.getenv("DB_DB"),
+                                                          user=os.getenv("DB_USER"),
+                                                          password=os.getenv("DB_PASSWORD"),
+                                                          charset="utf8mb4",
+                                                          collation="utf8mb4_unicode_ci")
+        return connection_pool
+
+
+def create_connection():
     try:
-        connection = mysql.connector.connect(host=db_host,
-                                             database=db,
-                                             user=db_user,
-                                             password=db_password,
-                                             charset="utf8mb4",
-                                             collation="utf8mb4_unicode_ci")
+        connection = get_connection_pool().get_connection()
         if connection.is_connected():
              ## LOGGER.info("DataBase Connected")
-            return connection
+            return ManagedConnection(connection, int(os.getenv("DB_HEALTH_CHECK_SECONDS", "60")))
     except mysql.connector.Error as e:
         LOGGER.error(f"DataBase Connection Error: {e}")
         return None
 
 
-def get_staff_statistics_scrape(x_path):
+def set_history_deferred(connection, deferred):
+    """Bypasses (or restores) the history triggers of Database/triggers.txt for the session.
+
+    While deferred, a row gets a history record for every write UnitOfWork.record() is told
+    about, whether or not its values changed, exactly as a trigger fires for every row an
+    UPDATE matches. The writers therefore stage only rows that differ from the stored ones
+    (GraphSync.stage(), the *_boolean flags of update_publication(), the fingerprints of
+    process_staff()), so both modes record the same changes.
+    """
+    value = 1 if deferred else None
+    if hasattr(connection, 'set_session_variable'):
+        connection.set_session_variable('history_deferred', value)
+        return
+    cursor = connection.cursor()
+    try:
+        cursor.execute('SET @history_deferred = %s', (value,))
+    finally:
+        cursor.close()
+
+
+def history_insert(table, key_columns, keys_by_operation):
+    """INSERT ... SELECT that copies the current values of rows of `table` into its records
+    table, as the history triggers do, and its parameters. `keys_by_operation` maps
+    'INSERT' / 'UPDATE' / 'DELETE' to the key tuples of the rows recorded with it."""
+    tracked = changes.TRACKED[f'{table}_records']
+    columns = ', '.join(f'`{column}`' for column in changes.record_columns(tracked))
+    selects, values = [], []
+    for operation, keys in keys_by_operation.items():
+        if len(key_columns) == 1:
+            condition = f'`{key_columns[0]}` IN ({", ".join(["%s"] * len(keys))})'
+        else:
+            row = f'({", ".join(["%s"] * len(key_columns))})'
+            condition = f'({", ".join(f"`{column}`" for column in key_columns)}) IN ({", ".join([row] * len(keys))})'
+        selects.append(f"SELECT {columns}, '{operation}' FROM {table} WHERE {condition}")
+        values.extend(int(value) for key in keys for value in key)
+    return f'INSERT INTO {table}_records ({columns}, operation) {" UNION ALL ".join(selects)}', tuple(values)
+
+
+class UnitOfWork:
+    """Collects the writes of one staff member and applies them in a single transaction.
+
+    Writes are queued in the order they are staged and sent on flush(); consecutive
+    writes with the same statement go out together with executemany. Inserts whose
+    auto-increment id is needed right away go through execute_now(), which first sends
+    the queued writes, so the statements reach the database in the order they were staged.
+
+    With history_mode 'deferred' the history triggers are bypassed for the connection and
+    the writes report the rows they touch through record(). flush() then copies those rows
+    into the *_records tables with one INSERT ... SELECT per table, after the writes: each
+    row gets one record with its final values, however many writes it took. Deleted rows
+    are copied just before their DELETE. Every write to a table with history must then go
+    through a UnitOfWork, and only for rows that actually changed (see set_history_deferred()).
+    """
+
+    def __init__(self, connection):
+        self.connection = connection
+        self.pending = []
+        self.failed = False
+        self.history = {} if history_mode == 'deferred' else None
+        if self.history is not None:
+            set_history_deferred(connection, True)
+
+    def add(self, query, values):
+        if self.pending and self.pending[-1][0] == query:
+            self.pending[-1][1].append(values)
+        else:
+            self.pending.append((query, [values]))
+
+    def _send_pending(self, cursor):
+        try:
+            for query, rows in self.pending:
+                cursor.executemany(query, rows)
+        except Exception:
+            # Μέρος των εντολών έχει ήδη σταλεί: το flush() πρέπει να κάνει rollback
+            self.failed = True
+            raise
+        finally:
+            self.pending.clear()
+
+    def execute_now(self, cursor, query, values):
+        """Sends the queued writes and then `query` on `cursor`, without a commit."""
+        if self.failed:
+            raise mysql.connector.Error("An earlier write of this unit of work failed")
+        pending_cursor = self.connection.cursor()
+        try:
+            self._send_pending(pending_cursor)
+        finally:
+            pending_cursor.close()
+        try:
+            cursor.execute(query, values)
+        except Exception:
+            self.failed = True
+            raise
+
+    def record(self, table, operation, key_columns, keys):
+        """Notes that the writes staged so far INSERT, UPDATE or DELETE the `keys` rows of `table`."""
+        if self.history is None or not keys:
+            return
+        key_columns = tuple(key_columns)
+        keys = [tuple(int(value) for value in key) for key in keys]
+        rows = self.history.setdefault((table, key_columns), {})
+        if operation == 'DELETE':
+            self.add(*history_insert(table, key_columns, {operation: keys}))
+            for key in keys:
+                rows.pop(key, None)
+            return
+        for key in keys:
+            # Ένα INSERT που ακολουθείται από UPDATE μένει INSERT
+            rows.setdefault(key, operation)
+
+    def history_statements(self):
+        for (table, key_columns), rows in self.history.items():
+            keys_by_operation = {}
+            for key, operation in rows.items():
+                keys_by_operation.setdefault(operation, []).append(key)
+            if keys_by_operation:
+                yield history_insert(table, key_columns, keys_by_operation)
+
+    @run_metrics.timed('db')
+    def flush(self):
+        cursor = self.connection.cursor()
+        try:
+            if self.failed:
+                raise mysql.connector.Error("An earlier write of this unit of work failed")
+            self._send_pending(cursor)
+            if self.history:
+                for query, values in self.history_statements():
+                    cursor.execute(query, values)
+            self.connection.commit()
+            return True
+        except Exception as e:
+            LOGGER.error(f"Error on flushing staff writes, rolling back: {e}")
+            self.connection.rollback()
+            return False
+        finally:
+            self.pending.clear()
+            self.failed = False
+            if self.history:
+                self.history.clear()
+            cursor.close()
+
+    def rollback(self):
+        self.pending.clear()
+        self.failed = False
+        if self.history:
+            self.history.clear()
+        try:
+            self.connection.rollback()
+        except Exception as e:
+            LOGGER.error(f"Error on rollback: {e}")
+
+
+def execute_write(connection, cursor, query, values, uow=None):
+    if uow is not None:
+        uow.add(query, values)
+        return
+    cursor.execute(query, values)
+    connection.commit()
+
+
+def record_history(uow, table, operation, **key):
+    if uow is not None:
+        uow.record(table, operation, key.keys(), [tuple(key.values())])
+
+
+def parse_staff_statistics(tree):
     try:
-        all_stats = DRIVER.find_elements(By.XPATH, x_path)
+        all_stats = tree.xpath('//*[@id="gsc_rsb_st"]//tr')
         data = []
-        if not all_stats or len(all_stats) < 3:
-            LOGGER.warning("Less than 3 stats found on Scholar profile.")
-            return []
         for row in all_stats:
-            cells = row.find_elements(By.TAG_NAME, "td")
-            if len(cells) > 0:
-                all_data = cells[1].get_attribute("innerHTML")
-                last_5_years_data = cells[2].get_attribute("innerHTML")
+            cells = row.xpath('./td')
+            if len(cells) > 2:
+                all_data = cells[1].text_content()
+                last_5_years_data = cells[2].text_content()
                 data.append((all_data, last_5_years_data))
+        if len(data) < 3:
+            LOGGER.warning("Less than 3 stats found on Scholar profile.")
+            return []
         return data
     except Exception as e:
         LOGGER.error(f"Error getting staff statistics: {e}")
         return []
 
 
-def calculate_h_index(citations_list):
-    sorted_citations = sorted(citations_list, reverse=True)
-    h_index = sum(1 for i, c in enumerate(sorted_citations) if c >= i + 1)
-    return h_index
-
-
-def calculate_i10_index(citations_list):
-    return sum(1 for c in citations_list if c >= 10)
-
-
+@run_metrics.timed('stats')
 def calculate_stats(publications_df):
-    current_year = date.today().year
+    indices = metrics.indices_by_staff(np.zeros(len(publications_df), dtype=np.int64),
+                                       publications_df['citations'].to_numpy(dtype=np.int64, na_value=0),
+                                       publications_df['years'].to_numpy(dtype=float, na_value=np.nan))
+    if indices.empty:
+        return dict.fromkeys(metrics.INDEX_COLUMNS, 0)
+    return {column: int(value) for column, value in indices.iloc[0].items()}
 
-    recent_df = publications_df[
-        pd.to_numeric(publications_df['years'], errors='coerce').fillna(0).astype(int) >= (current_year - 5)
-    ]
 
-    all_citations = publications_df['citations'].astype(int).tolist()
-    recent_citations = recent_df['citations'].astype(int).tolist()
-    # LOGGER.info((recent_df[recent_df['citations'].astype(int) >= 10][['titles', 'years', 'citations']]))
-    return {
-        'h_index': calculate_h_index(all_citations),
-        'h_index_5y': calculate_h_index(recent_citations),
-        'i10_index': calculate_i10_index(all_citations),
-        'i10_index_5y': sum(1 for c in recent_citations if c >= 10)
-    }
+def record_captcha(method):
+    run_metrics.count('captcha_detections')
+    run_metrics.count(f'captcha_detections_by_{method}')
+    return True
 
 
 def is_captcha_page(driver):
+    # Πρώτα οι φθηνοί έλεγχοι (URL, στοιχεία-φρουροί)· το page_source διαβάζεται μόνο αν δεν αποφασίσουν
     try:
-        current_url = driver.current_url
-        if "/sorry/" in current_url or "/sorry" in current_url:
-            return True
+        if "/sorry" in driver.current_url:
+            return record_captcha('url')
 
-        page_source = driver.page_source.lower()
-        if "unusual traffic" in page_source or "please show you're not a robot" in page_source:
-            return True
+        sentinels = driver.find_elements(By.CSS_SELECTOR, CAPTCHA_SENTINEL_SELECTOR)
+        if sentinels:
+            if sentinels[0].get_attribute("id") in CONTENT_SENTINEL_IDS:
+                return False
+            return record_captcha('sentinel')
+
+        if is_captcha_html(driver.page_source):
+            return record_captcha('source')
 
     except Exception as e:
         LOGGER.error(f"Error checking captcha page: {e}")
@@ -123,102 +1114,182 @@ def is_captcha_page(driver):
     return False
 
 
-def get_publications_scrape(scholarid):
-    global failures_in_a_row
+def is_captcha_response(response):
+    if response.status_code == 429 or "/sorry" in response.url:
+        return record_captcha('status' if response.status_code == 429 else 'url')
+    if any(f'id="{sentinel_id}"' in response.text for sentinel_id in CONTENT_SENTINEL_IDS):
+        return False
+    if is_captcha_html(response.text):
+        return record_captcha('source')
+    return False
 
-    sleep(2)
-    full_scholar_url = SCHOLAR_URL + scholarid
 
-    try:
-        DRIVER.get(full_scholar_url)
-    except Exception as e:
-        LOGGER.error(f"Timeout or error loading scholar page for scholarid={scholarid}: {e}")
-        failures_in_a_row += 1
-        return None, None, None, None
-    
-    if is_captcha_page(DRIVER):
-        LOGGER.error(f"Captcha detected for scholarid={scholarid} — Sleeping 5 minutes...")
-        failures_in_a_row += 1
-        sleep(300)  # Κάνε pause 5 λεπτά
-        return None, None, None, None
+def is_captcha_html(page_source):
+    return CAPTCHA_TEXT.search(page_source) is not None
 
-    failures_in_a_row = 0
 
-    staff_citations_graph = get_graph_scrape('//*[@id="gsc_rsb_cit"]/div/div[3]/div')
-    staff_stats = get_staff_statistics_scrape('//*[@id="gsc_rsb_st"]/tbody/tr')
+def publication_rows_fragment(rows_html):
+    """Wraps publication rows taken from the live page so that parse_publication_rows can read them."""
+    return f'<table><tbody id="gsc_a_b">{rows_html}</tbody></table>'
 
-    while True:
-        try:
-            buttons = DRIVER.find_elements(By.XPATH, '//*[@id="gsc_bpf_more"]')
-            if buttons:
-                show_more_button = buttons[0]
-                DRIVER.execute_script("arguments[0].scrollIntoView();", show_more_button)
-                WebDriverWait(DRIVER, 2).until(EC.element_to_be_clickable((By.XPATH, '//*[@id="gsc_bpf_more"]')))
-                show_more_button.click()
-            else:
-                break
-        except TimeoutException:
-            break
-        except (NoSuchElementException, ElementClickInterceptedException) as e:
-            LOGGER.error(f"Error interacting with ShowMore Button: {e}")
+
+def count_publication_rows(page_source):
+    return len(lxml_html.fromstring(page_source).xpath('//*[@id="gsc_a_b"]/tr[td[1]/a]'))
+
+
+# Τύποι των στηλών από τη στιγμή της ανάλυσης/ανάγνωσης: οι αναφορές πάντα ακέραιοι (0 αν λείπουν),
+# τα έτη nullable ακέραιοι (<NA> αν λείπουν), ποτέ συμβολοσειρές ή 'NULL'
+SCRAPED_PUBLICATION_DTYPES = {'titles': 'string', 'years': 'Int16', 'urls': 'string', 'citations': 'int32',
+                              'publication_scholar_ids': 'string'}
+STORED_PUBLICATION_DTYPES = {'titles': 'string', 'years': 'Int16', 'urls': 'string', 'citations': 'Int32',
+                             'publication_scholar_ids': 'string', 'author_order': 'Int16', 'authors': 'string',
+                             'journal': 'category', 'publisher': 'category', 'publication_id': 'int64'}
+
+
+def none_if_na(value):
+    """Plain Python value for the DB driver and comparisons: NA becomes None, NumPy numbers become int."""
+    if value is None or (not isinstance(value, (str, date)) and pd.isna(value)):
+        return None
+    if isinstance(value, np.integer):
+        return int(value)
+    return value
+
+
+def publication_row(publications_df, position):
+    return {column: none_if_na(value) for column, value in publications_df.iloc[position].items()}
+
+
+def parse_publication_rows(tree):
+    titles = []
+    publications_urls = []
+    publications_scholar_ids = []
+    citations = []
+    years = []
+
+    for row in tree.xpath('//*[@id="gsc_a_b"]/tr[td[1]/a]'):
+        element = row.xpath('./td[1]/a')[0]
+        title = element.text_content() or "NULL"
+        href = element.get('href') or element.get('data-href')
+        publication_url = urljoin(SCHOLAR_BASE_URL, href) if href else None
+        citation_cell = row.xpath('./td[2]/a')
+        citation_digits = re.sub(r'\D', '', citation_cell[0].text_content() if citation_cell else '')
+        year_cell = row.xpath('./td[3]/span')
+        year_digits = re.sub(r'\D', '', year_cell[0].text_content() if year_cell else '')
+        match = re.search(r'citation_for_view=[^:]+:([^&]+)', publication_url or '')
+        if match:
+            publications_scholar_ids.append(match.group(1))
+        else:
+            publications_scholar_ids.append(None)
+
+        titles.append(title)
+        publications_urls.append(publication_url)
+        citations.append(int(citation_digits) if citation_digits else 0)
+        years.append(max(int(year_digits), 1901) if year_digits else None)
+
+    return titles, years, publications_urls, citations, publications_scholar_ids
+
+
+def known_publication_citations(publications_df_db):
+    """Stored citation counts keyed by publication_scholar_id and by URL."""
+    known_citations = {}
+    if publications_df_db.empty:
+        return known_citations
+    for scholar_id, url, citations in zip(publications_df_db['publication_scholar_ids'],
+                                          publications_df_db['urls'], publications_df_db['citations']):
+        if not pd.notna(citations):
+            continue
+        if isinstance(scholar_id, str) and scholar_id:
+            known_citations.setdefault(scholar_id, int(citations))
+        if isinstance(url, str) and url:
+            known_citations.setdefault(url, int(citations))
+    return known_citations
+
+
+def rows_match_known_citations(rows, known_citations):
+    """True when every row is a stored publication with unchanged citations (matched as in partition_publications)."""
+    _, _, urls, citations, scholar_ids = rows
+    if not citations:
+        return False
+    for url, citation, scholar_id in zip(urls, citations, scholar_ids):
+        key = scholar_id if scholar_id in known_citations else url
+        if known_citations.get(key) != int(citation):
+            return False
+    return True
+
+
+def parse_profile_pages(pages, known_citations=None):
+    """Parses the profile page(s) of one scholar into
+    (publications_df, rows_length, staff_citations_graph, staff_stats, complete).
+
+    `pages` may be a generator. With known_citations, consumption stops after the first page
+    whose rows all match stored publications with the same citations: Scholar lists
+    publications by citations, so the rest are taken as unchanged and complete is False.
+    """
+    staff_citations_graph = None
+    staff_stats = None
+    complete = True
+    columns = ([], [], [], [], [])
+    for n, page in enumerate(pages):
+        with run_metrics.timer('parse.profile_page'):
+            tree = lxml_html.fromstring(page)
+            if n == 0:
+                staff_citations_graph = parse_graph(tree, '//*[@id="gsc_rsb_cit"]/div/div[3]/div')
+                staff_stats = parse_staff_statistics(tree)
+            rows = parse_publication_rows(tree)
+            for column, values in zip(columns, rows):
+                column.extend(values)
+        if known_citations and rows_match_known_citations(rows, known_citations):
+            complete = False
             break
+    if hasattr(pages, 'close'):
+        pages.close()
+    titles, years, publications_urls, citations, publications_scholar_ids = columns
 
-    try:
-        rows_length = len(DRIVER.find_elements(By.XPATH, '//*[@id="gsc_a_b"]/tr'))
-        titles = []
-        publications_urls = []
-        publications_scholar_ids = []
-        citations = []
-        years = []
-
-        for i in range(1, rows_length + 1):
-            element = DRIVER.find_element(By.XPATH, f'//*[@id="gsc_a_b"]/tr[{i}]/td[1]/a')
-            title = element.text if element.text else "NULL"
-            publication_url = element.get_attribute('href') if element.get_attribute('href') else None
-            citation = (DRIVER.find_element(By.XPATH, f'//*[@id="gsc_a_b"]/tr[{i}]/td[2]/a').get_attribute("innerHTML") or None)
-            year = (DRIVER.find_element(By.XPATH, f'//*[@id="gsc_a_b"]/tr[{i}]/td[3]/span').get_attribute("innerHTML") or None)
-            match = re.search(r'citation_for_view=[^:]+:([^&]+)', publication_url)
-            if match:
-                publication_scholar_id = match.group(1)
-                publications_scholar_ids.append(publication_scholar_id)
-            else:
-                publications_scholar_ids.append(None)
-
-            titles.append(title)
-            publications_urls.append(publication_url)
-            if citation is None:
-                citation = 0
-            citations.append(citation)
-            if year and int(year) < 1901:
-                year = '1901'
-            years.append(year)
-
-        # Creating the DataFrame with the desired columns
-        publications_df = pd.DataFrame({
-            'titles': titles,
-            'years': years,
-            'urls': publications_urls,
-            'citations': citations,
-            'publication_scholar_ids': publications_scholar_ids
-        })
-
-        return publications_df, rows_length, staff_citations_graph, staff_stats
+    publications_df = pd.DataFrame({
+        'titles': titles,
+        'years': years,
+        'urls': publications_urls,
+        'citations': citations,
+        'publication_scholar_ids': publications_scholar_ids
+    }).astype(SCRAPED_PUBLICATION_DTYPES)
 
+    return publications_df, len(titles), staff_citations_graph, staff_stats, complete
+
+
+@run_metrics.timed('scrape')
+def get_publications_scrape(scholarid, fetcher, known_citations=None):
+    # Η φόρτωση και η ανάλυση των σελίδων γίνονται μαζί, καθώς το προφίλ επεκτείνεται
+    try:
+        result = parse_profile_pages(fetcher.iter_profile(scholarid), known_citations)
+    except CaptchaError:
+        # Η παύση (cool-down) της ταυτότητας ορίζεται από τον RequestScheduler
+        LOGGER.error(f"Captcha detected for scholarid={scholarid} — backing off")
+        count_fetch_result(fetcher, False)
+        return None, None, None, None, False
     except Exception as e:
-        LOGGER.error(f"Error on Publications Scraping: {e}")
-        return None, None, None, None
+        LOGGER.error(f"Timeout or error loading scholar page for scholarid={scholarid}: {e}")
+        count_fetch_result(fetcher, False)
+        return None, None, None, None, False
 
+    count_fetch_result(fetcher, True)
+    return result
 
-def insert_publication(connection, title, year, publication_url, citations, publication_scholar_id):
-    cursor = connection.cursor()
+
+@run_metrics.timed('db')
+def insert_publication(connection, title, year, publication_url, citations, publication_scholar_id, uow=None):
+    cursor = connection.cursor(prepared=True)
     query = ('INSERT INTO publications (publication_title, citations, publication_url, '
              'publication_year, publication_scholar_id) VALUES (%s, %s, %s, %s, %s)')
     try:
-        cursor.execute(query, (title, citations, publication_url, year, publication_scholar_id))
-        connection.commit()
+        if uow is None:
+            cursor.execute(query, (title, citations, publication_url, year, publication_scholar_id))
+            connection.commit()
+        else:
+            uow.execute_now(cursor, query, (title, citations, publication_url, year, publication_scholar_id))
 
         publication_id = cursor.lastrowid
         if publication_id is not None:
+            record_history(uow, 'publications', 'INSERT', publication_id=publication_id)
             return publication_id
         else:
             LOGGER.error(f"Failed to retrieve publication_id after insertion. title: {title}, citations: {citations}, url: {publication_url}, "
@@ -231,6 +1302,7 @@ def insert_publication(connection, title, year, publication_url, citations, publ
         cursor.close()
 
 
+@run_metrics.timed('db')
 def get_staff_id(connection, scholar_id):
     cursor = connection.cursor()
     staff_id = 0
@@ -250,6 +1322,7 @@ def get_staff_id(connection, scholar_id):
     return staff_id
 
 
+@run_metrics.timed('db')
 def get_staff_name(connection, staff_id):
     cursor = connection.cursor()
     query = "SELECT CONCAT(first_name, ' ', last_name) AS name FROM staff WHERE staff_id = %s"
@@ -264,21 +1337,22 @@ def get_staff_name(connection, staff_id):
     return staff_full_name
 
 
-def insert_publication_staff(connection, staff_id, publication_id):
+@run_metrics.timed('db')
+def insert_publication_staff(connection, staff_id, publication_id, uow=None):
     cursor = connection.cursor()
     try:
         query = 'INSERT INTO publications_staff (staff_id, publication_id) VALUES (%s, %s)'
-        cursor.execute(query, (staff_id, publication_id))
-        connection.commit()
-        publication_staff_id = cursor.lastrowid
-        return publication_staff_id
+        execute_write(connection, cursor, query, (staff_id, publication_id), uow)
+        # Το ίδιο κλειδί με τα UPDATE του author_order, ώστε η γραμμή να καταγράφεται μία φορά
+        record_history(uow, 'publications_staff', 'INSERT', staff_id=staff_id, publication_id=publication_id)
     except Exception as e:
         LOGGER.error(f"Error on Publication Staff Insertion: {e}")
     finally:
         cursor.close()
 
 
-def update_publication_stats(connection, publication_id, authors, journal, publisher, publication_date):
+@run_metrics.timed('db')
+def update_publication_stats(connection, publication_id, authors, journal, publisher, publication_date, uow=None):
     cursor = connection.cursor()
     query = 'UPDATE publications SET '
     values = []
@@ -312,26 +1386,28 @@ def update_publication_stats(connection, publication_id, authors, journal, publi
     values.append(publication_id)
 
     try:
-        cursor.execute(query, tuple(values))
-        connection.commit()
+        execute_write(connection, cursor, query, tuple(values), uow)
+        record_history(uow, 'publications', 'UPDATE', publication_id=publication_id)
     except Exception as e:
         LOGGER.error(f"Error on Publication Stats Insertion: {e}")
     finally:
         cursor.close()
 
 
-def insert_publication_staff_author_order(connection, publication_staff_id, author_order):
+@run_metrics.timed('db')
+def insert_publication_staff_author_order(connection, staff_id, publication_id, author_order, uow=None):
     cursor = connection.cursor()
     try:
-        query = 'UPDATE publications_staff SET  author_order = %s WHERE publication_staff_id = %s'
-        cursor.execute(query, (author_order, publication_staff_id))
-        connection.commit()
+        query = "UPDATE publications_staff SET author_order = %s WHERE staff_id = %s AND publication_id = %s"
+        execute_write(connection, cursor, query, (author_order, staff_id, publication_id), uow)
+        record_history(uow, 'publications_staff', 'UPDATE', staff_id=staff_id, publication_id=publication_id)
     except Exception as e:
         LOGGER.error(f"Error on Publication Staff Author Order Insertion: {e}")
     finally:
         cursor.close()
 
 
+@run_metrics.timed('db')
 def get_all_staff(connection):
     cursor = connection.cursor()
     query = "SELECT staff_id, scholar_id, CONCAT(first_name, ' ', last_name) AS name FROM staff"
@@ -346,24 +1422,145 @@ def get_all_staff(connection):
     return all_staff
 
 
-def get_graph_scrape(x_path):
+@run_metrics.timed('db')
+def get_staff_to_crawl(connection, freshness_days):
+    """Staff not successfully crawled within the freshness window; interrupted ones come first."""
+    cursor = connection.cursor()
+    query = ("SELECT s.staff_id, s.scholar_id, CONCAT(s.first_name, ' ', s.last_name) AS name "
+             "FROM staff s LEFT JOIN crawl_state c ON c.staff_id = s.staff_id "
+             "WHERE c.last_success IS NULL OR c.last_success < NOW() - INTERVAL %s DAY "
+             "ORDER BY c.status = 'in_progress' DESC, s.staff_id")
+    staff = []
+    try:
+        cursor.execute(query, (freshness_days,))
+        staff = cursor.fetchall()
+    except mysql.connector.Error as e:
+        LOGGER.error(f"Error on Getting Staff To Crawl: {e}")
+    finally:
+        cursor.close()
+    return staff
+
+
+@run_metrics.timed('db')
+def mark_crawl_started(connection, staff_id):
+    cursor = connection.cursor()
+    try:
+        # Ένα διακομμένο crawl κρατά την τελευταία δημοσίευση που επεξεργάστηκε
+        query = ("INSERT INTO crawl_state (staff_id, status) VALUES (%s, 'in_progress') "
+                 "ON DUPLICATE KEY UPDATE last_publication_url = IF(status = 'in_progress', last_publication_url, NULL), "
+                 "status = 'in_progress'")
+        cursor.execute(query, (staff_id,))
+        connection.commit()
+    except Exception as e:
+        LOGGER.error(f"Error on mark_crawl_started: {e}")
+    finally:
+        cursor.close()
+
+
+@run_metrics.timed('db')
+def needs_full_profile(connection, staff_id):
+    """True when the profile of the staff member was not fully expanded within full_profile_days."""
+    cursor = connection.cursor()
+    try:
+        query = ('SELECT last_full_scrape >= NOW() - INTERVAL %s DAY FROM crawl_state WHERE staff_id = %s')
+        cursor.execute(query, (full_profile_days, staff_id))
+        row = cursor.fetchone()
+        return not (row and row[0])
+    except Exception as e:
+        LOGGER.error(f"Error on needs_full_profile: {e}")
+        return True
+    finally:
+        cursor.close()
+
+
+@run_metrics.timed('db')
+def mark_full_profile_scrape(connection, staff_id, uow=None):
+    cursor = connection.cursor()
+    try:
+        query = 'UPDATE crawl_state SET last_full_scrape = NOW() WHERE staff_id = %s'
+        execute_write(connection, cursor, query, (staff_id,), uow)
+    except Exception as e:
+        LOGGER.error(f"Error on mark_full_profile_scrape: {e}")
+    finally:
+        cursor.close()
+
+
+@run_metrics.timed('db')
+def get_crawl_checkpoint(connection, staff_id):
+    """The last publication committed by an interrupted crawl of the staff member, or None."""
+    cursor = connection.cursor()
+    try:
+        query = "SELECT last_publication_url FROM crawl_state WHERE staff_id = %s AND status = 'in_progress'"
+        cursor.execute(query, (staff_id,))
+        row = cursor.fetchone()
+        return row[0] if row else None
+    except Exception as e:
+        LOGGER.error(f"Error on get_crawl_checkpoint: {e}")
+        return None
+    finally:
+        cursor.close()
+
+
+@run_metrics.timed('db')
+def mark_crawl_progress(connection, staff_id, publication_url, uow=None):
+    cursor = connection.cursor()
+    try:
+        query = 'UPDATE crawl_state SET last_publication_url = %s WHERE staff_id = %s'
+        execute_write(connection, cursor, query, (publication_url, staff_id), uow)
+    except Exception as e:
+        LOGGER.error(f"Error on mark_crawl_progress: {e}")
+    finally:
+        cursor.close()
+
+
+@run_metrics.timed('db')
+def mark_crawl_finished(connection, staff_id, success):
+    cursor = connection.cursor()
+    try:
+        if success:
+            query = "UPDATE crawl_state SET status = 'done', last_success = NOW() WHERE staff_id = %s"
+        else:
+            query = "UPDATE crawl_state SET status = 'failed' WHERE staff_id = %s"
+        cursor.execute(query, (staff_id,))
+        connection.commit()
+    except Exception as e:
+        LOGGER.error(f"Error on mark_crawl_finished: {e}")
+    finally:
+        cursor.close()
+
+
+@run_metrics.timed('db')
+def crawl_active(connection, minutes):
+    """True when a staff member is marked in_progress and its crawl_state changed within `minutes`."""
+    cursor = connection.cursor()
+    try:
+        query = ("SELECT COUNT(*) FROM crawl_state "
+                 "WHERE status = 'in_progress' AND updated_at >= NOW() - INTERVAL %s MINUTE")
+        cursor.execute(query, (minutes,))
+        return cursor.fetchone()[0] > 0
+    except Exception as e:
+        LOGGER.error(f"Error on crawl_active: {e}")
+        # Χωρίς απάντηση θεωρούμε ότι τρέχει crawl: ο change feed απλώς περιμένει την επόμενη εκτέλεση
+        return True
+    finally:
+        cursor.close()
+
+
+def parse_graph(tree, x_path):
     graph = []
-    citations = DRIVER.find_elements(By.XPATH, x_path + '/a')
     citations_zindex = []
     citations_data = []
-    for citation in citations:
+    for citation in tree.xpath(x_path + '/a'):
         try:
-            z_index = int(citation.get_attribute('style').split('z-index:')[-1].split(';')[0])
+            z_index = int(citation.get('style', '').split('z-index:')[-1].split(';')[0])
             citations_zindex.insert(0, z_index)
-            citations = citation.find_element(By.TAG_NAME, "span").get_attribute("innerHTML")
-            citations_data.insert(0, citations)
-        except IndexError:
-            LOGGER.error(f"Error on get_graph_scrape")
+            citations_data.insert(0, citation.xpath('./span')[0].text_content())
+        except (IndexError, ValueError):
+            LOGGER.error(f"Error on parse_graph")
 
-    years = DRIVER.find_elements(By.XPATH, x_path + '/span')
     years_data = []
-    for year in years:
-        years_data.insert(0, year.get_attribute("innerHTML"))
+    for year in tree.xpath(x_path + '/span'):
+        years_data.insert(0, year.text_content())
 
     j = 0
     for i in range(1, len(years_data) + 1):
@@ -373,22 +1570,9 @@ def get_graph_scrape(x_path):
     return graph
 
 
-def get_publication_stats_scrape(publication_url, staff_name):
-    global failures_in_a_row
-
-    try:
-        DRIVER.get(publication_url)
-    except Exception as e:
-        LOGGER.error(f"Timeout or error loading publication URL: {publication_url} — {e}")
-        failures_in_a_row += 1
-        return '', '', '', '', 0, []  # Γυρνά κενές τιμές για authors, journal, publisher, publication_date, author_order, citations_graph
-
-    failures_in_a_row = 0  # Αν όλα πάνε καλά, μηδένισε τα failures
-
-    DRIVER.execute_script("window.scrollBy(0, 300);")
-    sleep(random.randint(2, 4))
-
-    cols = len(DRIVER.find_elements(By.XPATH, '//*[@id="gsc_oci_table"]/div'))
+@run_metrics.timed('parse')
+def parse_publication_page(page_source, staff_name):
+    tree = lxml_html.fromstring(page_source)
     authors = ''
     author_order = 0
     publication_date = ''
@@ -396,23 +1580,18 @@ def get_publication_stats_scrape(publication_url, staff_name):
     publisher = ''
     citations_graph = []
 
-    for i in range(1, cols + 1):
-        element = (DRIVER.find_element(By.XPATH, f'//*[@id="gsc_oci_table"]/div[{i}]/div[1]')
-                   .get_attribute("innerHTML"))
+    for row in tree.xpath('//*[@id="gsc_oci_table"]/div'):
+        fields = row.xpath('./div')
+        if not fields:
+            continue
+        element = fields[0].text_content()
+        tmp = fields[1].text_content() if len(fields) > 1 else ''
 
         if element == "Authors":
-            tmp = (DRIVER.find_element(By.XPATH, f'//*[@id="gsc_oci_table"]/div[{i}]/div[2]')
-                   .get_attribute("innerHTML"))
             if tmp:
                 authors = tmp
-                authors_array = authors.split(', ')
-                for order, name in enumerate(authors_array):
-                    name_similarity_percentage = fuzz.partial_ratio(staff_name, name)
-                    if name_similarity_percentage > 60:
-                        author_order = order + 1
+                author_order = names.author_position(staff_name, authors.split(', '))
         elif element == "Publication date":
-            tmp = (DRIVER.find_element(By.XPATH, f'//*[@id="gsc_oci_table"]/div[{i}]/div[2]')
-                   .get_attribute("innerHTML"))
             if tmp:
                 try:
                     if len(tmp.split("/")) == 1 and re.fullmatch(r"\d{4}", tmp):
@@ -425,65 +1604,87 @@ def get_publication_stats_scrape(publication_url, staff_name):
                     LOGGER.error(f"Date: {tmp} Out Of Date Range")
                     publication_date = ''
         elif element == "Journal":
-            tmp = (DRIVER.find_element(By.XPATH, f'//*[@id="gsc_oci_table"]/div[{i}]/div[2]')
-                   .get_attribute("innerHTML"))
             if tmp:
                 journal = tmp
         elif element == "Publisher":
-            tmp = (DRIVER.find_element(By.XPATH, f'//*[@id="gsc_oci_table"]/div[{i}]/div[2]')
-                   .get_attribute("innerHTML"))
             if tmp:
                 publisher = tmp
         elif element == "Total citations":
-            citations_graph = get_graph_scrape('//*[@id="gsc_oci_graph_bars"]')
+            citations_graph = parse_graph(tree, '//*[@id="gsc_oci_graph_bars"]')
 
     return authors, journal, publisher, publication_date, author_order, citations_graph
 
 
+@run_metrics.timed('scrape')
+def get_publication_stats_scrape(publication_url, staff_name, fetcher):
 
-def insert_publications_citations_per_year(connection, publication_id, year, citations):
+    try:
+        page_source = fetcher.fetch_publication(publication_url)
+    except Exception as e:
+        LOGGER.error(f"Timeout or error loading publication URL: {publication_url} — {e}")
+        count_fetch_result(fetcher, False)
+        # None, όχι κενές τιμές: αλλιώς θα έσβηναν τα αποθηκευμένα authors, journal, publisher, author_order
+        return None
+
+    count_fetch_result(fetcher, True)  # Αν όλα πάνε καλά, μηδένισε τα failures
+
+    return parse_publication_page(page_source, staff_name)
+
+
+@run_metrics.timed('db')
+def insert_publications_citations_per_year(connection, publication_id, year, citations, uow=None):
     cursor = connection.cursor()
     try:
         query = 'INSERT INTO publication_citations_per_year (publication_id, year, citations) VALUES (%s, %s, %s)'
-        cursor.execute(query, (int(publication_id), year, citations))
-        connection.commit()
+        execute_write(connection, cursor, query, (int(publication_id), year, citations), uow)
+        record_history(uow, 'publication_citations_per_year', 'INSERT', publication_id=publication_id, year=year)
     except Exception as e:
         LOGGER.error(f"Error on publication_citations_per_year Insertion: {e} {publication_id} {year} {citations}")
     finally:
         cursor.close()
 
 
-def insert_staff_citations_per_year(connection, staff_id, year, citations):
+@run_metrics.timed('db')
+def insert_staff_citations_per_year(connection, staff_id, year, citations, uow=None):
     cursor = connection.cursor()
     try:
         query = 'INSERT INTO staff_citations_per_year (staff_id, year, citations) VALUES (%s, %s, %s)'
-        cursor.execute(query, (staff_id, year, citations))
-        connection.commit()
+        execute_write(connection, cursor, query, (staff_id, year, citations), uow)
+        record_history(uow, 'staff_citations_per_year', 'INSERT', staff_id=staff_id, year=year)
     except Exception as e:
         LOGGER.error(f"Error on staff_citations_per_year Insertion: {e}")
     finally:
         cursor.close()
 
 
+@run_metrics.timed('db')
 def insert_staff_statistics(connection, staff_id, total_citations, last_5_years_citations, h_index,
                             last_5_years_h_index, i_10_index, last_5_years_i_10_index, h_index_local,
-                            last_5_years_h_index_local, i_10_index_local, last_5_years_i_10_index_local):
+                            last_5_years_h_index_local, i_10_index_local, last_5_years_i_10_index_local,
+                            h_index_from_graph, last_5_years_h_index_from_graph, i_10_index_from_graph,
+                            last_5_years_i_10_index_from_graph, uow=None):
     cursor = connection.cursor()
     try:
         query = ('INSERT INTO staff_statistics (staff_id, total_citations, last_5_years_citations, '
-                 'h_index, last_5_years_h_index, i10_index, last_5_years_i10_index' 
-                 'h_index_local, last_5_years_h_index_local, i10_index_local, last_5_years_i10_index_local) '
-                 'VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)')
-        cursor.execute(query, (staff_id, total_citations, last_5_years_citations, h_index, last_5_years_h_index, 
-                               i_10_index, last_5_years_i_10_index, h_index_local, last_5_years_h_index_local, 
-                               i_10_index_local, last_5_years_i_10_index_local))
-        connection.commit()
+                 'h_index, last_5_years_h_index, i10_index, last_5_years_i10_index, '
+                 'h_index_local, last_5_years_h_index_local, i10_index_local, last_5_years_i10_index_local, '
+                 'h_index_from_graph, last_5_years_h_index_from_graph, i10_index_from_graph, '
+                 'last_5_years_i10_index_from_graph) '
+                 'VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)')
+        execute_write(connection, cursor, query,
+                      (staff_id, total_citations, last_5_years_citations, h_index, last_5_years_h_index,
+                       i_10_index, last_5_years_i_10_index, h_index_local, last_5_years_h_index_local,
+                       i_10_index_local, last_5_years_i_10_index_local, h_index_from_graph,
+                       last_5_years_h_index_from_graph, i_10_index_from_graph,
+                       last_5_years_i_10_index_from_graph), uow)
+        record_history(uow, 'staff_statistics', 'INSERT', staff_id=staff_id)
     except Exception as e:
         LOGGER.error(f"Error on staff_statistics Insertion: {e}")
     finally:
         cursor.close()
 
 
+@run_metrics.timed('db')
 def select_all(connection, staff_id):
     cursor = connection.cursor()
 
@@ -527,7 +1728,7 @@ def select_all(connection, staff_id):
                         'journal',
                         'publisher',
                         'publication_id']
-        publications_df = pd.DataFrame(data, columns=column_names)
+        publications_df = pd.DataFrame(data, columns=column_names).astype(STORED_PUBLICATION_DTYPES)
     except Exception as e:
         LOGGER.error(f"Error on select_all publications Select: {e}")
         publications_df = pd.DataFrame()
@@ -537,6 +1738,7 @@ def select_all(connection, staff_id):
     return staff_statistics, staff_graph, publications_df
 
 
+@run_metrics.timed('db')
 def select_publication_graph(connection, publication_id):
     cursor = connection.cursor()
     publication_graph = []
@@ -551,59 +1753,241 @@ def select_publication_graph(connection, publication_id):
     return publication_graph
 
 
-def update_staff_graph(connection, staff_id, year, citations):
+@run_metrics.timed('db')
+def select_publication_graphs(connection, staff_ids):
+    """Citations-per-year rows of every publication of the given staff, fetched with one query."""
+    columns = ['staff_id', 'publication_id', 'year', 'citations']
+    rows = []
+    if staff_ids:
+        cursor = connection.cursor()
+        try:
+            placeholders = ', '.join(['%s'] * len(staff_ids))
+            query = ('SELECT ps.staff_id, pc.publication_id, pc.year, pc.citations '
+                     'FROM publications_staff ps '
+                     'JOIN publication_citations_per_year pc ON pc.publication_id = ps.publication_id '
+                     f'WHERE ps.staff_id IN ({placeholders})')
+            cursor.execute(query, tuple(int(staff_id) for staff_id in staff_ids))
+            rows = cursor.fetchall()
+        except Exception as e:
+            LOGGER.error(f"Error on select_publication_graphs: {e}")
+        finally:
+            cursor.close()
+
+    return pd.DataFrame(rows, columns=columns).astype(
+        {'staff_id': 'int64', 'publication_id': 'int64', 'year': 'int32', 'citations': 'int32'})
+
+
+def title_hash(title):
+    return hashlib.sha1((title if isinstance(title, str) else '').encode('utf-8')).hexdigest()
+
+
+def year_or_none(year):
+    return int(year) if pd.notna(year) and year else None
+
+
+@run_metrics.timed('db')
+def select_publication_fingerprints(connection, staff_id):
+    cursor = connection.cursor()
+    fingerprints = {}
+    try:
+        query = ('SELECT f.publication_id, f.citations, f.publication_year, f.title_hash, f.last_detail_scrape '
+                 'FROM publication_fingerprints f '
+                 'JOIN publications_staff ps ON ps.publication_id = f.publication_id '
+                 'WHERE ps.staff_id = %s')
+        cursor.execute(query, (staff_id,))
+        for publication_id, citations, year, hashed_title, last_detail_scrape in cursor.fetchall():
+            fingerprints[publication_id] = (citations, year, hashed_title, last_detail_scrape)
+    except Exception as e:
+        LOGGER.error(f"Error on select_publication_fingerprints: {e}")
+    finally:
+        cursor.close()
+    return fingerprints
+
+
+def detail_page_is_stale(fingerprint, title, year):
+    """A publication's detail page needs a new visit when it was never scraped, its title
+    or year changed on the profile, or the last visit is older than detail_refresh_days."""
+    if fingerprint is None:
+        return True
+    _, fingerprint_year, hashed_title, last_detail_scrape = fingerprint
+    if hashed_title != title_hash(title) or fingerprint_year != year_or_none(year):
+        return True
+    return last_detail_scrape is None or datetime.now() - last_detail_scrape >= timedelta(days=detail_refresh_days)
+
+
+@run_metrics.timed('db')
+def upsert_publication_fingerprint(connection, publication_id, citations, year, title, uow=None, detail_scraped=True):
+    """With detail_scraped False (the detail page failed to load) last_detail_scrape stays
+    NULL, so the page is fetched again on the next crawl."""
+    cursor = connection.cursor()
+    try:
+        query = ('INSERT INTO publication_fingerprints '
+                 '(publication_id, citations, publication_year, title_hash, last_detail_scrape) '
+                 f'VALUES (%s, %s, %s, %s, {"NOW()" if detail_scraped else "NULL"}) '
+                 'ON DUPLICATE KEY UPDATE citations = VALUES(citations), publication_year = VALUES(publication_year), '
+                 'title_hash = VALUES(title_hash), last_detail_scrape = VALUES(last_detail_scrape)')
+        execute_write(connection, cursor, query,
+                      (int(publication_id), citations, year_or_none(year), title_hash(title)), uow)
+    except Exception as e:
+        LOGGER.error(f"Error on upsert_publication_fingerprint: {e}")
+    finally:
+        cursor.close()
+
+
+@run_metrics.timed('db')
+def update_publication_fingerprint_citations(connection, publication_id, citations, uow=None, detail_scraped=True):
+    """With detail_scraped False (the detail page failed to load) last_detail_scrape becomes
+    NULL, so the page is fetched again on the next crawl."""
+    cursor = connection.cursor()
+    try:
+        query = (f'UPDATE publication_fingerprints SET citations = %s'
+                 f'{"" if detail_scraped else ", last_detail_scrape = NULL"} WHERE publication_id = %s')
+        execute_write(connection, cursor, query, (citations, int(publication_id)), uow)
+    except Exception as e:
+        LOGGER.error(f"Error on update_publication_fingerprint_citations: {e}")
+    finally:
+        cursor.close()
+
+
+@run_metrics.timed('db')
+def update_staff_graph(connection, staff_id, year, citations, uow=None):
     cursor = connection.cursor()
     try:
         query = ('UPDATE staff_citations_per_year '
                  'SET  citations = %s WHERE staff_id = %s AND year = %s')
-        cursor.execute(query, (citations, staff_id, year))
-        connection.commit()
+        execute_write(connection, cursor, query, (citations, staff_id, year), uow)
+        record_history(uow, 'staff_citations_per_year', 'UPDATE', staff_id=staff_id, year=year)
     except Exception as e:
         LOGGER.error(f"Error on update_staff_graph: {e}")
     finally:
         cursor.close()
 
 
-def delete_staff_graphs_entry(connection, staff_id, year):
+@run_metrics.timed('db')
+def delete_staff_graphs_entry(connection, staff_id, year, uow=None):
     cursor = connection.cursor()
     try:
         query = ('DELETE FROM staff_citations_per_year '
                  'WHERE staff_id = %s AND year = %s')
-        cursor.execute(query, (int(staff_id), year))
-        connection.commit()
+        record_history(uow, 'staff_citations_per_year', 'DELETE', staff_id=staff_id, year=year)
+        execute_write(connection, cursor, query, (int(staff_id), year), uow)
     except Exception as e:
         LOGGER.error(f"Error on delete_staff_graphs_entry: {e}")
     finally:
         cursor.close()
 
 
-def update_publication_graph(connection, publication_id, year, citations):
+@run_metrics.timed('db')
+def update_publication_graph(connection, publication_id, year, citations, uow=None):
     cursor = connection.cursor()
     try:
         query = ('UPDATE publication_citations_per_year '
                  'SET  citations = %s WHERE publication_id = %s AND year = %s')
-        cursor.execute(query, (citations, int(publication_id), year))
-        connection.commit()
+        execute_write(connection, cursor, query, (citations, int(publication_id), year), uow)
+        record_history(uow, 'publication_citations_per_year', 'UPDATE', publication_id=publication_id, year=year)
     except Exception as e:
         LOGGER.error(f"Error on update_publication_graph: {e}")
     finally:
         cursor.close()
 
 
-def delete_publication_graph_entry(connection, publication_id, year):
+@run_metrics.timed('db')
+def delete_publication_graph_entry(connection, publication_id, year, uow=None):
     cursor = connection.cursor()
     try:
         query = ('DELETE FROM publication_citations_per_year '
                  'WHERE publication_id = %s AND year = %s')
-        cursor.execute(query, (int(publication_id), year))
-        connection.commit()
+        record_history(uow, 'publication_citations_per_year', 'DELETE', publication_id=publication_id, year=year)
+        execute_write(connection, cursor, query, (int(publication_id), year), uow)
     except Exception as e:
         LOGGER.error(f"Error on delete_publication_graphs_entry: {e}")
     finally:
         cursor.close()
 
 
-def update_staff_stats(connection, staff_id, index, value):
+class GraphSync:
+    """Set-based sync of citations-per-year graphs (staff_citations_per_year or
+    publication_citations_per_year).
+
+    stage() diffs the scraped and stored (citations, year) series of one owner by year and
+    can be called for any number of staff or publications; apply() writes everything staged
+    as one INSERT ... ON DUPLICATE KEY UPDATE batch and one DELETE ... WHERE (owner, year) IN
+    (...) and returns the counts of inserted, updated and deleted years.
+    Needs the (owner, year) unique keys of Database/citations_per_year_unique_keys.sql.
+    """
+
+    TABLES = {
+        'staff': ('staff_citations_per_year', 'staff_id'),
+        'publication': ('publication_citations_per_year', 'publication_id'),
+    }
+
+    def __init__(self, kind):
+        self.table, self.owner_column = self.TABLES[kind]
+        self.upserts = []
+        self.deletes = []
+        self.inserted = set()
+        self.counts = {'inserted': 0, 'updated': 0, 'deleted': 0}
+
+    def stage(self, owner_id, graph_scrape, graph_db):
+        owner_id = int(owner_id)
+        scraped = {int(year): int(citations) for citations, year in graph_scrape or []}
+        stored = {int(year): int(citations) for citations, year in graph_db or []}
+        for year, citations in scraped.items():
+            if year not in stored:
+                self.counts['inserted'] += 1
+                self.inserted.add((owner_id, year))
+            elif stored[year] != citations:
+                self.counts['updated'] += 1
+            else:
+                continue
+            self.upserts.append((owner_id, year, citations))
+        for year in stored.keys() - scraped.keys():
+            self.deletes.append((owner_id, year))
+            self.counts['deleted'] += 1
+
+    @run_metrics.timed('db')
+    def apply(self, connection, uow=None):
+        cursor = connection.cursor()
+        counts = dict(self.counts)
+        try:
+            if self.upserts:
+                query = (f'INSERT INTO {self.table} ({self.owner_column}, year, citations) VALUES (%s, %s, %s) '
+                         f'ON DUPLICATE KEY UPDATE citations = VALUES(citations)')
+                if uow is not None:
+                    for row in self.upserts:
+                        uow.add(query, row)
+                    keys = [(owner_id, year) for owner_id, year, _ in self.upserts]
+                    uow.record(self.table, 'INSERT', (self.owner_column, 'year'),
+                               [key for key in keys if key in self.inserted])
+                    uow.record(self.table, 'UPDATE', (self.owner_column, 'year'),
+                               [key for key in keys if key not in self.inserted])
+                else:
+                    cursor.executemany(query, self.upserts)
+            if self.deletes:
+                placeholders = ', '.join(['(%s, %s)'] * len(self.deletes))
+                query = f'DELETE FROM {self.table} WHERE ({self.owner_column}, year) IN ({placeholders})'
+                values = tuple(value for row in self.deletes for value in row)
+                if uow is not None:
+                    uow.record(self.table, 'DELETE', (self.owner_column, 'year'), self.deletes)
+                    uow.add(query, values)
+                else:
+                    cursor.execute(query, values)
+            if uow is None and (self.upserts or self.deletes):
+                connection.commit()
+        except Exception as e:
+            LOGGER.error(f"Error on {self.table} sync: {e}")
+            counts = {'inserted': 0, 'updated': 0, 'deleted': 0}
+        finally:
+            cursor.close()
+            self.upserts = []
+            self.deletes = []
+            self.inserted = set()
+            self.counts = {'inserted': 0, 'updated': 0, 'deleted': 0}
+        return counts
+
+
+@run_metrics.timed('db')
+def update_staff_stats(connection, staff_id, index, value, uow=None):
     cursor = connection.cursor()
     column = ""
     if index == 0:
@@ -636,8 +2020,8 @@ def update_staff_stats(connection, staff_id, index, value):
         column = "last_5_years_i10_index_from_graph"
     try:
         query = f'UPDATE staff_statistics SET {column} = %s WHERE staff_id = %s'
-        cursor.execute(query, (value, staff_id))
-        connection.commit()
+        execute_write(connection, cursor, query, (value, staff_id), uow)
+        record_history(uow, 'staff_statistics', 'UPDATE', staff_id=staff_id)
     except Exception as e:
         LOGGER.error(f"update_staff_stats: {e}")
     finally:
@@ -648,9 +2032,10 @@ def contains_4byte_utf8(string):
     return any(ord(char) > 0xFFFF for char in string)
 
 
+@run_metrics.timed('db')
 def update_publication(connection, staff_id, publication_id, author_order_boolean, author_order,
                        title_boolean, title, authors_boolean, authors, date_boolean, publication_date,
-                       journal_boolean, journal, publisher_boolean, publisher, citations_boolean, citations):
+                       journal_boolean, journal, publisher_boolean, publisher, citations_boolean, citations, uow=None):
     cursor = connection.cursor()
     query = 'UPDATE publications SET '
     values = []
@@ -697,51 +2082,86 @@ def update_publication(connection, staff_id, publication_id, author_order_boolea
 
     query += ' WHERE publication_id = %s'
     values.append(int(publication_id))
-    try:
-        cursor.execute(query, tuple(values))
-        connection.commit()
-    except Exception as e:
-        LOGGER.error(f"Error on Publication Update: {e} , {query} , {publication_id} , {staff_id}")
+    if i:
+        try:
+            execute_write(connection, cursor, query, tuple(values), uow)
+            record_history(uow, 'publications', 'UPDATE', publication_id=publication_id)
+        except Exception as e:
+            LOGGER.error(f"Error on Publication Update: {e} , {query} , {publication_id} , {staff_id}")
 
     if author_order_boolean:
         try:
             query = "UPDATE publications_staff SET author_order = %s WHERE staff_id = %s AND publication_id = %s"
-            cursor.execute(query, (int(author_order), int(staff_id), int(publication_id)))
-            connection.commit()
+            execute_write(connection, cursor, query, (int(author_order), int(staff_id), int(publication_id)), uow)
+            record_history(uow, 'publications_staff', 'UPDATE', staff_id=staff_id, publication_id=publication_id)
         except Exception as e:
             LOGGER.error(f"Error on Publication Update Author Order: {e} {publication_id} {staff_id}")
 
     cursor.close()
 
 
-def calculate_indices_from_graph(publication_citations_per_year_df):
-    current_year = datetime.now().year
-
-    # Συνολικές παραπομπές ανά δημοσίευση
-    total_citations = publication_citations_per_year_df.groupby("publication_id")["citations"].sum()
-
-    # Παραπομπές τελευταίας 5ετίας
-    last_5_years_df = publication_citations_per_year_df[
-        publication_citations_per_year_df["year"] >= current_year - 5
-    ]
-    citations_last_5 = last_5_years_df.groupby("publication_id")["citations"].sum()
-
-    def h_index(citations):
-        citations = sorted(citations, reverse=True)
-        return sum(c >= i + 1 for i, c in enumerate(citations))
+@run_metrics.timed('stats')
+def partition_publications(publications_df_scrape, publications_df_db):
+    """Matches scraped publications to the stored ones on publication_scholar_id, falling back to the URL.
+
+    Returns row positions: 'new' and 'vanished' for unmatched scraped/stored rows, and
+    (scrape, db) pairs for 'changed' (citations differ) and 'unchanged' rows.
+    """
+    db_by_scholar_id = {}
+    db_by_url = {}
+    if not publications_df_db.empty:
+        for j, (scholar_id, url) in enumerate(zip(publications_df_db['publication_scholar_ids'],
+                                                  publications_df_db['urls'])):
+            if isinstance(scholar_id, str) and scholar_id:
+                db_by_scholar_id.setdefault(scholar_id, j)
+            if isinstance(url, str) and url:
+                db_by_url.setdefault(url, j)
+
+    matches = np.full(len(publications_df_scrape), -1, dtype=np.int64)
+    if not publications_df_scrape.empty:
+        for i, (scholar_id, url) in enumerate(zip(publications_df_scrape['publication_scholar_ids'],
+                                                  publications_df_scrape['urls'])):
+            j = db_by_scholar_id.get(scholar_id) if isinstance(scholar_id, str) else None
+            matches[i] = j if j is not None else db_by_url.get(url, -1)
+
+    matched = matches >= 0
+    scrape_positions = np.flatnonzero(matched)
+    db_positions = matches[matched]
+    if len(scrape_positions):
+        scrape_citations = publications_df_scrape['citations'].to_numpy(dtype=float, na_value=np.nan)
+        db_citations = publications_df_db['citations'].to_numpy(dtype=float, na_value=np.nan)
+        same_citations = scrape_citations[scrape_positions] == db_citations[db_positions]
+    else:
+        same_citations = np.zeros(0, dtype=bool)
+
+    vanished = np.ones(len(publications_df_db), dtype=bool)
+    vanished[db_positions] = False
+    pairs = list(zip(scrape_positions.tolist(), db_positions.tolist()))
+    return {
+        'new': np.flatnonzero(~matched).tolist(),
+        'changed': [pair for pair, same in zip(pairs, same_citations) if not same],
+        'unchanged': [pair for pair, same in zip(pairs, same_citations) if same],
+        'vanished': np.flatnonzero(vanished).tolist(),
+    }
 
-    def i10_index(citations):
-        return sum(c >= 10 for c in citations)
 
+@run_metrics.timed('stats')
+def calculate_indices_from_graph(publication_citations_per_year_df):
+    indices = metrics.graph_indices_by_staff(np.zeros(len(publication_citations_per_year_df), dtype=np.int64),
+                                             publication_citations_per_year_df["publication_id"],
+                                             publication_citations_per_year_df["year"],
+                                             publication_citations_per_year_df["citations"])
+    stats = indices.iloc[0] if not indices.empty else dict.fromkeys(metrics.INDEX_COLUMNS, 0)
     return {
-        "h_index_from_graph": h_index(total_citations.tolist()),
-        "i10_index_from_graph": i10_index(total_citations.tolist()),
-        "last_5_years_h_index_from_graph": h_index(citations_last_5.tolist()),
-        "last_5_years_i10_index_from_graph": i10_index(citations_last_5.tolist()),
+        "h_index_from_graph": int(stats['h_index']),
+        "i10_index_from_graph": int(stats['i10_index']),
+        "last_5_years_h_index_from_graph": int(stats['h_index_5y']),
+        "last_5_years_i10_index_from_graph": int(stats['i10_index_5y']),
     }
 
 
-def update_staff_stats_bulk(connection, staff_id, update_fields):
+@run_metrics.timed('db')
+def update_staff_stats_bulk(connection, staff_id, update_fields, uow=None):
     cursor = connection.cursor()
     try:
         query = "UPDATE staff_statistics SET "
@@ -749,317 +2169,934 @@ def update_staff_stats_bulk(connection, staff_id, update_fields):
         query += " WHERE staff_id = %s"
         values = list(update_fields.values())
         values.append(staff_id)
-        cursor.execute(query, tuple(values))
-        connection.commit()
+        execute_write(connection, cursor, query, tuple(values), uow)
+        record_history(uow, 'staff_statistics', 'UPDATE', staff_id=staff_id)
     except Exception as e:
         LOGGER.error(f"Error on bulk updating staff_statistics: {e}")
     finally:
         cursor.close()
 
 
-def main():
-    LOGGER.info("-- START PROGRAM --")
+STAFF_STATISTICS_FROM_INDICES = {
+    'h_index_local': ('local', 'h_index'),
+    'last_5_years_h_index_local': ('local', 'h_index_5y'),
+    'i10_index_local': ('local', 'i10_index'),
+    'last_5_years_i10_index_local': ('local', 'i10_index_5y'),
+    'h_index_from_graph': ('graph', 'h_index'),
+    'last_5_years_h_index_from_graph': ('graph', 'h_index_5y'),
+    'i10_index_from_graph': ('graph', 'i10_index'),
+    'last_5_years_i10_index_from_graph': ('graph', 'i10_index_5y'),
+}
 
-    global failures_in_a_row, failed_times_to_restart
 
-    connection = create_connection()
-    create_driver()
+@run_metrics.timed('db')
+def get_staff_ids(connection, department_ids=None):
+    cursor = connection.cursor()
+    staff_ids = []
+    try:
+        if department_ids:
+            placeholders = ', '.join(['%s'] * len(department_ids))
+            query = f'SELECT DISTINCT staff_id FROM staff_dept_role WHERE department_id IN ({placeholders}) ORDER BY staff_id'
+            cursor.execute(query, tuple(department_ids))
+        else:
+            cursor.execute('SELECT staff_id FROM staff ORDER BY staff_id')
+        staff_ids = [row[0] for row in cursor.fetchall()]
+    except Exception as e:
+        LOGGER.error(f"Error on get_staff_ids: {e}")
+    finally:
+        cursor.close()
+    return staff_ids
 
-    all_staff = get_all_staff(connection)
-    LOGGER.info(f"Total staff fetched from database: {len(all_staff)}")
+
+@run_metrics.timed('db')
+def select_publications_by_staff(connection, staff_ids):
+    columns = ['staff_id', 'publication_id', 'publication_year', 'citations']
+    rows = []
+    if staff_ids:
+        cursor = connection.cursor()
+        try:
+            placeholders = ', '.join(['%s'] * len(staff_ids))
+            query = ('SELECT ps.staff_id, p.publication_id, p.publication_year, p.citations '
+                     'FROM publications_staff ps JOIN publications p ON p.publication_id = ps.publication_id '
+                     f'WHERE ps.staff_id IN ({placeholders})')
+            cursor.execute(query, tuple(int(staff_id) for staff_id in staff_ids))
+            rows = cursor.fetchall()
+        except Exception as e:
+            LOGGER.error(f"Error on select_publications_by_staff: {e}")
+        finally:
+            cursor.close()
+
+    publications_df = pd.DataFrame(rows, columns=columns)
+    publications_df['publication_year'] = pd.to_numeric(publications_df['publication_year'], errors='coerce')
+    publications_df['citations'] = pd.to_numeric(publications_df['citations'], errors='coerce').fillna(0).astype('int64')
+    return publications_df
+
+
+@run_metrics.timed('db')
+def select_staff_statistics(connection, staff_ids):
+    columns = list(STAFF_STATISTICS_FROM_INDICES)
+    rows = []
+    if staff_ids:
+        cursor = connection.cursor()
+        try:
+            placeholders = ', '.join(['%s'] * len(staff_ids))
+            query = (f'SELECT staff_id, {", ".join(columns)} FROM staff_statistics '
+                     f'WHERE staff_id IN ({placeholders})')
+            cursor.execute(query, tuple(int(staff_id) for staff_id in staff_ids))
+            rows = cursor.fetchall()
+        except Exception as e:
+            LOGGER.error(f"Error on select_staff_statistics: {e}")
+        finally:
+            cursor.close()
+    return pd.DataFrame(rows, columns=['staff_id'] + columns).set_index('staff_id')
+
+
+@run_metrics.timed('db')
+def select_department_role_cells(connection, staff_ids):
+    cells = []
+    if staff_ids:
+        cursor = connection.cursor()
+        try:
+            placeholders = ', '.join(['%s'] * len(staff_ids))
+            cursor.execute(f'SELECT DISTINCT department_id, role_id FROM staff_dept_role WHERE staff_id IN ({placeholders})',
+                           tuple(int(staff_id) for staff_id in staff_ids))
+            cells = [tuple(row) for row in cursor.fetchall()]
+        except Exception as e:
+            LOGGER.error(f"Error on select_department_role_cells: {e}")
+        finally:
+            cursor.close()
+    return cells
+
+
+@run_metrics.timed('db')
+def select_cell_staff(connection, cells):
+    columns = aggregates.CELL_KEYS + ['staff_id'] + aggregates.DATED_COLUMNS + aggregates.STATISTICS_COLUMNS
+    rows = []
+    cursor = connection.cursor()
+    try:
+        placeholders = ', '.join(['(%s, %s)'] * len(cells))
+        query = ('SELECT sdr.department_id, sdr.role_id, sdr.staff_id, '
+                 f'{", ".join("sa." + column for column in aggregates.DATED_COLUMNS)}, '
+                 f'{", ".join("ss." + column for column in aggregates.STATISTICS_COLUMNS)} '
+                 'FROM staff_dept_role sdr '
+                 'LEFT JOIN staff_aggregates sa ON sa.staff_id = sdr.staff_id '
+                 'LEFT JOIN staff_statistics ss ON ss.staff_id = sdr.staff_id '
+                 f'WHERE (sdr.department_id, sdr.role_id) IN ({placeholders})')
+        cursor.execute(query, tuple(int(value) for cell in cells for value in cell))
+        rows = cursor.fetchall()
+    except Exception as e:
+        LOGGER.error(f"Error on select_cell_staff: {e}")
+    finally:
+        cursor.close()
+    cell_staff_df = pd.DataFrame(rows, columns=columns)
+    for column in aggregates.DATED_COLUMNS + aggregates.STATISTICS_COLUMNS:
+        cell_staff_df[column] = pd.to_numeric(cell_staff_df[column], errors='coerce').astype(float)
+    return cell_staff_df
+
+
+@run_metrics.timed('db')
+def select_cell_publication_counts(connection, cells, current_year=None):
+    current_year = current_year or date.today().year
+    rows = []
+    cursor = connection.cursor()
+    try:
+        placeholders = ', '.join(['(%s, %s)'] * len(cells))
+        query = ('SELECT sdr.department_id, sdr.role_id, COUNT(DISTINCT ps.publication_id) '
+                 'FROM staff_dept_role sdr '
+                 'JOIN publications_staff ps ON ps.staff_id = sdr.staff_id '
+                 'JOIN publications p ON p.publication_id = ps.publication_id '
+                 f'WHERE (sdr.department_id, sdr.role_id) IN ({placeholders}) '
+                 'AND p.publication_year IS NOT NULL AND p.publication_year <= %s '
+                 'GROUP BY sdr.department_id, sdr.role_id')
+        cursor.execute(query, tuple(int(value) for cell in cells for value in cell) + (current_year,))
+        rows = cursor.fetchall()
+    except Exception as e:
+        LOGGER.error(f"Error on select_cell_publication_counts: {e}")
+    finally:
+        cursor.close()
+    index = pd.MultiIndex.from_tuples([tuple(row[:2]) for row in rows], names=aggregates.CELL_KEYS)
+    return pd.Series([int(row[2]) for row in rows], index=index, dtype='int64')
+
+
+@run_metrics.timed('db')
+def select_role_set_masks(connection, department_ids, current_year=None):
+    """(role_ids, staff_masks, publication_masks) for aggregates.department_role_set_counts(),
+    or None when the database could not be read. Bit n of a mask stands for role_ids[n]."""
+    current_year = current_year or date.today().year
+    cursor = connection.cursor()
+    try:
+        cursor.execute('SELECT role_id FROM roles ORDER BY role_id')
+        role_ids = [int(row[0]) for row in cursor.fetchall()]
+        if len(role_ids) > 63:
+            LOGGER.error(f"Error on select_role_set_masks: {len(role_ids)} roles do not fit in a BIGINT mask")
+            return None
+        placeholders = ', '.join(['%s'] * len(department_ids))
+        query = ('WITH role_bits AS (SELECT role_id, ROW_NUMBER() OVER (ORDER BY role_id) - 1 AS bit FROM roles), '
+                 'memberships AS (SELECT sdr.department_id, sdr.staff_id, BIT_OR(1 << rb.bit) AS mask '
+                 'FROM staff_dept_role sdr JOIN role_bits rb ON rb.role_id = sdr.role_id '
+                 f'WHERE sdr.department_id IN ({placeholders}) GROUP BY sdr.department_id, sdr.staff_id) '
+                 "SELECT 'staff', department_id, mask, COUNT(*) FROM memberships GROUP BY department_id, mask "
+                 'UNION ALL '
+                 "SELECT 'publications', department_id, mask, COUNT(*) FROM ("
+                 'SELECT m.department_id, ps.publication_id, BIT_OR(m.mask) AS mask FROM memberships m '
+                 'JOIN publications_staff ps ON ps.staff_id = m.staff_id '
+                 'JOIN publications p ON p.publication_id = ps.publication_id '
+                 'WHERE p.publication_year IS NOT NULL AND p.publication_year <= %s '
+                 'GROUP BY m.department_id, ps.publication_id) AS publication_roles GROUP BY department_id, mask')
+        cursor.execute(query, tuple(int(department_id) for department_id in department_ids) + (current_year,))
+        rows = cursor.fetchall()
+    except Exception as e:
+        LOGGER.error(f"Error on select_role_set_masks: {e}")
+        return None
+    finally:
+        cursor.close()
+    masks = {}
+    for kind in ('staff', 'publications'):
+        kind_rows = [(int(row[1]), int(row[2]), int(row[3])) for row in rows if row[0] == kind]
+        index = pd.MultiIndex.from_tuples([row[:2] for row in kind_rows], names=['department_id', 'mask'])
+        masks[kind] = pd.Series([row[2] for row in kind_rows], index=index, dtype='int64')
+    return role_ids, masks['staff'], masks['publications']
+
+
+def upsert_aggregates(connection, table, aggregates_df, uow=None):
+    """INSERT ... ON DUPLICATE KEY UPDATE of one row per index entry of `aggregates_df`
+    (the index levels are the primary key of `table`)."""
+    if aggregates_df.empty:
+        return
+    keys = list(aggregates_df.index.names)
+    columns = list(aggregates_df.columns)
+    query = (f'INSERT INTO {table} ({", ".join(keys + columns)}) '
+             f'VALUES ({", ".join(["%s"] * (len(keys) + len(columns)))}) '
+             f'ON DUPLICATE KEY UPDATE {", ".join(f"{column} = VALUES({column})" for column in columns)}')
+    cursor = connection.cursor()
+    try:
+        for key, row in zip(aggregates_df.index, aggregates_df.itertuples(index=False)):
+            key = key if isinstance(key, tuple) else (key,)
+            values = tuple(value if isinstance(value, str) else int(value) for value in key) + tuple(
+                None if pd.isna(value) else int(value) for value in row)
+            execute_write(connection, cursor, query, values, uow)
+    except Exception as e:
+        LOGGER.error(f"Error on {table} upsert: {e}")
+    finally:
+        cursor.close()
+
+
+@run_metrics.timed('stats')
+def refresh_staff_aggregates(connection, staff_ids, window=metrics.RECENT_YEARS, uow=None):
+    publications_df = select_publications_by_staff(connection, staff_ids)
+    staff_df = aggregates.staff_aggregates(publications_df, staff_ids, window=window)
+    upsert_aggregates(connection, 'staff_aggregates', staff_df, uow)
+    return staff_df
+
+
+def delete_department_aggregates(connection, cells, uow=None):
+    cursor = connection.cursor()
+    try:
+        query = 'DELETE FROM department_role_aggregates WHERE department_id = %s AND role_id = %s'
+        for department_id, role_id in cells:
+            execute_write(connection, cursor, query, (int(department_id), int(role_id)), uow)
+    except Exception as e:
+        LOGGER.error(f"Error on delete_department_aggregates: {e}")
+    finally:
+        cursor.close()
+
+
+def refresh_role_set_counts(connection, department_ids, uow=None):
+    """Rewrites the department_role_set_counts rows of `department_ids`; they are left as
+    they are when the memberships could not be read."""
+    selected = select_role_set_masks(connection, department_ids)
+    if selected is None:
+        return
+    counts_df = aggregates.department_role_set_counts(*selected)
+    cursor = connection.cursor()
+    try:
+        # Σύνολα ρόλων που έπαψαν να υπάρχουν στο τμήμα φεύγουν πριν από το upsert
+        query = (f'DELETE FROM department_role_set_counts '
+                 f'WHERE department_id IN ({", ".join(["%s"] * len(department_ids))})')
+        execute_write(connection, cursor, query, tuple(int(department_id) for department_id in department_ids), uow)
+    except Exception as e:
+        LOGGER.error(f"Error on refresh_role_set_counts: {e}")
+        return
+    finally:
+        cursor.close()
+    upsert_aggregates(connection, 'department_role_set_counts', counts_df, uow)
+
+
+@run_metrics.timed('stats')
+def refresh_department_aggregates(connection, staff_ids, uow=None, staff_df=None, cells=()):
+    """Recomputes the department_role_aggregates rows of every department and role the
+    staff belong to, plus the given `cells` (those left without staff are deleted).
+    `staff_df` holds staff_aggregates rows staged in `uow` but not yet written, which take
+    the place of the stored ones."""
+    left = set(cells)
+    cells = sorted(set(select_department_role_cells(connection, staff_ids)) | left)
+    if not cells:
+        return 0
+    cell_staff_df = select_cell_staff(connection, cells)
+    if staff_df is not None:
+        fresh = cell_staff_df['staff_id'].isin(staff_df.index)
+        cell_staff_df.loc[fresh, aggregates.DATED_COLUMNS] = \
+            staff_df.loc[cell_staff_df.loc[fresh, 'staff_id'], aggregates.DATED_COLUMNS].to_numpy(dtype=float)
+    cells_df = aggregates.department_role_aggregates(cell_staff_df, select_cell_publication_counts(connection, cells))
+    upsert_aggregates(connection, 'department_role_aggregates', cells_df, uow)
+    delete_department_aggregates(connection, [cell for cell in left if cell not in cells_df.index], uow)
+    refresh_role_set_counts(connection, sorted({department_id for department_id, _ in cells}), uow)
+    return len(cells_df)
+
+
+def refresh_aggregates(connection, staff_ids, window=metrics.RECENT_YEARS):
+    """Brings staff_aggregates and department_role_aggregates up to date with the
+    committed publications and statistics of `staff_ids`, in one transaction."""
+    uow = UnitOfWork(connection)
+    staff_df = refresh_staff_aggregates(connection, staff_ids, window, uow)
+    refresh_department_aggregates(connection, staff_ids, uow, staff_df)
+    return uow.flush()
+
+
+@run_metrics.timed('db')
+def select_changed_staff(connection, staff_ids, publication_ids):
+    """The existing staff among `staff_ids`, together with the staff of `publication_ids`."""
+    parts, values = [], []
+    if staff_ids:
+        parts.append(f'SELECT staff_id FROM staff WHERE staff_id IN ({", ".join(["%s"] * len(staff_ids))})')
+        values.extend(int(staff_id) for staff_id in staff_ids)
+    if publication_ids:
+        parts.append('SELECT staff_id FROM publications_staff '
+                     f'WHERE publication_id IN ({", ".join(["%s"] * len(publication_ids))})')
+        values.extend(int(publication_id) for publication_id in publication_ids)
+    rows = []
+    if parts:
+        cursor = connection.cursor()
+        try:
+            cursor.execute(' UNION '.join(parts), tuple(values))
+            rows = cursor.fetchall()
+        except Exception as e:
+            LOGGER.error(f"Error on select_changed_staff: {e}")
+        finally:
+            cursor.close()
+    return sorted(int(row[0]) for row in rows)
+
+
+def refresh_changed_aggregates(connection, consumer='aggregates', window=metrics.RECENT_YEARS):
+    """Refreshes the aggregate tables of the staff and department/role cells touched by the
+    changes recorded since the last run of `consumer`, instead of recomputing every staff
+    member. Returns the number of staff refreshed."""
+    feed = changes.ChangeFeed(connection, consumer)
+    refreshed = 0
+    for events in feed.batches():
+        staff_ids, publication_ids, cells = changes.affected_staff(events)
+        staff_ids = select_changed_staff(connection, staff_ids, publication_ids)
+        uow = UnitOfWork(connection)
+        staff_df = refresh_staff_aggregates(connection, staff_ids, window, uow) if staff_ids else None
+        refresh_department_aggregates(connection, staff_ids, uow, staff_df, cells)
+        if not uow.flush():
+            # Τα offsets μένουν πίσω: η επόμενη εκτέλεση ξαναδιαβάζει τις ίδιες αλλαγές
+            break
+        feed.commit()
+        refreshed += len(staff_ids)
+    return refreshed
+
+
+def recompute_statistics(connection, department_ids=None, window=metrics.RECENT_YEARS, batch_size=500):
+    """Rewrites the local and graph-based columns of staff_statistics from the stored
+    publications and citation graphs, without scraping, and refreshes the aggregate tables
+    of the same staff. Returns the number of staff whose staff_statistics changed."""
+    staff_ids = get_staff_ids(connection, department_ids)
+    updated = 0
+    for start in range(0, len(staff_ids), batch_size):
+        batch = staff_ids[start:start + batch_size]
+        publications_df = select_publications_by_staff(connection, batch)
+        graphs_df = select_publication_graphs(connection, batch)
+        indices = {
+            'local': metrics.indices_by_staff(publications_df['staff_id'], publications_df['citations'],
+                                              publications_df['publication_year'], window=window),
+            'graph': metrics.graph_indices_by_staff(graphs_df['staff_id'], graphs_df['publication_id'],
+                                                    graphs_df['year'], graphs_df['citations'], window=window),
+        }
+        computed = pd.DataFrame({
+            column: indices[source][index].reindex(batch, fill_value=0)
+            for column, (source, index) in STAFF_STATISTICS_FROM_INDICES.items()
+        }, index=pd.Index(batch, name='staff_id'))
+        stored = select_staff_statistics(connection, batch)
+
+        uow = UnitOfWork(connection)
+        batch_updates = 0
+        for staff_id, stored_row in stored.iterrows():
+            update_fields = {column: int(value) for column, value in computed.loc[staff_id].items()
+                             if value != stored_row[column]}
+            if update_fields:
+                update_staff_stats_bulk(connection, int(staff_id), update_fields, uow=uow)
+                batch_updates += 1
+        refresh_staff_aggregates(connection, batch, window, uow)
+        if uow.flush():
+            updated += batch_updates
+        LOGGER.info(f"Recomputed statistics for {start + len(batch)}/{len(staff_ids)} staff")
+
+    uow = UnitOfWork(connection)
+    cells = refresh_department_aggregates(connection, staff_ids, uow)
+    if uow.flush():
+        LOGGER.info(f"Recomputed aggregates for {cells} department/role combinations")
+    return updated
+
+
+def fetch_publication_details(fetcher, publication_url, staff_name, staff_metrics):
+    run_metrics.attach_staff(staff_metrics)
+    return get_publication_stats_scrape(publication_url, staff_name, fetcher)
+
+
+def write_in_order(write, job, details, staff_metrics):
+    run_metrics.attach_staff(staff_metrics)
+    write(job, details)
+
+
+async def detail_pipeline(fetcher, staff_name, jobs, write, concurrency):
+    loop = asyncio.get_running_loop()
+    staff_metrics = run_metrics.current_staff()
+    fetch_slots = asyncio.Semaphore(concurrency)
+    fetched = asyncio.Queue(maxsize=2 * concurrency)
+    thread_name = threading.current_thread().name
+
+    with ThreadPoolExecutor(concurrency, thread_name_prefix=f"{thread_name}-fetch") as fetch_pool, \
+            ThreadPoolExecutor(1, thread_name_prefix=f"{thread_name}-write") as write_pool:
+
+        async def fetch(publication_url):
+            async with fetch_slots:
+                return await loop.run_in_executor(fetch_pool, fetch_publication_details, fetcher,
+                                                  publication_url, staff_name, staff_metrics)
+
+        async def produce():
+            in_flight = []
+            for job, publication_url in jobs:
+                task = None
+                if publication_url:
+                    if fetcher_is_failing(fetcher):
+                        # Επανεκκίνηση μόνο όταν δεν εκκρεμεί καμία σελίδα του fetcher
+                        await asyncio.gather(*in_flight, return_exceptions=True)
+                        await loop.run_in_executor(None, restart_fetcher_if_failing, fetcher)
+                    in_flight = [pending_task for pending_task in in_flight if not pending_task.done()]
+                    task = asyncio.ensure_future(fetch(publication_url))
+                    in_flight.append(task)
+                await fetched.put((job, task))
+            await fetched.put(None)
+
+        producer = asyncio.ensure_future(produce())
+        pending = []
+        try:
+            while (item := await fetched.get()) is not None:
+                job, task = item
+                pending.append(task)
+                details = await task if task else None
+                await loop.run_in_executor(write_pool, write_in_order, write, job, details, staff_metrics)
+        finally:
+            producer.cancel()
+            for task in pending:
+                if task:
+                    task.cancel()
+            while not fetched.empty():
+                item = fetched.get_nowait()
+                if item and item[1]:
+                    item[1].cancel()
+
+
+def run_detail_pipeline(fetcher, staff_name, jobs, write):
+    """Fetches and parses the publication detail pages of `jobs` ((job, url) pairs) concurrently
+    and calls write(job, details) for every job in the original order.
+
+    Up to the fetcher's max_concurrency pages (at most detail_concurrency) are in flight under
+    the RequestScheduler and RateLimiter, while earlier pages are written to MySQL by a single
+    writer thread; at most twice that many fetched pages wait for the writer. Jobs without a
+    url are written with details None. A fetcher with failed_times_to_restart failures in a
+    row is restarted only once the pages in flight have been fetched, never from a fetch thread.
+    """
+    if not jobs:
+        return
+    concurrency = max(1, min(detail_concurrency, getattr(fetcher, 'max_concurrency', 1)))
+    asyncio.run(detail_pipeline(fetcher, staff_name, jobs, write, concurrency))
+    restart_fetcher_if_failing(fetcher)
+
+
+def process_staff(connection, fetcher, staff_id, scholar_id, full_name):
+    LOGGER.info(f"Processing staff_id={staff_id}, name={full_name}, scholar_id={scholar_id}")
+    staff_stats_db, staff_citations_graph_db, publications_df_db = select_all(connection, staff_id)
+    known_citations = None if needs_full_profile(connection, staff_id) else known_publication_citations(publications_df_db)
+    publications_df_scrape, rows_length, staff_citations_graph_scrape, staff_stats_scrape, complete = \
+        get_publications_scrape(scholar_id, fetcher, known_citations)
+    
+    if publications_df_scrape is None or staff_stats_scrape is None:
+        LOGGER.warning(f"Scraping failed for scholar_id={scholar_id} (staff_id={staff_id})")
+
+        restart_fetcher_if_failing(fetcher)
+        return False
+
+    if not staff_stats_scrape or len(staff_stats_scrape) < 3:
+        LOGGER.warning(f"Incomplete Scholar stats for scholar_id={scholar_id} (staff_id={staff_id}), skipping...")
+        return False
+    
+    uow = UnitOfWork(connection)
+    last_publication_url = None
+    checkpoint = get_crawl_checkpoint(connection, staff_id)
+    if checkpoint:
+        # Οι δημοσιεύσεις έως το checkpoint είναι ήδη στη βάση και βγαίνουν αμετάβλητες παρακάτω
+        LOGGER.info(f"staff_id={staff_id}: resuming an interrupted crawl committed up to {checkpoint}")
     
-    for i in range(376, len(all_staff)):
-        staff_id = 0
-        scholar_id = 0
-        full_name = ''
-        for j in range(len(all_staff[i])):
-            if j == 0:
-                staff_id = all_staff[i][j]
-            elif j == 1:
-                scholar_id = all_staff[i][j]
+    # STAFF STATISTICS
+    publication_graphs_df = select_publication_graphs(connection, [staff_id])
+    graph_stats = calculate_indices_from_graph(publication_graphs_df)
+    publication_graphs_db = {
+        publication_id: list(zip(graph['citations'].tolist(), graph['year'].tolist()))
+        for publication_id, graph in publication_graphs_df.groupby('publication_id')
+    }
+
+    partitions = partition_publications(publications_df_scrape, publications_df_db)
+    if complete:
+        stats_df = publications_df_scrape
+    else:
+        # Οι δημοσιεύσεις που δεν φορτώθηκαν λόγω πρόωρης διακοπής μετρούν με τις τιμές της βάσης
+        not_reached = publications_df_db.iloc[partitions['vanished']]
+        stats_df = pd.concat([publications_df_scrape[['citations', 'years']], not_reached[['citations', 'years']]],
+                             ignore_index=True)
+
+    st_stats_tmp = tuple(int(x) for pair in staff_stats_scrape for x in pair)
+    local_stats = calculate_stats(stats_df)
+    local_stats_tuple = (
+        local_stats['h_index'],
+        local_stats['h_index_5y'],
+        local_stats['i10_index'],
+        local_stats['i10_index_5y'],
+        graph_stats["h_index_from_graph"],
+        graph_stats["last_5_years_h_index_from_graph"],
+        graph_stats["i10_index_from_graph"],
+        graph_stats["last_5_years_i10_index_from_graph"]
+    )
+
+    st_stats = st_stats_tmp + local_stats_tuple
+    
+    if staff_stats_db:
+        st_stats_db = tuple(staff_stats_db[0])
+    else:
+        st_stats_db = []
+    LOGGER.info(f"staff_stats_db = {st_stats_db}, staff_stast = {st_stats} !!")
+    try:
+        if not st_stats_db and st_stats:
+            insert_staff_statistics(connection, staff_id, st_stats[0], st_stats[1], st_stats[2],
+                                st_stats[3], st_stats[4], st_stats[5], st_stats[6],
+                                st_stats[7], st_stats[8], st_stats[9], st_stats[10], 
+                                st_stats[11], st_stats[12], st_stats[13], uow=uow)
+        elif st_stats != st_stats_db:
+            differences = [
+                (i, val1, val2)
+                for i, (val1, val2) in enumerate(zip(st_stats, st_stats_db))
+                if val1 != val2
+            ]
+
+            update_fields = {}
+
+            for diff in differences:
+                index, new, old = diff
+                ## LOGGER.info(f"Differences on staff stats: staff_id: {staff_id}, old value: "
+                ##  f"{old}, new value: {new}, in position: {index}")
+                
+
+                if index == 0:
+                    update_fields["total_citations"] = new
+                elif index == 1:
+                    update_fields["last_5_years_citations"] = new
+                elif index == 2:
+                    update_fields["h_index"] = new
+                elif index == 3:
+                    update_fields["last_5_years_h_index"] = new
+                elif index == 4:
+                    update_fields["i10_index"] = new
+                elif index == 5:
+                    update_fields["last_5_years_i10_index"] = new
+                elif index == 6:
+                    update_fields["h_index_local"] = new
+                elif index == 7:
+                    update_fields["last_5_years_h_index_local"] = new
+                elif index == 8:
+                    update_fields["i10_index_local"] = new
+                elif index == 9:
+                    update_fields["last_5_years_i10_index_local"] = new
+                elif index == 10:
+                    update_fields["h_index_from_graph"] = new
+                elif index == 11:
+                    update_fields["last_5_years_h_index_from_graph"] = new
+                elif index == 12:
+                    update_fields["i10_index_from_graph"] = new
+                elif index == 13:
+                    update_fields["last_5_years_i10_index_from_graph"] = new
+            if update_fields:
+                update_staff_stats_bulk(connection, staff_id, update_fields, uow=uow)
+    except IndexError:
+        LOGGER.error(f"IndexError inserting stats for staff_id={staff_id}, st_stats={st_stats}, st_stats_length= {len(st_stats)}")
+        uow.rollback()
+        return False
+
+    # STAFF GRAPH
+    staff_graph_sync = GraphSync('staff')
+    staff_graph_sync.stage(staff_id, staff_citations_graph_scrape, staff_citations_graph_db)
+    publication_graph_sync = GraphSync('publication')
+
+    fingerprints = select_publication_fingerprints(connection, staff_id)
+    if complete:
+        LOGGER.info(f"staff_id={staff_id}: {len(partitions['new'])} new, {len(partitions['changed'])} changed, "
+                    f"{len(partitions['unchanged'])} unchanged, {len(partitions['vanished'])} vanished publications")
+        for publication_db in partitions['vanished']:
+            LOGGER.warning(f"Publication no longer on Scholar profile: staff_id={staff_id}, "
+                           f"publication_id={publications_df_db['publication_id'][publication_db]}, "
+                           f"url={publications_df_db['urls'][publication_db]}")
+    else:
+        LOGGER.info(f"staff_id={staff_id}: {len(partitions['new'])} new, {len(partitions['changed'])} changed, "
+                    f"{len(partitions['unchanged'])} unchanged publications; stopped after {rows_length} rows, "
+                    f"{len(partitions['vanished'])} stored publications not reached")
+
+    # Λίστα εργασιών με τη σειρά εγγραφής: πρώτα οι αλλαγμένες, μετά οι νέες δημοσιεύσεις και όσες
+    # αμετάβλητες έχουν παλιά σελίδα λεπτομερειών. Η σελίδα μιας δημοσίευσης που άλλαξε μόνο στις
+    # αναφορές φορτώνεται για το γράφημα αναφορών ('graph'), οι υπόλοιπες για όλα τα στοιχεία ('details').
+    # Οι σελίδες φορτώνονται παράλληλα, οι εγγραφές γίνονται με αυτή τη σειρά.
+    def is_stale(scraped, stored):
+        return detail_page_is_stale(fingerprints.get(stored['publication_id']), scraped['titles'], scraped['years'])
+
+    jobs = []
+    for publication_sc, publication_db in partitions['changed']:
+        scraped = publication_row(publications_df_scrape, publication_sc)
+        stored = publication_row(publications_df_db, publication_db)
+        jobs.append(((scraped, stored, 'details' if is_stale(scraped, stored) else 'graph'), scraped['urls']))
+    for publication_sc in partitions['new']:
+        scraped = publication_row(publications_df_scrape, publication_sc)
+        jobs.append(((scraped, None, 'details'), scraped['urls']))
+    for publication_sc, publication_db in partitions['unchanged']:
+        scraped = publication_row(publications_df_scrape, publication_sc)
+        stored = publication_row(publications_df_db, publication_db)
+        if is_stale(scraped, stored):
+            jobs.append(((scraped, stored, 'details'), scraped['urls']))
+
+    def write_publication(job, details):
+        nonlocal last_publication_url
+        scraped, stored, mode = job
+        if stored is None:
+            write_new_publication(scraped, details)
+            return
+        publication_id = stored['publication_id']
+        citations_scrape_to_int = scraped['citations']
+        citations_changed = citations_scrape_to_int != stored['citations']
+        if details is None or mode == 'graph':
+            # Η σελίδα δεν φορτώθηκε: γράφονται μόνο οι νέες αναφορές και το last_detail_scrape γίνεται NULL,
+            # ώστε η σελίδα να ξαναδιαβαστεί στο επόμενο crawl. Με 'graph' ενημερώνεται και το γράφημα.
+            if citations_changed:
+                update_publication(connection, staff_id, publication_id, False, 0, False, None, False, None,
+                                   False, None, False, None, False, None, True, citations_scrape_to_int, uow=uow)
+                update_publication_fingerprint_citations(connection, publication_id, citations_scrape_to_int,
+                                                         uow=uow, detail_scraped=details is not None)
+            elif details is None:
+                return
+            if details is not None and details[5]:
+                publication_graph_sync.stage(publication_id, details[5], publication_graphs_db.get(publication_id, []))
+            last_publication_url = scraped['urls']
+            return
+        authors, journal, publisher, pub_date, author_order, citations_graph = details
+        author_order_boolean = False
+        title_boolean = False
+        authors_boolean = False
+        date_boolean = False
+        journal_boolean = False
+        publisher_boolean = False
+        citations_boolean = citations_changed
+        if author_order != stored['author_order']:
+            author_order_boolean = True
+            ## LOGGER.info(f"PublicationId: {publication_id} Changed Author Order From: "
+            ## f"{stored['author_order']} To: {author_order}")
+        if (scraped['titles'] !=
+                stored['titles']):
+            if stored['titles'] != 'Unknown Title: Non ASCII':
+                title_boolean = True
+                if scraped['titles']:
+                    if contains_4byte_utf8(scraped['titles']):
+                        title = 'Unknown Title: Non ASCII'
             else:
-                full_name = all_staff[i][j]
+                title_boolean = False
+            ## LOGGER.info(f"PublicationId: {publication_id} Changed Title From: {stored['titles']} "
+            ## f"To: {scraped['titles']}")
+        similarity = names.similarity(authors, stored['authors'])
+        if similarity < 80:
+            authors_boolean = True
+            ## LOGGER.info(f"PublicationId: {publication_id} Changed Authors From: {stored['authors']} "
+            ## f"To: {authors}")
+        if stored['publication_date']:
+            dt = str(stored['publication_date'].strftime("%Y-%m-%d"))
+            if str(pub_date) != dt:
+                date_boolean = True
+                if pub_date == '':
+                    pub_date = None
+                ## LOGGER.info(f"PublicationId: {publication_id} Changed Date From: {dt} To: {pub_date}")
+        if not journal:
+            journal = None
+        if journal != stored['journal']:
+            journal_boolean = True
+            ## LOGGER.info(f"PublicationId: {publication_id} Changed Journal From: {stored['journal']} "
+            ## f"To: {journal}")
+        if not publisher:
+            publisher = None
+        if publisher != stored['publisher']:
+            publisher_boolean = True
+            ## LOGGER.info(f"PublicationId: {publication_id} Changed Publisher From: {stored['publisher']}"
+            ## f" To: {publisher}")
+            ## LOGGER.info(f"PublicationId: {publication_id} Changed Citations From: {stored['citations']} "
+            ## f"To: {citations_scrape_to_int}")
+        update_publication(connection, staff_id, publication_id, author_order_boolean, author_order,
+                           title_boolean, scraped['titles'],
+                           authors_boolean, authors, date_boolean, pub_date, journal_boolean,
+                           journal, publisher_boolean, publisher, citations_boolean,
+                           citations_scrape_to_int, uow=uow)
+        upsert_publication_fingerprint(connection, publication_id, citations_scrape_to_int,
+                                       scraped['years'],
+                                       scraped['titles'], uow=uow)
+        last_publication_url = scraped['urls']
+        if citations_graph:
+            publication_graph_sync.stage(publication_id, citations_graph, publication_graphs_db.get(publication_id, []))
+
+    def write_new_publication(scraped, details):
+        nonlocal last_publication_url
+        publication_year = scraped['years']
+        title = scraped['titles']
+        if title:
+            if contains_4byte_utf8(title):
+                title = 'Unknown Title: Non ASCII'
+        ## LOGGER.info(f"title: {title}")
+        publication_id = insert_publication(connection, title,
+                                            publication_year,
+                                            scraped['urls'],
+                                            scraped['citations'],
+                                            scraped['publication_scholar_ids'], uow=uow)
+        if publication_id:
+            insert_publication_staff(connection, staff_id, publication_id, uow=uow)
+            if details is None:
+                upsert_publication_fingerprint(connection, publication_id, scraped['citations'], publication_year,
+                                               scraped['titles'], uow=uow, detail_scraped=False)
+                last_publication_url = scraped['urls']
+                return
+            authors, journal, publisher, pub_date, author_order, citations_graph = details
+            publication_graph_sync.stage(publication_id, citations_graph, [])
+            if authors or journal or publisher or pub_date:
+                update_publication_stats(connection, publication_id, authors, journal, publisher, pub_date, uow=uow)
+            insert_publication_staff_author_order(connection, staff_id, publication_id, author_order, uow=uow)
+            upsert_publication_fingerprint(connection, publication_id,
+                                           scraped['citations'],
+                                           publication_year, scraped['titles'], uow=uow)
+            last_publication_url = scraped['urls']
+
+    publication_graph_counts = {'inserted': 0, 'updated': 0, 'deleted': 0}
+    written = 0
+
+    def write_and_checkpoint(job, details):
+        """Commits the publications written so far every checkpoint_publications jobs, together
+        with crawl_state.last_publication_url, so an interrupted crawl does not fetch their
+        detail pages again."""
+        nonlocal written
+        write_publication(job, details)
+        written += 1
+        if written % checkpoint_publications or not last_publication_url:
+            return
+        for change, count in publication_graph_sync.apply(connection, uow).items():
+            publication_graph_counts[change] += count
+        mark_crawl_progress(connection, staff_id, last_publication_url, uow)
+        if not uow.flush():
+            raise mysql.connector.Error(f"Checkpoint of staff_id={staff_id} at {last_publication_url} failed")
+
+    run_detail_pipeline(fetcher, full_name, jobs, write_and_checkpoint)
+
+    staff_graph_counts = staff_graph_sync.apply(connection, uow)
+    for change, count in publication_graph_sync.apply(connection, uow).items():
+        publication_graph_counts[change] += count
+    LOGGER.info(f"staff_id={staff_id}: staff graph {staff_graph_counts}, publication graphs {publication_graph_counts}")
+    if last_publication_url:
+        mark_crawl_progress(connection, staff_id, last_publication_url, uow)
+    if complete:
+        mark_full_profile_scrape(connection, staff_id, uow)
+    if not uow.flush():
+        return False
+    if not refresh_aggregates(connection, [staff_id]):
+        LOGGER.warning(f"Aggregates of staff_id={staff_id} not refreshed, they catch up on its next crawl or --recompute")
+    LOGGER.info(f"Finished processing staff_id={staff_id}")
+    return True
+
+
+def scrape_worker(tasks, fetcher_factory, track_progress=True, scheduler=None):
+    connection = create_connection()
+    if connection is None:
+        LOGGER.error("No database connection for this worker, stopping it")
+        return
+    fetcher = fetcher_factory()
+    try:
+        while True:
+            try:
+                staff_id, scholar_id, full_name = tasks.get_nowait()
+            except queue.Empty:
+                break
+            run_metrics.begin_staff()
+            if track_progress:
+                mark_crawl_started(connection, staff_id)
+            try:
+                with run_metrics.timer('staff'):
+                    finished = process_staff(connection, fetcher, staff_id, scholar_id, full_name)
+            except Exception as e:
+                LOGGER.error(f"Error processing staff_id={staff_id}: {e}")
+                connection.rollback()
+                finished = False
+            if track_progress:
+                mark_crawl_finished(connection, staff_id, finished)
+            run_metrics.count('staff_processed')
+            run_metrics.end_staff(staff_id=staff_id, finished=finished)
+            if scheduler:
+                LOGGER.info(f"Effective request rate: {scheduler.effective_rate():.1f} requests/min")
+    finally:
+        fetcher.close()
+        if connection:
+            connection.close()
 
-        LOGGER.info(f"Processing staff_id={staff_id}, name={full_name}, scholar_id={scholar_id}")
-        publications_df_scrape, rows_length, staff_citations_graph_scrape, staff_stats_scrape = get_publications_scrape(
-            scholar_id)
-        
-        if publications_df_scrape is None or staff_stats_scrape is None:
-            LOGGER.warning(f"Scraping failed for scholar_id={scholar_id} (staff_id={staff_id})")
 
-            if failures_in_a_row >= failed_times_to_restart:
-                LOGGER.warning(f"Restarting WebDriver after {failures_in_a_row} consecutive failures...")
-                try:
-                    DRIVER.quit()
-                except Exception as e:
-                    LOGGER.error(f"Error quitting driver: {e}")
-                sleep(10)  # Μικρό διάλειμμα
-                create_driver()
-                failures_in_a_row = 0
+def run_worker_pool(all_staff, workers, fetcher_factory, track_progress=True, scheduler=None):
+    tasks = queue.Queue()
+    for staff_id, scholar_id, full_name in all_staff:
+        tasks.put((staff_id, scholar_id, full_name))
 
-            continue
+    if workers <= 1:
+        scrape_worker(tasks, fetcher_factory, track_progress, scheduler)
+        return
+
+    threads = [threading.Thread(target=scrape_worker, args=(tasks, fetcher_factory, track_progress, scheduler),
+                                name=f"worker-{n + 1}")
+               for n in range(workers)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
 
-        if not staff_stats_scrape or len(staff_stats_scrape) < 3:
-            LOGGER.warning(f"Incomplete Scholar stats for scholar_id={scholar_id} (staff_id={staff_id}), skipping...")
-            continue
-        
-        staff_stats_db, staff_citations_graph_db, publications_df_db = select_all(connection, staff_id)
-        
-        # STAFF STATISTICS
-        publication_ids = publications_df_db["publication_id"].tolist()
-
-        citation_rows = []
-        for pub_id in publication_ids:
-            graph = select_publication_graph(connection, pub_id)
-            for citations, year in graph:
-                citation_rows.append({
-                    "publication_id": pub_id,
-                    "year": int(year),
-                    "citations": int(citations)
-                })
-
-        if citation_rows:
-            citation_df = pd.DataFrame(citation_rows)
-            graph_stats = calculate_indices_from_graph(citation_df)
-
-        st_stats_tmp = tuple(int(x) for pair in staff_stats_scrape for x in pair)
-        local_stats = calculate_stats(publications_df_scrape)
-        local_stats_tuple = (
-            local_stats['h_index'],
-            local_stats['h_index_5y'],
-            local_stats['i10_index'],
-            local_stats['i10_index_5y'],
-            graph_stats["h_index_from_graph"],
-            graph_stats["last_5_years_h_index_from_graph"],
-            graph_stats["i10_index_from_graph"],
-            graph_stats["last_5_years_i10_index_from_graph"]
-        )
-
-        st_stats = st_stats_tmp + local_stats_tuple
-        
-        if staff_stats_db:
-            st_stats_db = tuple(staff_stats_db[0])
-        else:
-            st_stats_db = []
-        LOGGER.info(f"staff_stats_db = {st_stats_db}, staff_stast = {st_stats} !!")
-        try:
-            if not st_stats_db and st_stats:
-                insert_staff_statistics(connection, staff_id, st_stats[0], st_stats[1], st_stats[2],
-                                    st_stats[3], st_stats[4], st_stats[5], st_stats[6],
-                                    st_stats[7], st_stats[8], st_stats[9], st_stats[10], 
-                                    st_stats[11], st_stats[12], st_stats[13])
-            elif st_stats != st_stats_db:
-                differences = [
-                    (i, val1, val2)
-                    for i, (val1, val2) in enumerate(zip(st_stats, st_stats_db))
-                    if val1 != val2
-                ]
-
-                update_fields = {}
-
-                for diff in differences:
-                    index, new, old = diff
-                    ## LOGGER.info(f"Differences on staff stats: staff_id: {staff_id}, old value: "
-                    ##  f"{old}, new value: {new}, in position: {index}")
-                    
-
-                    if index == 0:
-                        update_fields["total_citations"] = new
-                    elif index == 1:
-                        update_fields["last_5_years_citations"] = new
-                    elif index == 2:
-                        update_fields["h_index"] = new
-                    elif index == 3:
-                        update_fields["last_5_years_h_index"] = new
-                    elif index == 4:
-                        update_fields["i10_index"] = new
-                    elif index == 5:
-                        update_fields["last_5_years_i10_index"] = new
-                    elif index == 6:
-                        update_fields["h_index_local"] = new
-                    elif index == 7:
-                        update_fields["last_5_years_h_index_local"] = new
-                    elif index == 8:
-                        update_fields["i10_index_local"] = new
-                    elif index == 9:
-                        update_fields["last_5_years_i10_index_local"] = new
-                    elif index == 10:
-                        update_fields["h_index_from_graph"] = new
-                    elif index == 11:
-                        update_fields["last_5_years_h_index_from_graph"] = new
-                    elif index == 12:
-                        update_fields["i10_index_from_graph"] = new
-                    elif index == 13:
-                        update_fields["last_5_years_i10_index_from_graph"] = new
-                if update_fields:
-                    update_staff_stats_bulk(connection, staff_id, update_fields)
-        except IndexError:
-            LOGGER.error(f"IndexError inserting stats for staff_id={staff_id}, st_stats={st_stats}, st_stats_length= {len(st_stats)}")
-            continue
 
-        # STAFF GRAPH
-        graph = [(int(x), int(y)) for x, y in staff_citations_graph_scrape]
-        if not staff_citations_graph_db and graph:
-            for citations_st, year_st in graph:
-                insert_staff_citations_per_year(connection, staff_id, year_st, citations_st)
-        elif staff_citations_graph_db != graph:
-            set_staff_graph_db = set(staff_citations_graph_db)
-            set_staff_graph = set(graph)
-            deleted = set_staff_graph_db - set_staff_graph
-            # Differences
-            diffs = set_staff_graph - set_staff_graph_db
-            diffs_list = list(diffs)
-            deleted_list = list(deleted)
-            ## LOGGER.info(f"Differences on graph: {diffs_list}, Deleted Data: {deleted_list}")
-            for citations_x, year_x in diffs_list:
-                tmp = 0
-                for citations_y, year_y in staff_citations_graph_db:
-                    if year_x == year_y:
-                        tmp = 1
-                        update_staff_graph(connection, staff_id, year_x, citations_x)
-                if tmp == 0:
-                    insert_staff_citations_per_year(connection, staff_id, year_x, citations_x)
-            for citations_x, year_x in deleted_list:
-                tmp = 0
-                for citations_y, year_y in diffs_list:
-                    if year_x == year_y:
-                        tmp = 1
-                if tmp == 0:
-                    delete_staff_graphs_entry(connection, staff_id, year_x)
-
-        if not publications_df_scrape.empty:
-            for publication_sc in range(len(publications_df_scrape)):
-                exists = False
-                for publication_db in range(len(publications_df_db)):
-                    if publications_df_scrape['urls'][publication_sc] == publications_df_db['urls'][publication_db]:
-                        publication_id = publications_df_db['publication_id'][publication_db]
-                        exists = True
-                        citations_scrape_to_int = None
-                        if publications_df_scrape['citations'][publication_sc] != "NULL":
-                            citations_scrape_to_int = int(publications_df_scrape['citations'][publication_sc])
-                        if citations_scrape_to_int != publications_df_db['citations'][publication_db]:
-                            authors, journal, publisher, pub_date, author_order, citations_graph = \
-                                (get_publication_stats_scrape(publications_df_scrape['urls'][publication_sc],
-                                                              full_name))
-                            if failures_in_a_row >= failed_times_to_restart:
-                                LOGGER.warning(f"Restarting WebDriver after {failures_in_a_row} consecutive failures...")
-                                try:
-                                    DRIVER.quit()
-                                except Exception as e:
-                                    LOGGER.error(f"Error quitting driver: {e}")
-                                sleep(10)
-                                create_driver()
-                                failures_in_a_row = 0
-                            author_order_boolean = False
-                            title_boolean = False
-                            authors_boolean = False
-                            date_boolean = False
-                            journal_boolean = False
-                            publisher_boolean = False
-                            citations_boolean = True
-                            if author_order != publications_df_db['author_order'][publication_db]:
-                                author_order_boolean = True
-                                ## LOGGER.info(f"PublicationId: {publication_id} Changed Author Order From: "
-                                ## f"{publications_df_db['author_order'][publication_db]} To: {author_order}")
-                            if (publications_df_scrape['titles'][publication_sc] !=
-                                    publications_df_db['titles'][publication_db]):
-                                if publications_df_db['titles'][publication_db] != 'Unknown Title: Non ASCII':
-                                    title_boolean = True
-                                    if publications_df_scrape['titles'][publication_sc]:
-                                        if contains_4byte_utf8(publications_df_scrape['titles'][publication_sc]):
-                                            title = 'Unknown Title: Non ASCII'
-                                else:
-                                    title_boolean = False
-                                ## LOGGER.info(f"PublicationId: {publication_id} Changed Title From: {publications_df_db['titles'][publication_db]} "
-                                ## f"To: {publications_df_scrape['titles'][publication_sc]}")
-                            similarity = fuzz.ratio(authors, publications_df_db['authors'][publication_db])
-                            if similarity < 80:
-                                authors_boolean = True
-                                ## LOGGER.info(f"PublicationId: {publication_id} Changed Authors From: {publications_df_db['authors'][publication_db]} "
-                                ## f"To: {authors}")
-                            if publications_df_db['publication_date'][publication_db]:
-                                dt = str(publications_df_db['publication_date'][publication_db].strftime("%Y-%m-%d"))
-                                if str(pub_date) != dt:
-                                    date_boolean = True
-                                    if pub_date == '':
-                                        pub_date = None
-                                    ## LOGGER.info(f"PublicationId: {publication_id} Changed Date From: {dt} To: {pub_date}")
-                            if not journal:
-                                journal = None
-                            if journal != publications_df_db['journal'][publication_db]:
-                                journal_boolean = True
-                                ## LOGGER.info(f"PublicationId: {publication_id} Changed Journal From: {publications_df_db['journal'][publication_db]} "
-                                ## f"To: {journal}")
-                            if not publisher:
-                                publisher = None
-                            if publisher != publications_df_db['publisher'][publication_db]:
-                                publisher_boolean = True
-                                ## LOGGER.info(f"PublicationId: {publication_id} Changed Publisher From: {publications_df_db['publisher'][publication_db]}"
-                                ## f" To: {publisher}")
-                                ## LOGGER.info(f"PublicationId: {publication_id} Changed Citations From: {publications_df_db['citations'][publication_db]} "
-                                ## f"To: {citations_scrape_to_int}")
-                            update_publication(connection, staff_id, publication_id, author_order_boolean, author_order,
-                                               title_boolean, publications_df_scrape['titles'][publication_sc],
-                                               authors_boolean, authors, date_boolean, pub_date, journal_boolean,
-                                               journal, publisher_boolean, publisher, citations_boolean,
-                                               citations_scrape_to_int)
-                            publication_graph_db = select_publication_graph(connection, publication_id)
-                            if citations_graph:
-                                citations_graph_scrape_to_int = [(int(cit), int(year)) for cit, year in citations_graph]
-                                if citations_graph_scrape_to_int != publication_graph_db:
-                                    set_publication_graph_db = set(publication_graph_db)
-                                    set_citations_graph_scrape_to_int = set(citations_graph_scrape_to_int)
-                                    deleted = set_publication_graph_db - set_citations_graph_scrape_to_int
-                                    # Differences
-                                    diffs = set_citations_graph_scrape_to_int - set_publication_graph_db
-                                    diffs_list = list(diffs)
-                                    deleted_list = list(deleted)
-                                    ## LOGGER.info(f"PublicationId: {publication_id} Differences on Publication graph: {diffs_list}, "
-                                    ## f"Deleted Data: {deleted_list}")
-                                    for citations_x, year_x in diffs_list:
-                                        tmp = 0
-                                        for citations_y, year_y in publication_graph_db:
-                                            if year_x == year_y:
-                                                tmp = 1
-                                                update_publication_graph(connection, publication_id,
-                                                                         year_x, citations_x)
-                                        if tmp == 0:
-                                            insert_publications_citations_per_year(connection, publication_id,
-                                                                                   year_x, citations_x)
-                                    for citations_x, year_x in deleted_list:
-                                        tmp = 0
-                                        for citations_y, year_y in diffs_list:
-                                            if year_x == year_y:
-                                                tmp = 1
-                                        if tmp == 0:
-                                            delete_publication_graph_entry(connection, publication_id, year_x)
-                if not exists:
-                    publication_year = None
-                    if publications_df_scrape['years'][publication_sc]:
-                        publication_year = publications_df_scrape['years'][publication_sc]
-                    title = publications_df_scrape['titles'][publication_sc]
-                    if title:
-                        if contains_4byte_utf8(title):
-                            title = 'Unknown Title: Non ASCII'
-                    ## LOGGER.info(f"title: {title}")
-                    publication_id = insert_publication(connection, title,
-                                                        publication_year,
-                                                        publications_df_scrape['urls'][publication_sc],
-                                                        int(publications_df_scrape['citations'][publication_sc]),
-                                                        publications_df_scrape['publication_scholar_ids'][publication_sc])
-                    if publication_id != 'NULL' and publication_id:
-                        publication_staff_id = insert_publication_staff(connection, staff_id, publication_id)
-                        authors, journal, publisher, pub_date, author_order, citations_graph = \
-                            (get_publication_stats_scrape(publications_df_scrape['urls'][publication_sc], full_name))
-                        for citation, year in citations_graph:
-                            insert_publications_citations_per_year(connection, publication_id, year, citation)
-                        if authors or journal or publisher or pub_date:
-                            update_publication_stats(connection, publication_id, authors, journal, publisher, pub_date)
-                        insert_publication_staff_author_order(connection, publication_staff_id, author_order)
-        LOGGER.info(f"Finished processing staff_id={staff_id}")                
+def main(replay=False, replay_date=None):
+    LOGGER.info("-- START PROGRAM --" if not replay else "-- START REPLAY --")
+
+    global detail_refresh_days, full_profile_days, detail_concurrency, history_mode, checkpoint_publications
+    load_dotenv()
+    history_mode = os.getenv("HISTORY_MODE", history_mode)
+    detail_refresh_days = int(os.getenv("DETAIL_REFRESH_DAYS", str(detail_refresh_days)))
+    detail_concurrency = int(os.getenv("DETAIL_CONCURRENCY", str(detail_concurrency)))
+    full_profile_days = int(os.getenv("FULL_PROFILE_DAYS", str(full_profile_days)))
+    checkpoint_publications = int(os.getenv("CRAWL_CHECKPOINT_PUBLICATIONS", str(checkpoint_publications)))
+    workers = int(os.getenv("SCRAPE_WORKERS", "1"))
+    if workers > connection_pool_size():
+        LOGGER.error(f"SCRAPE_WORKERS={workers} needs more connections than the pool has "
+                     f"({connection_pool_size()}); lower SCRAPE_WORKERS or raise DB_POOL_SIZE (at most 32)")
+        return
+    requests_per_minute = os.getenv("SCRAPE_REQUESTS_PER_MINUTE")
+    limiter = RateLimiter(float(requests_per_minute)) if requests_per_minute else None
+    scheduler = create_request_scheduler(limiter)
+    freshness_days = int(os.getenv("CRAWL_FRESHNESS_DAYS", "7"))
+    cache = create_page_cache()
+    if replay and cache is None:
+        LOGGER.error("Replay needs PAGE_CACHE_DIR to point at a page cache")
+        return
+    fetcher_factory = partial(create_fetcher, scheduler=scheduler, cache=cache, replay=replay, replay_date=replay_date)
 
+    connection = create_connection()
+    all_staff = get_all_staff(connection)
+    if replay:
+        # Το replay δεν αγγίζει το crawl_state: περνά όλο το προσωπικό από την cache
+        staff_to_crawl = all_staff
+    else:
+        staff_to_crawl = get_staff_to_crawl(connection, freshness_days)
+    connection.close()
+    LOGGER.info(f"Total staff fetched from database: {len(all_staff)}, "
+                f"{len(all_staff) - len(staff_to_crawl)} refreshed within the last {freshness_days} days are skipped")
+
+    run_worker_pool(staff_to_crawl, workers, fetcher_factory, track_progress=not replay,
+                    scheduler=None if replay else scheduler)
+
+    report = run_metrics.report()
+    run_metrics.emit({'event': 'summary', **report})
+    LOGGER.info(f"Run report: {json.dumps(report)}")
     LOGGER.info(f"END PROGRAM")
 
 
+def recompute(department_ids=None, window=metrics.RECENT_YEARS):
+    LOGGER.info("-- START RECOMPUTE --")
+
+    global history_mode
+    load_dotenv()
+    history_mode = os.getenv("HISTORY_MODE", history_mode)
+
+    connection = create_connection()
+    updated = recompute_statistics(connection, department_ids, window)
+    connection.close()
+
+    LOGGER.info(f"END RECOMPUTE: staff_statistics updated for {updated} staff")
+
+
+def change_feed_blocked(connection):
+    """The change feed must not run during a crawl. Its workers hold the auto-increment ids of
+    their history records in long transactions, so a later id can commit first and move the
+    consumer's offset past records that are not yet visible."""
+    global crawl_active_minutes
+    load_dotenv()
+    crawl_active_minutes = int(os.getenv("CRAWL_ACTIVE_MINUTES", str(crawl_active_minutes)))
+    if crawl_active(connection, crawl_active_minutes):
+        LOGGER.error(f"A crawl updated crawl_state within the last {crawl_active_minutes} minutes; "
+                     f"run the change feed after it finishes")
+        return True
+    return False
+
+
+def refresh_changed(window=metrics.RECENT_YEARS):
+    LOGGER.info("-- START REFRESH CHANGED --")
+
+    connection = create_connection()
+    if change_feed_blocked(connection):
+        connection.close()
+        return
+    refreshed = refresh_changed_aggregates(connection, window=window)
+    connection.close()
+
+    LOGGER.info(f"END REFRESH CHANGED: aggregates refreshed for {refreshed} staff")
+
+
+def print_changes(consumer, from_start=False):
+    connection = create_connection()
+    if change_feed_blocked(connection):
+        connection.close()
+        return
+    feed = changes.ChangeFeed(connection, consumer, from_start=from_start)
+    for events in feed.batches():
+        for event in events:
+            print(json.dumps(event, default=str, ensure_ascii=False))
+        feed.commit()
+    connection.close()
+
+
 if __name__ == "__main__":
-    main()
+    parser = argparse.ArgumentParser(description="Google Scholar scraper for the bibliometric database.")
+    parser.add_argument("--recompute", action="store_true",
+                        help="recompute the local and graph-based statistics and the aggregate tables from the database, without scraping")
+    parser.add_argument("--departments", type=lambda value: [int(x) for x in value.split(",")],
+                        help="comma-separated department ids to recompute (default: all staff)")
+    parser.add_argument("--window", type=int, default=metrics.RECENT_YEARS,
+                        help="years counted by the last-N-years indices when recomputing (default: %(default)s)")
+    parser.add_argument("--replay", action="store_true",
+                        help="run the parse and sync pipeline from the page cache (PAGE_CACHE_DIR), without network access")
+    parser.add_argument("--replay-date", type=date.fromisoformat,
+                        help="replay the pages cached on this date, YYYY-MM-DD (default: the most recent copy of each page)")
+    parser.add_argument("--refresh-changed", action="store_true",
+                        help="refresh the aggregate tables of the staff changed since the last --refresh-changed run")
+    parser.add_argument("--changes", metavar="CONSUMER",
+                        help="print the changes recorded since the last run of CONSUMER as JSON lines")
+    parser.add_argument("--from-start", action="store_true",
+                        help="with --changes, start a new consumer at the oldest record instead of the newest")
+    args = parser.parse_args()
+
+    if args.recompute:
+        recompute(args.departments, args.window)
+    elif args.refresh_changed:
+        refresh_changed(args.window)
+    elif args.changes:
+        print_changes(args.changes, args.from_start)
+    else:
+        main(args.replay, args.replay_date)
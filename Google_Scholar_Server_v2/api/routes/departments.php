@@ -50,6 +50,8 @@ if ($segments[1] === 'all') {
     $role_ids = implode(',', $roles);
 
     try {
+        // Οι μέσοι όροι μετρούν κάθε μέλος μία φορά ανά επιλεγμένο ρόλο (όχι πια σταθμισμένα με τις
+        // δημοσιεύσεις του), τα staff_count / total_pubs χωρίς διπλομετρήσεις μεταξύ ρόλων
         $stmt = $pdo->prepare("CALL get_department_stats_by_depts_and_roles(:dept_ids, :role_ids)");
         $stmt->bindParam(':dept_ids', $department_ids);
         $stmt->bindParam(':role_ids', $role_ids);
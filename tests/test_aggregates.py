@@ -0,0 +1,59 @@
+"""Google_Scholar_Aggregates.department_role_set_counts against distinct counts taken
+directly from the memberships and authorships it summarises.
+
+    python -m pytest tests
+"""
+import os
+import sys
+from itertools import combinations
+
+import pandas as pd
+from hypothesis import given, strategies as st
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+import Google_Scholar_Aggregates as aggregates
+
+ROLE_IDS = [2, 5, 10, 11]
+
+memberships = st.sets(st.tuples(st.integers(1, 3), st.sampled_from(ROLE_IDS), st.integers(1, 12)), max_size=40)
+authorships = st.sets(st.tuples(st.integers(1, 12), st.integers(1, 30)), max_size=80)
+
+
+def masks(memberships, authorships):
+    """The (department_id, mask) counts select_role_set_masks() reads from the database."""
+    staff_masks, publication_masks = {}, {}
+    for department_id, role_id, staff_id in memberships:
+        key = (department_id, staff_id)
+        staff_masks[key] = staff_masks.get(key, 0) | 1 << ROLE_IDS.index(role_id)
+    for (department_id, staff_id), mask in staff_masks.items():
+        for author_id, publication_id in authorships:
+            if author_id == staff_id:
+                key = (department_id, publication_id)
+                publication_masks[key] = publication_masks.get(key, 0) | mask
+
+    def counted(by_row):
+        counts = pd.Series([(department_id, mask) for (department_id, _), mask in by_row.items()], dtype=object)
+        counts = counts.value_counts()
+        index = pd.MultiIndex.from_tuples(list(counts.index), names=['department_id', 'mask'])
+        return pd.Series(counts.to_numpy(dtype='int64'), index=index, dtype='int64')
+
+    return counted(staff_masks), counted(publication_masks)
+
+
+@given(memberships, authorships)
+def test_role_set_counts_match_distinct_counts(memberships, authorships):
+    staff_masks, publication_masks = masks(memberships, authorships)
+    counts = aggregates.department_role_set_counts(staff_masks, publication_masks, ROLE_IDS)
+
+    expected = {}
+    for department_id in {department_id for department_id, _, _ in memberships}:
+        roles = sorted({role_id for dept, role_id, _ in memberships if dept == department_id})
+        for size in range(1, len(roles) + 1):
+            for role_set in combinations(roles, size):
+                staff = {staff_id for dept, role_id, staff_id in memberships
+                         if dept == department_id and role_id in role_set}
+                publications = {publication_id for author_id, publication_id in authorships if author_id in staff}
+                expected[(department_id, ','.join(map(str, role_set)))] = (len(staff), len(publications))
+
+    assert {key: tuple(row) for key, row in zip(counts.index, counts.itertuples(index=False))} == expected
@@ -0,0 +1,123 @@
+"""Google_Scholar_Metrics against the per-staff Python loops it replaced.
+
+The reference functions below are the implementations of calculate_h_index(),
+calculate_i10_index(), calculate_stats() and calculate_indices_from_graph() before the
+NumPy module, kept as they were apart from taking plain lists.
+
+    python -m pytest tests
+"""
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+from hypothesis import given, settings, strategies as st
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+import Google_Scholar_Metrics as metrics
+
+CURRENT_YEAR = 2024
+
+
+def reference_h_index(citations_list):
+    sorted_citations = sorted(citations_list, reverse=True)
+    h_index = sum(1 for i, c in enumerate(sorted_citations) if c >= i + 1)
+    return h_index
+
+
+def reference_i10_index(citations_list):
+    return sum(1 for c in citations_list if c >= 10)
+
+
+def reference_stats(citations, years):
+    recent_citations = [c for c, year in zip(citations, years) if (year or 0) >= CURRENT_YEAR - 5]
+    return {
+        'h_index': reference_h_index(citations),
+        'h_index_5y': reference_h_index(recent_citations),
+        'i10_index': reference_i10_index(citations),
+        'i10_index_5y': sum(1 for c in recent_citations if c >= 10),
+    }
+
+
+def reference_graph_stats(graph_df):
+    total_citations = graph_df.groupby("publication_id")["citations"].sum()
+    last_5_years_df = graph_df[graph_df["year"] >= CURRENT_YEAR - 5]
+    citations_last_5 = last_5_years_df.groupby("publication_id")["citations"].sum()
+    return {
+        'h_index': reference_h_index(total_citations.tolist()),
+        'h_index_5y': reference_h_index(citations_last_5.tolist()),
+        'i10_index': reference_i10_index(total_citations.tolist()),
+        'i10_index_5y': reference_i10_index(citations_last_5.tolist()),
+    }
+
+
+# Μικρά εύρη για πολλές ισοβαθμίες και λίστες μόνο με μηδενικά, μεγάλα για τις ουρές
+citation_counts = st.one_of(st.integers(0, 3), st.integers(0, 25), st.integers(0, 5000))
+citation_lists = st.lists(citation_counts, max_size=60)
+years = st.one_of(st.none(), st.integers(CURRENT_YEAR - 12, CURRENT_YEAR + 1))
+publications = st.lists(st.tuples(st.integers(1, 6), citation_counts, years), max_size=120)
+graph_rows = st.lists(st.tuples(st.integers(1, 4), st.integers(1, 15),
+                                st.integers(CURRENT_YEAR - 12, CURRENT_YEAR), st.integers(0, 40)), max_size=150)
+
+
+@given(citation_lists)
+def test_h_and_i10_index_match_reference(citations):
+    assert metrics.h_index(citations) == reference_h_index(citations)
+    assert metrics.i10_index(citations) == reference_i10_index(citations)
+
+
+@given(st.integers(0, 40), st.integers(0, 30))
+def test_ties_and_zeros(size, value):
+    citations = [value] * size
+    assert metrics.h_index(citations) == reference_h_index(citations)
+    assert metrics.i10_index(citations) == reference_i10_index(citations)
+
+
+@given(st.lists(st.tuples(st.integers(1, 8), citation_counts), max_size=150))
+def test_grouped_indices_match_reference(rows):
+    group_ids = [group_id for group_id, _ in rows]
+    citations = [count for _, count in rows]
+    unique_ids, h = metrics.grouped_h_index(group_ids, citations)
+    _, i10 = metrics.grouped_i10_index(group_ids, citations)
+
+    assert unique_ids.tolist() == sorted(set(group_ids))
+    for group_id, group_h, group_i10 in zip(unique_ids, h, i10):
+        group = [count for row_group, count in rows if row_group == group_id]
+        assert group_h == reference_h_index(group)
+        assert group_i10 == reference_i10_index(group)
+
+
+def test_grouped_indices_of_no_publications():
+    unique_ids, h = metrics.grouped_h_index([], [])
+    assert len(unique_ids) == 0 and len(h) == 0
+    assert metrics.indices_by_staff([], [], [], current_year=CURRENT_YEAR).empty
+    assert metrics.graph_indices_by_staff([], [], [], [], current_year=CURRENT_YEAR).empty
+
+
+@settings(max_examples=200)
+@given(publications)
+def test_indices_by_staff_match_reference(rows):
+    staff_ids = [staff_id for staff_id, _, _ in rows]
+    citations = [count for _, count, _ in rows]
+    publication_years = [np.nan if year is None else year for _, _, year in rows]
+    indices = metrics.indices_by_staff(staff_ids, citations, publication_years, current_year=CURRENT_YEAR)
+
+    assert indices.index.tolist() == sorted(set(staff_ids))
+    for staff_id, row in indices.iterrows():
+        staff_rows = [(count, year) for row_staff, count, year in rows if row_staff == staff_id]
+        expected = reference_stats([count for count, _ in staff_rows], [year for _, year in staff_rows])
+        assert row.to_dict() == expected
+
+
+@settings(max_examples=200)
+@given(graph_rows)
+def test_graph_indices_by_staff_match_reference(rows):
+    graph_df = pd.DataFrame(rows, columns=['staff_id', 'publication_id', 'year', 'citations'])
+    indices = metrics.graph_indices_by_staff(graph_df['staff_id'], graph_df['publication_id'], graph_df['year'],
+                                             graph_df['citations'], current_year=CURRENT_YEAR)
+
+    assert indices.index.tolist() == sorted(graph_df['staff_id'].unique().tolist())
+    for staff_id, row in indices.iterrows():
+        expected = reference_graph_stats(graph_df[graph_df['staff_id'] == staff_id])
+        assert row.to_dict() == expected
@@ -0,0 +1,32 @@
+"""Google_Scholar_Names: author positions and author-list similarity.
+
+    python -m pytest tests
+"""
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+import Google_Scholar_Names as names
+
+
+@pytest.mark.parametrize('text, other', [('', ''), (None, None), ('', 'G Papadopoulos'), (None, 'G Papadopoulos')])
+def test_similarity_of_empty_author_lists_is_zero(text, other):
+    assert names.similarity(text, other) == 0
+
+
+def test_similarity_of_identical_author_lists():
+    assert names.similarity('G Papadopoulos, K Nikolaou', 'G Papadopoulos, K Nikolaou') == 100
+
+
+@pytest.mark.parametrize('authors, position', [
+    (['K Nikolaou', 'Georgios Papadopoulos'], 2),
+    (['K Nikolaou', 'G. Papadopoulos'], 2),
+    (['K Nikolaou', 'Giorgos Papadopoulos'], 2),
+    (['K Nikolaou', 'A Papadopoulos'], 0),
+    (['Γεώργιος Παπαδόπουλος'], 1),
+])
+def test_author_position(authors, position):
+    assert names.author_position('Georgios Papadopoulos', authors) == position
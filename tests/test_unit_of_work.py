@@ -0,0 +1,108 @@
+"""Google_Scholar_Scrape.UnitOfWork against a connection that records its statements.
+
+    python -m pytest tests
+"""
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+import Google_Scholar_Scrape as gs
+
+
+class RecordingCursor:
+    lastrowid = 1
+
+    def __init__(self, connection):
+        self.connection = connection
+
+    def execute(self, query, values=()):
+        if query in self.connection.failing:
+            raise gs.mysql.connector.Error("write failed")
+        self.connection.log.append(('execute', query, values))
+
+    def executemany(self, query, rows):
+        if query in self.connection.failing:
+            raise gs.mysql.connector.Error("write failed")
+        self.connection.log.append(('executemany', query, list(rows)))
+
+    def close(self):
+        pass
+
+
+class RecordingConnection:
+    def __init__(self, failing=()):
+        self.log = []
+        self.failing = set(failing)
+
+    def cursor(self, **kwargs):
+        return RecordingCursor(self)
+
+    def commit(self):
+        self.log.append('commit')
+
+    def rollback(self):
+        self.log.append('rollback')
+
+
+@pytest.fixture(autouse=True)
+def trigger_history(monkeypatch):
+    monkeypatch.setattr(gs, 'history_mode', 'triggers')
+
+
+def test_flush_keeps_staged_order_and_merges_consecutive_statements():
+    connection = RecordingConnection()
+    uow = gs.UnitOfWork(connection)
+    uow.add('DELETE a', (1,))
+    uow.add('INSERT a', (1,))
+    uow.add('INSERT a', (2,))
+    uow.add('DELETE a', (2,))
+    assert uow.flush()
+    assert connection.log == [('executemany', 'DELETE a', [(1,)]), ('executemany', 'INSERT a', [(1,), (2,)]),
+                              ('executemany', 'DELETE a', [(2,)]), 'commit']
+
+
+def test_execute_now_sends_the_queued_writes_first():
+    connection = RecordingConnection()
+    uow = gs.UnitOfWork(connection)
+    uow.add('DELETE a', (1,))
+    uow.execute_now(connection.cursor(), 'INSERT b', (1,))
+    uow.add('UPDATE b', (1,))
+    assert uow.flush()
+    assert connection.log == [('executemany', 'DELETE a', [(1,)]), ('execute', 'INSERT b', (1,)),
+                              ('executemany', 'UPDATE b', [(1,)]), 'commit']
+
+
+def test_flush_rolls_back_after_a_failed_immediate_write():
+    connection = RecordingConnection(failing={'INSERT b'})
+    uow = gs.UnitOfWork(connection)
+    uow.add('DELETE a', (1,))
+    with pytest.raises(gs.mysql.connector.Error):
+        uow.execute_now(connection.cursor(), 'INSERT b', (1,))
+    uow.add('UPDATE b', (1,))
+    assert not uow.flush()
+    assert connection.log[-1] == 'rollback' and 'commit' not in connection.log
+
+
+def test_deferred_history_records_only_the_years_that_changed(monkeypatch):
+    monkeypatch.setattr(gs, 'history_mode', 'deferred')
+    connection = RecordingConnection()
+    uow = gs.UnitOfWork(connection)
+    sync = gs.GraphSync('staff')
+    sync.stage(1, [(5, 2020), (7, 2021), (2, 2022)], [(5, 2020), (6, 2021), (1, 2019)])
+    sync.stage(2, [(3, 2020)], [(3, 2020)])
+    sync.apply(connection, uow)
+    assert uow.history == {('staff_citations_per_year', ('staff_id', 'year')): {(1, 2021): 'UPDATE',
+                                                                                  (1, 2022): 'INSERT'}}
+
+
+def test_deferred_history_records_nothing_for_an_unchanged_graph(monkeypatch):
+    monkeypatch.setattr(gs, 'history_mode', 'deferred')
+    connection = RecordingConnection()
+    uow = gs.UnitOfWork(connection)
+    sync = gs.GraphSync('publication')
+    sync.stage(1, [(5, 2020), (6, 2021)], [(6, 2021), (5, 2020)])
+    sync.apply(connection, uow)
+    assert not any(uow.history.values()) and not uow.pending